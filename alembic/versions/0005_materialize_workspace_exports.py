@@ -0,0 +1,74 @@
+"""materialize workspace exports
+
+Revision ID: 0005_materialize_workspace_exports
+Revises: 0004_add_workspace_owner_id
+Create Date: 2026-10-18T09:12:04-04:00
+
+"""
+import hashlib
+import json
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0005_materialize_workspace_exports"
+down_revision = "0004_add_workspace_owner_id"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 200
+
+workspaces = sa.table(
+    "workspaces",
+    sa.column("id", sa.String),
+    sa.column("data", sa.JSON),
+    sa.column("export_bytes", sa.LargeBinary),
+    sa.column("export_sha256", sa.String),
+)
+
+
+def upgrade() -> None:
+    op.add_column("workspaces", sa.Column("export_bytes", sa.LargeBinary(), nullable=True))
+    op.add_column("workspaces", sa.Column("export_sha256", sa.String(length=64), nullable=True))
+
+    bind = op.get_bind()
+    statement = (
+        workspaces.update()
+        .where(workspaces.c.id == sa.bindparam("workspace_id"))
+        .values(
+            export_bytes=sa.bindparam("export_bytes"),
+            export_sha256=sa.bindparam("export_sha256"),
+        )
+    )
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(workspaces.c.id, workspaces.c.data)
+            .where(workspaces.c.id > last_id)
+            .order_by(workspaces.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            document = json.dumps(
+                {"workspace": row.data},
+                sort_keys=True,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            updates.append(
+                {
+                    "workspace_id": row.id,
+                    "export_bytes": document,
+                    "export_sha256": hashlib.sha256(document).hexdigest(),
+                }
+            )
+        bind.execute(statement, updates)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "export_sha256")
+    op.drop_column("workspaces", "export_bytes")
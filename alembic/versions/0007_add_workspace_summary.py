@@ -0,0 +1,78 @@
+"""add workspace summary columns
+
+Revision ID: 0007_add_workspace_summary
+Revises: 0006_create_jobs
+Create Date: 2026-10-18T13:05:41-04:00
+
+"""
+import json
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0007_add_workspace_summary"
+down_revision = "0006_create_jobs"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 200
+
+workspaces = sa.table(
+    "workspaces",
+    sa.column("id", sa.String),
+    sa.column("data", sa.JSON),
+    sa.column("payload_bytes", sa.Integer),
+    sa.column("section_counts", sa.JSON),
+)
+
+
+def upgrade() -> None:
+    op.add_column("workspaces", sa.Column("payload_bytes", sa.Integer(), nullable=True))
+    op.add_column("workspaces", sa.Column("section_counts", sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    statement = (
+        workspaces.update()
+        .where(workspaces.c.id == sa.bindparam("workspace_id"))
+        .values(
+            payload_bytes=sa.bindparam("payload_bytes"),
+            section_counts=sa.bindparam("section_counts"),
+        )
+    )
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(workspaces.c.id, workspaces.c.data)
+            .where(workspaces.c.id > last_id)
+            .order_by(workspaces.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            document = json.dumps(
+                {"workspace": row.data},
+                sort_keys=True,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            data = row.data if isinstance(row.data, dict) else {}
+            updates.append(
+                {
+                    "workspace_id": row.id,
+                    "payload_bytes": len(document),
+                    "section_counts": {
+                        key: len(value)
+                        for key, value in data.items()
+                        if isinstance(value, (list, dict))
+                    },
+                }
+            )
+        bind.execute(statement, updates)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "section_counts")
+    op.drop_column("workspaces", "payload_bytes")
@@ -0,0 +1,29 @@
+"""index workspaces for keyset pagination
+
+Revision ID: 0008_index_workspaces
+Revises: 0007_add_workspace_summary
+Create Date: 2026-10-18T13:48:20-04:00
+
+"""
+from alembic import op
+
+revision = "0008_index_workspaces"
+down_revision = "0007_add_workspace_summary"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_workspaces_updated_at_id", "workspaces", ["updated_at", "id"])
+    op.create_index(
+        "ix_workspaces_owner_id_updated_at_id",
+        "workspaces",
+        ["owner_id", "updated_at", "id"],
+    )
+    op.create_index("ix_workspaces_system_id", "workspaces", ["system_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workspaces_system_id", table_name="workspaces")
+    op.drop_index("ix_workspaces_owner_id_updated_at_id", table_name="workspaces")
+    op.drop_index("ix_workspaces_updated_at_id", table_name="workspaces")
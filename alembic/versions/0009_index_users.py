@@ -0,0 +1,41 @@
+"""index users for sorting and prefix search
+
+Revision ID: 0009_index_users
+Revises: 0008_index_workspaces
+Create Date: 2026-10-18T14:31:09-04:00
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0009_index_users"
+down_revision = "0008_index_workspaces"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_last_login_at_id", "users", ["last_login_at", "id"])
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    if op.get_bind().dialect.name == "postgresql":
+        # LIKE 'prefix%' can only use a btree index built with pattern ops
+        # unless the database collation is C.
+        op.create_index(
+            "ix_users_email_prefix",
+            "users",
+            [sa.text("email varchar_pattern_ops")],
+        )
+        op.create_index(
+            "ix_users_display_name_prefix",
+            "users",
+            [sa.text("lower(display_name) varchar_pattern_ops")],
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_users_display_name_prefix", table_name="users")
+        op.drop_index("ix_users_email_prefix", table_name="users")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.drop_index("ix_users_last_login_at_id", table_name="users")
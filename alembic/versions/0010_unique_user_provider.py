@@ -0,0 +1,72 @@
+"""unique index on user provider identity
+
+Revision ID: 0010_unique_user_provider
+Revises: 0009_index_users
+Create Date: 2026-10-18T15:02:36-04:00
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010_unique_user_provider"
+down_revision = "0009_index_users"
+branch_labels = None
+depends_on = None
+
+users = sa.table(
+    "users",
+    sa.column("id", sa.String),
+    sa.column("provider", sa.String),
+    sa.column("provider_id", sa.String),
+    sa.column("is_admin", sa.Boolean),
+    sa.column("last_login_at", sa.DateTime(timezone=True)),
+)
+# Tables that refer to users by owner_id at this revision.
+owned = [
+    sa.table(name, sa.column("owner_id", sa.String)) for name in ("workspaces", "jobs")
+]
+
+
+def _merge_duplicate_users() -> None:
+    """Fold users sharing a provider identity into the one who logged in last.
+
+    Concurrent first logins could insert the same identity twice before this
+    index existed. The duplicates' workspaces and jobs move to the kept user,
+    who stays an admin if any of them was one.
+    """
+
+    bind = op.get_bind()
+    identities = bind.execute(
+        sa.select(users.c.provider, users.c.provider_id)
+        .group_by(users.c.provider, users.c.provider_id)
+        .having(sa.func.count() > 1)
+    ).all()
+    for provider, provider_id in identities:
+        rows = bind.execute(
+            sa.select(users.c.id, users.c.is_admin)
+            .where(users.c.provider == provider, users.c.provider_id == provider_id)
+            .order_by(users.c.last_login_at.desc(), users.c.id)
+        ).all()
+        kept, merged = rows[0].id, [row.id for row in rows[1:]]
+        for table in owned:
+            bind.execute(
+                table.update().where(table.c.owner_id.in_(merged)).values(owner_id=kept)
+            )
+        if any(row.is_admin for row in rows):
+            bind.execute(users.update().where(users.c.id == kept).values(is_admin=True))
+        bind.execute(users.delete().where(users.c.id.in_(merged)))
+
+
+def upgrade() -> None:
+    _merge_duplicate_users()
+    op.create_index(
+        "uq_users_provider_provider_id",
+        "users",
+        ["provider", "provider_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_users_provider_provider_id", table_name="users")
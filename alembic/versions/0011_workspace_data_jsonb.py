@@ -0,0 +1,35 @@
+"""store workspace data as jsonb and index it for containment search
+
+Revision ID: 0011_workspace_data_jsonb
+Revises: 0010_unique_user_provider
+Create Date: 2026-10-18T16:02:44-04:00
+
+"""
+from alembic import op
+
+revision = "0011_workspace_data_jsonb"
+down_revision = "0010_unique_user_provider"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE workspaces ALTER COLUMN data TYPE JSONB USING data::jsonb")
+    # jsonb_path_ops indexes only support @>, @? and @@, but are smaller and
+    # faster for containment than the default jsonb_ops.
+    op.create_index(
+        "ix_workspaces_data_path_ops",
+        "workspaces",
+        ["data"],
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_workspaces_data_path_ops", table_name="workspaces")
+    op.execute("ALTER TABLE workspaces ALTER COLUMN data TYPE JSON USING data::json")
@@ -0,0 +1,48 @@
+"""trigram and prefix indexes for workspace name search
+
+Revision ID: 0012_index_workspace_names
+Revises: 0011_workspace_data_jsonb
+Create Date: 2026-10-18T16:47:13-04:00
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0012_index_workspace_names"
+down_revision = "0011_workspace_data_jsonb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Substring and similarity (%) matches on names.
+    op.create_index(
+        "ix_workspaces_name_trgm",
+        "workspaces",
+        [sa.text("lower(name) gin_trgm_ops")],
+        postgresql_using="gin",
+    )
+    # Prefix lookups range scan these in order and stop at the page limit;
+    # the "C" collation makes LIKE 'prefix%' indexable.
+    op.create_index(
+        "ix_workspaces_name_prefix",
+        "workspaces",
+        [sa.text('(lower(name) COLLATE "C")'), "id"],
+    )
+    op.create_index(
+        "ix_workspaces_system_id_prefix",
+        "workspaces",
+        [sa.text('(lower(system_id) COLLATE "C")')],
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_workspaces_system_id_prefix", table_name="workspaces")
+    op.drop_index("ix_workspaces_name_prefix", table_name="workspaces")
+    op.drop_index("ix_workspaces_name_trgm", table_name="workspaces")
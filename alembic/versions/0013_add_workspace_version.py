@@ -0,0 +1,26 @@
+"""add workspace version column
+
+Revision ID: 0013_add_workspace_version
+Revises: 0012_index_workspace_names
+Create Date: 2026-10-18T17:32:08-04:00
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0013_add_workspace_version"
+down_revision = "0012_index_workspace_names"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "workspaces",
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "version")
@@ -0,0 +1,37 @@
+"""create workspace revisions
+
+Revision ID: 0014_create_workspace_revisions
+Revises: 0013_add_workspace_version
+Create Date: 2026-10-18T18:21:45-04:00
+
+"""
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from alembic import op
+
+revision = "0014_create_workspace_revisions"
+down_revision = "0013_add_workspace_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workspace_revisions",
+        sa.Column("workspace_id", sa.String(length=36), primary_key=True),
+        sa.Column("version", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("delta", sa.LargeBinary(), nullable=True),
+        sa.Column("snapshot", sa.JSON().with_variant(JSONB(), "postgresql"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    # Existing workspaces start their history at their current version.
+    op.execute(
+        "INSERT INTO workspace_revisions (workspace_id, version, kind, snapshot, created_at) "
+        "SELECT id, version, 'snapshot', data, updated_at FROM workspaces"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("workspace_revisions")
@@ -0,0 +1,26 @@
+"""add workspace merkle tree columns
+
+Revision ID: 0015_add_workspace_data_tree
+Revises: 0014_create_workspace_revisions
+Create Date: 2026-10-18T19:04:37-04:00
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0015_add_workspace_data_tree"
+down_revision = "0014_create_workspace_revisions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows are hashed the first time they are diffed.
+    op.add_column("workspaces", sa.Column("data_digest", sa.String(length=32), nullable=True))
+    op.add_column("workspaces", sa.Column("data_tree", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "data_tree")
+    op.drop_column("workspaces", "data_digest")
@@ -0,0 +1,42 @@
+"""create shared workspace bodies for clones
+
+Revision ID: 0016_create_workspace_bodies
+Revises: 0015_add_workspace_data_tree
+Create Date: 2026-10-18T19:52:13-04:00
+
+"""
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from alembic import op
+
+revision = "0016_create_workspace_bodies"
+down_revision = "0015_add_workspace_data_tree"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workspace_bodies",
+        sa.Column("digest", sa.String(length=32), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("data", sa.JSON().with_variant(JSONB(), "postgresql"), nullable=False),
+    )
+    op.add_column("workspaces", sa.Column("body_digest", sa.String(length=32), nullable=True))
+    op.create_index("ix_workspaces_body_digest", "workspaces", ["body_digest"])
+    op.add_column(
+        "workspace_revisions", sa.Column("body_digest", sa.String(length=32), nullable=True)
+    )
+    op.create_index(
+        "ix_workspace_revisions_body_digest", "workspace_revisions", ["body_digest"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workspace_revisions_body_digest", table_name="workspace_revisions")
+    op.drop_column("workspace_revisions", "body_digest")
+    op.drop_index("ix_workspaces_body_digest", table_name="workspaces")
+    op.drop_column("workspaces", "body_digest")
+    op.drop_table("workspace_bodies")
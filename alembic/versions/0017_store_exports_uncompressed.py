@@ -0,0 +1,28 @@
+"""store materialized exports uncompressed so they can be read in ranges
+
+Revision ID: 0017_store_exports_uncompressed
+Revises: 0016_create_workspace_bodies
+Create Date: 2026-10-18T21:14:06-04:00
+
+"""
+from alembic import op
+
+revision = "0017_store_exports_uncompressed"
+down_revision = "0016_create_workspace_bodies"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # substr() on an EXTERNAL value fetches only the TOAST chunks it needs
+    # instead of decompressing the whole export. Existing values keep their
+    # compression until the export is next rewritten.
+    op.execute("ALTER TABLE workspaces ALTER COLUMN export_bytes SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE workspaces ALTER COLUMN export_bytes SET STORAGE EXTENDED")
@@ -0,0 +1,31 @@
+"""index shared workspace bodies for containment search
+
+Revision ID: 0018_index_workspace_bodies
+Revises: 0017_store_exports_uncompressed
+Create Date: 2026-10-18T21:52:40-04:00
+
+"""
+from alembic import op
+
+revision = "0018_index_workspace_bodies"
+down_revision = "0017_store_exports_uncompressed"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.create_index(
+        "ix_workspace_bodies_data_path_ops",
+        "workspace_bodies",
+        ["data"],
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_workspace_bodies_data_path_ops", table_name="workspace_bodies")
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import zipfile
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import BinaryIO
+
+from engine.bulk_import import import_workspaces, iter_import_entries, summarize
+from engine.db import create_engine, create_sessionmaker
+from engine.export import iter_ndjson_export, iter_zip_export
+from engine.models import WorkspaceRecord
+from engine.workspaces import stream_workspaces
+from web.settings import get_settings
+
+
+async def _export(args: argparse.Namespace, output: BinaryIO) -> int:
+    engine = create_engine(get_settings())
+    sessionmaker = create_sessionmaker(engine)
+    updated_since = datetime.fromisoformat(args.updated_since) if args.updated_since else None
+
+    async def records() -> AsyncIterator[WorkspaceRecord]:
+        async with sessionmaker() as session:
+            async for record in stream_workspaces(
+                session,
+                owner_id=args.owner_id,
+                updated_since=updated_since,
+            ):
+                yield record
+
+    chunks = iter_zip_export(records()) if args.format == "zip" else iter_ndjson_export(records())
+    try:
+        async for chunk in chunks:
+            output.write(chunk)
+    finally:
+        await engine.dispose()
+    output.flush()
+    return 0
+
+
+async def _import(args: argparse.Namespace) -> int:
+    engine = create_engine(get_settings())
+    sessionmaker = create_sessionmaker(engine)
+    try:
+        with open(args.path, "rb") as stream:
+            try:
+                entries = iter_import_entries(stream)
+            except zipfile.BadZipFile:
+                print(f"{args.path}: invalid zip archive", file=sys.stderr)
+                return 1
+            async with sessionmaker() as session:
+                results = await import_workspaces(
+                    session,
+                    entries,
+                    owner_id=args.owner_id,
+                    batch_size=args.batch_size,
+                )
+    finally:
+        await engine.dispose()
+
+    report = summarize(results)
+    if args.summary:
+        report.pop("results")
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["failed"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="OSCAL Wizard admin tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export workspaces as NDJSON or a zip archive")
+    export.add_argument("--format", choices=("ndjson", "zip"), default="ndjson")
+    export.add_argument("--output", "-o", help="Output file (defaults to stdout)")
+    export.add_argument("--owner-id", help="Only export workspaces owned by this user id")
+    export.add_argument(
+        "--updated-since",
+        help="Only export workspaces updated at or after this ISO 8601 timestamp",
+    )
+
+    bulk_import = commands.add_parser(
+        "import",
+        help="Import workspaces from an NDJSON file or a zip of JSON files",
+    )
+    bulk_import.add_argument("path", help="NDJSON file or zip archive")
+    bulk_import.add_argument("--owner-id", help="Owner user id for imported workspaces")
+    bulk_import.add_argument("--batch-size", type=int, default=500)
+    bulk_import.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print only the created/failed counts instead of the per-record report",
+    )
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "export":
+        if args.output:
+            with open(args.output, "wb") as output:
+                return asyncio.run(_export(args, output))
+        return asyncio.run(_export(args, sys.stdout.buffer))
+    if args.command == "import":
+        return asyncio.run(_import(args))
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
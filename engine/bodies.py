@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import typing
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    CursorResult,
+    Insert,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from engine.db import replica_ok
+from engine.models import WorkspaceBody, WorkspaceRecord, WorkspaceRevision
+from engine.patch import json_equal
+
+# Unreferenced bodies are kept this long after used_at, which a clone leaves
+# at most half this old, so a clone that is still committing never loses its
+# body to release_bodies.
+BODY_GRACE = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class CloneStorage:
+    """Space used by shared bodies, and what full copies would have used on top."""
+
+    clones: int
+    bodies: int
+    body_bytes: int
+    private_bytes: int
+    saved_bytes: int
+
+
+def full_document(data: dict[str, Any], body: dict[str, Any] | None) -> dict[str, Any]:
+    """A workspace's document: its shared body, if any, overlaid with ``data``."""
+
+    return data if body is None else {**body, **data}
+
+
+def private_sections(document: dict[str, Any], body: dict[str, Any]) -> dict[str, Any] | None:
+    """The top-level sections of ``document`` a clone has to store itself.
+
+    None if the document drops a section of the body, which an overlay
+    cannot express; the clone then stores the whole document.
+    """
+
+    if any(key not in document for key in body):
+        return None
+    return {
+        key: value
+        for key, value in document.items()
+        if key not in body or not json_equal(value, body[key])
+    }
+
+
+def full_document_expression() -> ColumnElement[Any]:
+    """PostgreSQL expression for a workspace's full document (``body || data``)."""
+
+    data = type_coerce(WorkspaceRecord.data, JSONB)
+    body = (
+        select(type_coerce(WorkspaceBody.data, JSONB))
+        .where(WorkspaceBody.digest == WorkspaceRecord.body_digest)
+        .scalar_subquery()
+    )
+    return case(
+        (WorkspaceRecord.body_digest.is_(None), data),
+        else_=body.op("||", return_type=JSONB)(data),
+    )
+
+
+async def load_bodies(
+    session: AsyncSession,
+    digests: Iterable[str | None],
+    *,
+    replica: bool = False,
+) -> dict[str, dict[str, Any]]:
+    """Shared bodies by digest.
+
+    With ``replica``, bodies a lagging replica has not seen yet are read
+    from the primary.
+    """
+
+    wanted = {digest for digest in digests if digest is not None}
+    bodies: dict[str, dict[str, Any]] = {}
+    for from_replica in (True, False) if replica else (False,):
+        missing = wanted - bodies.keys()
+        if not missing:
+            break
+        statement = select(WorkspaceBody.digest, WorkspaceBody.data).where(
+            WorkspaceBody.digest.in_(missing)
+        )
+        result = await session.execute(replica_ok(statement) if from_replica else statement)
+        bodies.update((row.digest, row.data) for row in result)
+    return bodies
+
+
+async def attach_bodies(
+    session: AsyncSession,
+    records: Sequence[WorkspaceRecord],
+    bodies: dict[str, dict[str, Any]] | None = None,
+) -> None:
+    """Give loaded clones their full document in ``data``.
+
+    The value is set as if it had been loaded, so it is never flushed back
+    over the clone's private sections. ``bodies`` caches bodies across calls.
+    """
+
+    clones = [record for record in records if record.body_digest is not None]
+    if not clones:
+        return
+    if bodies is None:
+        bodies = {}
+    missing = {record.body_digest for record in clones} - bodies.keys()
+    bodies.update(await load_bodies(session, missing, replica=True))
+    for record in clones:
+        assert record.body_digest is not None
+        document = full_document(record.data, bodies[record.body_digest])
+        set_committed_value(record, "data", document)
+
+
+async def store_body(
+    session: AsyncSession,
+    digest: str,
+    workspace_id: str,
+    version: int,
+) -> bool:
+    """Make ``digest`` available as a body, copying the workspace's data if needed.
+
+    The copy is an INSERT ... SELECT, so the document never leaves the
+    database, and it is skipped when the body is already stored. A stored
+    body's used_at is only pushed forward once it is half the grace period
+    old, so most clones do not write to the body row at all. Returns False
+    if the body is missing and the workspace is no longer at ``version``.
+    """
+
+    now = datetime.now(timezone.utc)
+    fresh = await session.scalar(
+        select(WorkspaceBody.used_at >= now - BODY_GRACE / 2).where(
+            WorkspaceBody.digest == digest
+        )
+    )
+    if fresh is not None:
+        if not fresh:
+            await session.execute(
+                update(WorkspaceBody).where(WorkspaceBody.digest == digest).values(used_at=now)
+            )
+        return True
+
+    columns = ["digest", "created_at", "used_at", "data"]
+    source = select(
+        literal(digest),
+        literal(now, WorkspaceBody.created_at.type),
+        literal(now, WorkspaceBody.used_at.type),
+        WorkspaceRecord.data,
+    ).where(
+        WorkspaceRecord.id == workspace_id,
+        WorkspaceRecord.version == version,
+        WorkspaceRecord.body_digest.is_(None),
+    )
+    dialect_name = session.get_bind().dialect.name
+    statement: Insert
+    if dialect_name == "postgresql":
+        statement = (
+            postgresql_insert(WorkspaceBody)
+            .from_select(columns, source)
+            .on_conflict_do_update(index_elements=[WorkspaceBody.digest], set_={"used_at": now})
+        )
+    elif dialect_name == "sqlite":
+        statement = (
+            sqlite_insert(WorkspaceBody)
+            .from_select(columns, source)
+            .on_conflict_do_update(index_elements=[WorkspaceBody.digest], set_={"used_at": now})
+        )
+    else:
+        statement = insert(WorkspaceBody).from_select(columns, source)
+    inserted = await session.execute(statement)
+    return bool(typing.cast(CursorResult[Any], inserted).rowcount)
+
+
+async def release_bodies(session: AsyncSession) -> None:
+    """Delete bodies no workspace or revision refers to any more."""
+
+    await session.execute(
+        delete(WorkspaceBody).where(
+            WorkspaceBody.used_at < datetime.now(timezone.utc) - BODY_GRACE,
+            ~exists().where(WorkspaceRecord.body_digest == WorkspaceBody.digest),
+            ~exists().where(WorkspaceRevision.body_digest == WorkspaceBody.digest),
+        )
+    )
+
+
+async def clone_storage(session: AsyncSession) -> CloneStorage:
+    """Bytes stored for shared bodies and clones, and the bytes sharing saved.
+
+    Every workspace or revision snapshot that refers to a body would
+    otherwise hold its own copy. Sizes are pg_column_size on PostgreSQL and
+    the stored JSON text length elsewhere.
+    """
+
+    def size(column: Any) -> ColumnElement[int]:
+        if session.get_bind().dialect.name == "postgresql":
+            return func.pg_column_size(column)
+        return func.length(column)
+
+    references = (
+        select(WorkspaceRecord.body_digest.label("digest"))
+        .where(WorkspaceRecord.body_digest.is_not(None))
+        .union_all(
+            select(WorkspaceRevision.body_digest).where(WorkspaceRevision.body_digest.is_not(None))
+        )
+        .subquery()
+    )
+    counts = (
+        select(references.c.digest, func.count().label("refs"))
+        .group_by(references.c.digest)
+        .subquery()
+    )
+    bodies = (
+        await session.execute(
+            replica_ok(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(size(WorkspaceBody.data)), 0),
+                    func.coalesce(
+                        func.sum(size(WorkspaceBody.data) * (func.coalesce(counts.c.refs, 0) - 1)),
+                        0,
+                    ),
+                )
+                .select_from(WorkspaceBody)
+                .outerjoin(counts, counts.c.digest == WorkspaceBody.digest)
+            )
+        )
+    ).one()
+    clones = (
+        await session.execute(
+            replica_ok(
+                select(
+                    func.count(), func.coalesce(func.sum(size(WorkspaceRecord.data)), 0)
+                ).where(WorkspaceRecord.body_digest.is_not(None))
+            )
+        )
+    ).one()
+    return CloneStorage(
+        clones=int(clones[0]),
+        bodies=int(bodies[0]),
+        body_bytes=int(bodies[1]),
+        private_bytes=int(clones[1]),
+        saved_bytes=int(bodies[2]),
+    )
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import zipfile
+import zlib
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Any
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from engine.executor import SerializationExecutor
+from engine.workspace import WorkspaceValidationError, validate_workspace_payload
+from engine.workspaces import insert_workspaces, workspace_values
+
+DEFAULT_BATCH_SIZE = 500
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+@dataclass(frozen=True)
+class ImportEntry:
+    index: int
+    source: str
+    payload: Any = None
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    index: int
+    source: str
+    workspace_id: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "index": self.index,
+            "source": self.source,
+            "status": "created" if self.ok else "error",
+        }
+        if self.workspace_id is not None:
+            result["workspace_id"] = self.workspace_id
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+
+
+@dataclass
+class PreparedBatch:
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    pending: list[ImportResult] = field(default_factory=list)
+    failures: list[ImportResult] = field(default_factory=list)
+
+
+def unwrap_export(payload: Any) -> Any:
+    """Accept documents in the export envelope as well as bare payloads."""
+
+    if isinstance(payload, dict) and payload.keys() == {"workspace"}:
+        return payload["workspace"]
+    return payload
+
+
+def iter_ndjson_entries(stream: IO[bytes]) -> Iterator[ImportEntry]:
+    index = 0
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        source = f"line {line_number}"
+        try:
+            payload = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            yield ImportEntry(index=index, source=source, error="Invalid JSON")
+        else:
+            yield ImportEntry(index=index, source=source, payload=payload)
+        index += 1
+
+
+def iter_zip_entries(stream: IO[bytes]) -> Iterator[ImportEntry]:
+    """Entries of a zip archive, opened now so a corrupt one raises BadZipFile here."""
+
+    return _iter_archive(zipfile.ZipFile(stream))
+
+
+def _iter_archive(archive: zipfile.ZipFile) -> Iterator[ImportEntry]:
+    with archive:
+        index = 0
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith(".json"):
+                continue
+            try:
+                with archive.open(info) as member:
+                    payload = json.load(member)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                yield ImportEntry(index=index, source=info.filename, error="Invalid JSON")
+            except (zipfile.BadZipFile, zlib.error):
+                yield ImportEntry(index=index, source=info.filename, error="Corrupt archive entry")
+            else:
+                yield ImportEntry(index=index, source=info.filename, payload=payload)
+            index += 1
+
+
+def iter_import_entries(stream: IO[bytes]) -> Iterator[ImportEntry]:
+    """Yield entries from a zip archive or an NDJSON stream, by content sniffing.
+
+    Raises zipfile.BadZipFile before yielding anything if the archive is corrupt.
+    """
+
+    magic = stream.read(len(ZIP_MAGIC))
+    stream.seek(0)
+    if magic == ZIP_MAGIC:
+        return iter_zip_entries(stream)
+    return iter_ndjson_entries(stream)
+
+
+def prepare_batch(
+    entries: Iterator[ImportEntry],
+    size: int,
+    owner_id: str | None = None,
+) -> PreparedBatch | None:
+    """Validate and materialize the next size entries; None once exhausted."""
+
+    batch = list(islice(entries, size))
+    if not batch:
+        return None
+    prepared = PreparedBatch()
+    for entry in batch:
+        if entry.error is not None:
+            prepared.failures.append(
+                ImportResult(index=entry.index, source=entry.source, error=entry.error)
+            )
+            continue
+        try:
+            workspace = validate_workspace_payload(unwrap_export(entry.payload))
+        except WorkspaceValidationError as exc:
+            prepared.failures.append(
+                ImportResult(index=entry.index, source=entry.source, error=str(exc))
+            )
+            continue
+        values = workspace_values(
+            name=workspace.system_name,
+            system_id=workspace.system_id,
+            data=workspace.to_export_payload(),
+            created_at=workspace.created_at,
+            owner_id=owner_id,
+        )
+        prepared.rows.append(values)
+        prepared.pending.append(
+            ImportResult(index=entry.index, source=entry.source, workspace_id=values["id"])
+        )
+    return prepared
+
+
+async def commit_batch(session: AsyncSession, prepared: PreparedBatch) -> list[ImportResult]:
+    try:
+        await insert_workspaces(session, prepared.rows)
+    except SQLAlchemyError:
+        await session.rollback()
+        failed = [
+            ImportResult(index=result.index, source=result.source, error="Database error")
+            for result in prepared.pending
+        ]
+        return sorted(prepared.failures + failed, key=lambda result: result.index)
+    return sorted(prepared.failures + prepared.pending, key=lambda result: result.index)
+
+
+async def import_workspaces(
+    session: AsyncSession,
+    entries: Iterator[ImportEntry],
+    *,
+    owner_id: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    executor: SerializationExecutor | None = None,
+    on_batch: Callable[[list[ImportResult]], Awaitable[None]] | None = None,
+) -> list[ImportResult]:
+    """Import entries in batches of multi-row INSERTs, one transaction per batch.
+
+    With an executor, reading, validating and encoding each batch happens
+    off the event loop.
+    """
+
+    results: list[ImportResult] = []
+    while True:
+        if executor is None:
+            prepared = prepare_batch(entries, batch_size, owner_id)
+        else:
+            prepared = await executor.run(prepare_batch, entries, batch_size, owner_id)
+        if prepared is None:
+            return results
+        batch_results = await commit_batch(session, prepared)
+        results.extend(batch_results)
+        if on_batch is not None:
+            await on_batch(batch_results)
+
+
+def summarize(results: list[ImportResult]) -> dict[str, Any]:
+    created = sum(1 for result in results if result.ok)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": [result.to_dict() for result in results],
+    }
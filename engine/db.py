@@ -1,23 +1,214 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import bisect
+import itertools
+import time
+from collections.abc import AsyncGenerator, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, TypeVar
 
+from sqlalchemy import Engine, exc
+from sqlalchemy.engine import Connection, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection, QueuePool
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.dml import UpdateBase
 
 from web.settings import Settings
 
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+REPLICA_OK = "replica_ok"
 
-def create_engine(settings: Settings) -> AsyncEngine:
-    return create_async_engine(settings.database_url, pool_pre_ping=True)
+ExecutableT = TypeVar("ExecutableT", bound=Executable)
 
 
-def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
-    return async_sessionmaker(engine, expire_on_commit=False)
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    overflow_events: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    wait_histogram: list[int] = field(default_factory=lambda: [0] * (len(WAIT_BUCKETS_MS) + 1))
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.wait_histogram[bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout wait times, overflow and timeouts.
+
+    Wait time covers the whole checkout: queueing for a free connection,
+    opening an overflow connection and any pre-ping.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        if self.overflow() > max(overflow, 0):
+            self.stats.overflow_events += 1
+        return connection
+
+    def recreate(self) -> QueuePool:
+        pool = super().recreate()
+        if isinstance(pool, InstrumentedAsyncQueuePool):
+            pool.stats = self.stats
+        return pool
+
+
+def engine_options(settings: Settings, url: str | None = None) -> dict[str, Any]:
+    parsed = make_url(url or settings.database_url)
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
+def create_engine(settings: Settings, url: str | None = None) -> AsyncEngine:
+    url = url or settings.database_url
+    return create_async_engine(url, **engine_options(settings, url))
+
+
+def create_replica_engines(settings: Settings) -> list[AsyncEngine]:
+    return [create_engine(settings, url) for url in settings.database_replica_url_list()]
+
+
+def replica_ok(statement: ExecutableT) -> ExecutableT:
+    """Mark a read-only statement as safe to answer from a replica."""
+
+    return statement.execution_options(**{REPLICA_OK: True})
+
+
+@dataclass
+class ReadRouting:
+    """Per-request routing state shared with every session the request opens.
+
+    ``primary_only`` pins all reads to the primary (read-your-writes);
+    ``wrote`` is set once any session in the request writes.
+    """
+
+    primary_only: bool = False
+    wrote: bool = False
+
+
+_read_routing: ContextVar[ReadRouting | None] = ContextVar("read_routing", default=None)
+
+
+@contextmanager
+def read_routing(*, primary_only: bool = False) -> Iterator[ReadRouting]:
+    routing = ReadRouting(primary_only=primary_only)
+    token = _read_routing.set(routing)
+    try:
+        yield routing
+    finally:
+        _read_routing.reset(token)
+
+
+class ReplicaSet:
+    def __init__(self, engines: Sequence[AsyncEngine]) -> None:
+        self.engines = list(engines)
+        self._next = itertools.cycle([engine.sync_engine for engine in self.engines])
+        self.reads = 0
+
+    def next(self) -> Engine:
+        self.reads += 1
+        return next(self._next)
+
+
+class RoutingSession(Session):
+    """Session that answers ``replica_ok`` statements from a replica.
+
+    Everything else, including flushes and DML, goes to the primary. Once a
+    session has written, or when the current request is pinned to the
+    primary, its reads stay on the primary too.
+    """
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        *,
+        clause: ClauseElement | None = None,
+        **kw: Any,
+    ) -> Engine | Connection:
+        replicas: ReplicaSet | None = self.info.get("replicas")
+        if replicas is not None:
+            routing = _read_routing.get()
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info["wrote"] = True
+                if routing is not None:
+                    routing.wrote = True
+            elif (
+                isinstance(clause, Executable)
+                and clause.get_execution_options().get(REPLICA_OK)
+                and not self.info.get("wrote")
+                and not (routing is not None and routing.primary_only)
+            ):
+                return replicas.next()
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def create_sessionmaker(
+    engine: AsyncEngine,
+    replicas: Sequence[AsyncEngine] = (),
+) -> async_sessionmaker[AsyncSession]:
+    if not replicas:
+        return async_sessionmaker(engine, expire_on_commit=False)
+    return async_sessionmaker(
+        engine,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        info={"replicas": ReplicaSet(replicas)},
+    )
+
+
+def pool_metrics(engine: AsyncEngine) -> dict[str, Any]:
+    pool: Pool = engine.sync_engine.pool
+    metrics: dict[str, Any] = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats = asdict(pool.stats)
+        stats["wait_buckets_ms"] = list(WAIT_BUCKETS_MS)
+        metrics["stats"] = stats
+    return metrics
 
 
 async def get_session(
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+
+def _call_timed(func: Callable[..., T], *args: Any) -> tuple[T, float]:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+@dataclass
+class ModeMetrics:
+    submitted: int = 0
+    completed: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    busy_seconds: float = 0.0
+
+
+class SerializationExecutor:
+    """Run CPU-bound (de)serialization off the event loop.
+
+    Payloads up to ``inline_max_bytes`` run inline, since a pool hop costs
+    more than encoding them. Larger payloads go to a thread pool, and
+    payloads of at least ``process_min_bytes`` go to a process pool so they
+    do not contend for the GIL. A ``process_min_bytes`` of 0 disables the
+    process pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        inline_max_bytes: int = 64 * 1024,
+        process_min_bytes: int = 0,
+        max_threads: int = 4,
+        max_processes: int = 2,
+    ) -> None:
+        self.inline_max_bytes = inline_max_bytes
+        self.process_min_bytes = process_min_bytes
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._metrics = {mode: ModeMetrics() for mode in (INLINE, THREAD, PROCESS)}
+
+    def choose_mode(self, size: int | None) -> str:
+        if size is None:
+            return THREAD
+        if size <= self.inline_max_bytes:
+            return INLINE
+        if self.process_min_bytes and size >= self.process_min_bytes:
+            return PROCESS
+        return THREAD
+
+    def _pool(self, mode: str) -> Executor:
+        if mode == PROCESS:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.max_processes)
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.max_threads,
+                thread_name_prefix="serialize",
+            )
+        return self._threads
+
+    async def _submit(self, mode: str, func: Callable[..., T], *args: Any) -> T:
+        metrics = self._metrics[mode]
+        metrics.submitted += 1
+        if mode == INLINE:
+            result, elapsed = _call_timed(func, *args)
+        else:
+            metrics.in_flight += 1
+            metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+            loop = asyncio.get_running_loop()
+            try:
+                result, elapsed = await loop.run_in_executor(
+                    self._pool(mode), _call_timed, func, *args
+                )
+            finally:
+                metrics.in_flight -= 1
+        metrics.completed += 1
+        metrics.busy_seconds += elapsed
+        return result
+
+    async def run(self, func: Callable[..., T], *args: Any, size: int | None = None) -> T:
+        """Call func(*args) in the mode chosen for a payload of size bytes.
+
+        Process-pool calls must use picklable module-level functions.
+        """
+
+        return await self._submit(self.choose_mode(size), func, *args)
+
+    async def iterate(
+        self,
+        iterator: Iterator[bytes],
+        *,
+        size: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Drain a chunk iterator, advancing it off the event loop.
+
+        Generators cannot cross process boundaries, so anything too large to
+        run inline is advanced in the thread pool.
+        """
+
+        mode = INLINE if self.choose_mode(size) == INLINE else THREAD
+        while True:
+            chunk = await self._submit(mode, next, iterator, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def metrics(self) -> dict[str, Any]:
+        modes = {mode: asdict(metrics) for mode, metrics in self._metrics.items()}
+        threads = self._metrics[THREAD].in_flight
+        processes = self._metrics[PROCESS].in_flight
+        return {
+            "queue_depth": threads + processes,
+            "waiting": max(0, threads - self.max_threads)
+            + max(0, processes - self.max_processes),
+            "off_loop_seconds": (
+                self._metrics[THREAD].busy_seconds + self._metrics[PROCESS].busy_seconds
+            ),
+            "modes": modes,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+            self._processes = None
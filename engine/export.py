@@ -1,17 +1,171 @@
 from __future__ import annotations
 
 import json
+import zipfile
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
 from typing import Any
 
+from engine.executor import SerializationExecutor
+from engine.models import WorkspaceRecord
 from engine.workspace import Workspace
 
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+_COMPACT_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+_PRETTY_ENCODER = json.JSONEncoder(sort_keys=True, indent=2)
+
+
+def iter_canonical_json(
+    payload: Any,
+    *,
+    pretty: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the canonical JSON encoding of payload in UTF-8 chunks.
+
+    The concatenated chunks are byte-identical to
+    ``json.dumps(payload, sort_keys=True, ...)`` with the compact or indented
+    separators, but the document is never held in memory as a whole.
+    """
+
+    encoder = _PRETTY_ENCODER if pretty else _COMPACT_ENCODER
+    buffer: list[str] = []
+    size = 0
+    for part in encoder.iterencode(payload):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def export_document(data: dict[str, Any]) -> bytes:
+    """Return the compact export served for a stored workspace document."""
+
+    return b"".join(iter_canonical_json({"workspace": data}))
+
+
+def pretty_json(data: Any) -> str:
+    return json.dumps(data, sort_keys=True, indent=2)
+
+
+def export_payload(workspace: Workspace) -> dict[str, Any]:
+    return {"workspace": workspace.to_export_payload()}
+
+
+def iter_export_workspace(workspace: Workspace) -> Iterator[bytes]:
+    yield from iter_canonical_json(export_payload(workspace))
+    yield b"\n"
+
 
 def export_workspace(workspace: Workspace) -> bytes:
-    payload: dict[str, Any] = {
-        "workspace": workspace.to_export_payload(),
-    }
-    return json.dumps(
-        payload,
-        sort_keys=True,
-        separators=(",", ":"),
-    ).encode("utf-8") + b"\n"
+    return b"".join(iter_export_workspace(workspace))
+
+
+def export_filename(system_id: str) -> str:
+    return f"workspace-{system_id}.json"
+
+
+async def _drain(
+    chunks: Iterator[bytes],
+    executor: SerializationExecutor | None,
+    size: int | None,
+) -> AsyncIterator[bytes]:
+    if executor is None:
+        for chunk in chunks:
+            yield chunk
+        return
+    async for chunk in executor.iterate(chunks, size=size):
+        yield chunk
+
+
+def _iter_ndjson_line(data: dict[str, Any]) -> Iterator[bytes]:
+    yield from iter_canonical_json({"workspace": data})
+    yield b"\n"
+
+
+async def iter_ndjson_export(
+    records: AsyncIterable[WorkspaceRecord],
+    *,
+    executor: SerializationExecutor | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield one canonical export line per record.
+
+    With an executor, each record is encoded off the event loop.
+    """
+
+    async for record in records:
+        async for chunk in _drain(
+            _iter_ndjson_line(record.data), executor, record.payload_bytes
+        ):
+            yield chunk
+
+
+class _ZipSink:
+    """Write-only file object that hands zip output back to the caller."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _iter_zip_entry(
+    archive: zipfile.ZipFile,
+    sink: _ZipSink,
+    name: str,
+    data: dict[str, Any],
+) -> Iterator[bytes]:
+    with archive.open(name, mode="w", force_zip64=True) as entry:
+        for chunk in iter_canonical_json({"workspace": data}):
+            entry.write(chunk)
+            output = sink.drain()
+            if output:
+                yield output
+    output = sink.drain()
+    if output:
+        yield output
+
+
+async def iter_zip_export(
+    records: AsyncIterable[WorkspaceRecord],
+    *,
+    executor: SerializationExecutor | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield a zip archive with one export entry per record.
+
+    With an executor, each entry is encoded and deflated off the event loop.
+    Entries are written one at a time, so the archive is never touched from
+    two threads at once.
+    """
+
+    sink = _ZipSink()
+    seen: set[str] = set()
+    # The sink cannot seek, so zipfile writes data descriptors after each
+    # entry and nothing but the current chunk is buffered.
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for record in records:
+            name = export_filename(record.system_id)
+            if name in seen:
+                name = export_filename(f"{record.system_id}-{record.id}")
+            seen.add(name)
+            entry = _iter_zip_entry(archive, sink, name, record.data)
+            async for data in _drain(entry, executor, record.payload_bytes):
+                yield data
+    yield sink.drain()
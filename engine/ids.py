@@ -1,10 +1,22 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
+
+
+def content_digest(data: bytes) -> str:
+    """Return the SHA-256 hex digest of data."""
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def verify_content_digest(data: bytes, digest: str) -> bool:
+    """Return whether digest is the SHA-256 hex digest of data."""
+
+    return hmac.compare_digest(content_digest(data), digest)
 
 
 def deterministic_id(seed: str) -> str:
     """Return a stable identifier derived from input seed."""
 
-    digest = hashlib.sha256(seed.encode("utf-8")).hexdigest()
-    return digest[:32]
+    return content_digest(seed.encode("utf-8"))[:32]
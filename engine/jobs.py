@@ -0,0 +1,540 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+import typing
+import zipfile
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Iterable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import CursorResult, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from engine.bulk_import import ImportResult, import_workspaces, iter_import_entries
+from engine.executor import SerializationExecutor
+from engine.export import iter_ndjson_export, iter_zip_export
+from engine.models import Job, WorkspaceRecord
+from engine.workspace import WorkspaceValidationError, validate_workspace_payload
+from engine.workspaces import (
+    count_workspaces,
+    refresh_workspace_export,
+    stale_workspaces,
+    stream_workspaces,
+    verify_workspace_export,
+)
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+IMPORT = "import"
+EXPORT = "export"
+VALIDATE = "validate"
+MATERIALIZE = "materialize"
+
+PROGRESS_INTERVAL_SECONDS = 1.0
+# Runners touch their unfinished jobs this often; a queued or running job
+# left untouched for HEARTBEAT_MISSES intervals lost its worker and is failed.
+HEARTBEAT_SECONDS = 30.0
+HEARTBEAT_MISSES = 3
+# Export artifacts are deleted by the heartbeat this long after they were written.
+ARTIFACT_TTL_SECONDS = 24 * 60 * 60.0
+ARTIFACT_SUFFIXES = (".ndjson", ".zip")
+MAX_REPORTED_FAILURES = 100
+
+
+async def create_job(
+    session: AsyncSession,
+    *,
+    kind: str,
+    owner_id: str | None = None,
+    params: dict[str, Any] | None = None,
+) -> Job:
+    now = datetime.now(timezone.utc)
+    job = Job(
+        kind=kind,
+        status=QUEUED,
+        owner_id=owner_id,
+        params=params,
+        progress=0,
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: str) -> Job | None:
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def update_job(
+    session: AsyncSession,
+    job_id: str,
+    *,
+    expected_status: str | None = None,
+    **values: Any,
+) -> bool:
+    """Update a job, only while it has ``expected_status`` if one is given.
+
+    Returns whether the job was updated.
+    """
+
+    values["updated_at"] = datetime.now(timezone.utc)
+    if values.get("status") in (SUCCEEDED, FAILED):
+        values["finished_at"] = values["updated_at"]
+    statement = update(Job).where(Job.id == job_id)
+    if expected_status is not None:
+        statement = statement.where(Job.status == expected_status)
+    result = await session.execute(statement.values(**values))
+    await session.commit()
+    return bool(typing.cast(CursorResult[Any], result).rowcount)
+
+
+async def touch_jobs(session: AsyncSession, job_ids: Collection[str]) -> None:
+    if not job_ids:
+        return
+    await session.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.status.in_([QUEUED, RUNNING]))
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+
+
+async def fail_orphaned_jobs(session: AsyncSession, stale_before: datetime) -> int:
+    """Fail queued or running jobs untouched since ``stale_before``; returns how many."""
+
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        update(Job)
+        .where(Job.status.in_([QUEUED, RUNNING]), Job.updated_at < stale_before)
+        .values(
+            status=FAILED,
+            error="Interrupted: the worker running this job stopped",
+            updated_at=now,
+            finished_at=now,
+        )
+    )
+    await session.commit()
+    return int(typing.cast(CursorResult[Any], result).rowcount)
+
+
+async def active_job_ids(session: AsyncSession) -> set[str]:
+    result = await session.scalars(select(Job.id).where(Job.status.in_([QUEUED, RUNNING])))
+    return set(result)
+
+
+def expire_artifacts(artifact_dir: Path, expires_before: float, keep: Collection[str]) -> int:
+    """Delete export artifacts last written before ``expires_before``; returns how many.
+
+    ``expires_before`` is a POSIX timestamp. Artifacts of the ``keep`` jobs,
+    which may still be writing them, are left alone, as is anything in the
+    directory that is not an export artifact.
+    """
+
+    if not artifact_dir.is_dir():
+        return 0
+    expired = 0
+    for path in artifact_dir.iterdir():
+        if path.suffix not in ARTIFACT_SUFFIXES or path.stem in keep:
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            if path.stat().st_mtime < expires_before:
+                path.unlink()
+                expired += 1
+    return expired
+
+
+def job_to_dict(job: Job) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class JobError(Exception):
+    """A job stopped on bad input; recorded as its error without a traceback."""
+
+
+class JobContext:
+    """Handle passed to a running job for progress reporting and resources."""
+
+    def __init__(self, runner: JobRunner, job_id: str) -> None:
+        self.runner = runner
+        self.job_id = job_id
+        self.progress = 0
+        self.total: int | None = None
+        self._reported_at = 0.0
+
+    @property
+    def sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        return self.runner.sessionmaker
+
+    @property
+    def executor(self) -> SerializationExecutor | None:
+        return self.runner.executor
+
+    def artifact_path(self, suffix: str) -> Path:
+        return self.runner.artifact_dir / f"{self.job_id}{suffix}"
+
+    async def report(self, progress: int, total: int | None = None, *, force: bool = False) -> None:
+        """Record progress, writing it out at most once per PROGRESS_INTERVAL_SECONDS."""
+
+        self.progress = progress
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if not force and now - self._reported_at < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._reported_at = now
+        async with self.sessionmaker() as session:
+            await update_job(session, self.job_id, progress=self.progress, total=self.total)
+
+
+JobBody = Callable[[JobContext], Awaitable[dict[str, Any]]]
+
+
+class JobRunner:
+    """Run persisted jobs as asyncio tasks with per-kind concurrency limits.
+
+    Jobs beyond a kind's limit stay queued until a slot frees up, so a burst
+    of heavy imports or exports cannot take over the worker. Once started,
+    the runner heartbeats its own jobs and fails jobs whose worker died, so
+    a crash or restart never leaves a job running forever, and deletes export
+    artifacts older than ``artifact_ttl_seconds``. It also runs the
+    MATERIALIZE jobs queued through ``materialize``, one at a time.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        *,
+        limits: dict[str, int],
+        artifact_dir: Path,
+        artifact_ttl_seconds: float = ARTIFACT_TTL_SECONDS,
+        executor: SerializationExecutor | None = None,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    ) -> None:
+        self.sessionmaker = sessionmaker
+        self.executor = executor
+        self.artifact_dir = artifact_dir
+        self.artifact_ttl_seconds = artifact_ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._heartbeat_task: asyncio.Task[None] | None = None
+        self._materialize_task: asyncio.Task[None] | None = None
+        self._materialize_ids: set[str] = set()
+        self._materialize_requested = asyncio.Event()
+        self._limits = dict(limits)
+        self._semaphores = {kind: asyncio.Semaphore(limit) for kind, limit in limits.items()}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._waiting: dict[str, int] = {kind: 0 for kind in limits}
+        self._running: dict[str, int] = {kind: 0 for kind in limits}
+
+    async def submit(
+        self,
+        kind: str,
+        body: JobBody,
+        *,
+        owner_id: str | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        if kind not in self._semaphores:
+            raise ValueError(f"Unknown job kind: {kind}")
+        async with self.sessionmaker() as session:
+            job = await create_job(session, kind=kind, owner_id=owner_id, params=params)
+        task = asyncio.create_task(self._run(job.id, kind, body), name=f"job-{job.id}")
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job.id
+
+    async def _run(self, job_id: str, kind: str, body: JobBody) -> None:
+        context = JobContext(self, job_id)
+        semaphore = self._semaphores[kind]
+        self._waiting[kind] += 1
+        try:
+            await semaphore.acquire()
+        except asyncio.CancelledError:
+            await self._interrupted(job_id)
+            raise
+        finally:
+            self._waiting[kind] -= 1
+        self._running[kind] += 1
+        try:
+            await self._execute(context, body)
+        finally:
+            self._running[kind] -= 1
+            semaphore.release()
+
+    async def _interrupted(self, job_id: str) -> None:
+        await self._failed(job_id, "Interrupted by shutdown")
+
+    async def _failed(self, job_id: str, error: str) -> None:
+        async with self.sessionmaker() as session:
+            await update_job(session, job_id, status=FAILED, error=error)
+
+    async def _execute(self, context: JobContext, body: JobBody) -> None:
+        async with self.sessionmaker() as session:
+            await update_job(session, context.job_id, status=RUNNING)
+        try:
+            result = await body(context)
+        except asyncio.CancelledError:
+            await self._interrupted(context.job_id)
+            raise
+        except JobError as exc:
+            await self._failed(context.job_id, str(exc))
+            return
+        except Exception as exc:
+            logger.exception("Job %s failed", context.job_id)
+            await self._failed(context.job_id, str(exc))
+            return
+        async with self.sessionmaker() as session:
+            # Another worker's heartbeat may have failed the job as orphaned
+            # while it ran; that verdict stands.
+            succeeded = await update_job(
+                session,
+                context.job_id,
+                expected_status=RUNNING,
+                status=SUCCEEDED,
+                progress=context.progress,
+                total=context.total,
+                result=result,
+            )
+        if not succeeded:
+            logger.warning("Job %s finished after it was no longer running", context.job_id)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            kind: {
+                "limit": self._limits[kind],
+                "running": self._running[kind],
+                "waiting": self._waiting[kind],
+            }
+            for kind in self._limits
+        }
+
+    async def heartbeat(self) -> int:
+        """Touch this runner's jobs, then fail other workers' abandoned ones.
+
+        Also deletes expired export artifacts of jobs that are no longer
+        queued or running. Returns how many jobs were failed.
+        """
+
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=self.heartbeat_seconds * HEARTBEAT_MISSES
+        )
+        async with self.sessionmaker() as session:
+            await touch_jobs(session, list(self._tasks))
+            failed = await fail_orphaned_jobs(session, stale_before)
+            active = await active_job_ids(session)
+        if failed:
+            logger.warning("Failed %d jobs interrupted by a stopped worker", failed)
+        expired = expire_artifacts(
+            self.artifact_dir,
+            time.time() - self.artifact_ttl_seconds,
+            active | set(self._tasks),
+        )
+        if expired:
+            logger.info("Deleted %d expired export artifacts", expired)
+        return failed
+
+    async def _heartbeat_forever(self) -> None:
+        while True:
+            try:
+                await self.heartbeat()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+            await asyncio.sleep(self.heartbeat_seconds)
+
+    def materialize(self, workspace_ids: Iterable[str]) -> None:
+        """Rematerialize workspaces whose derived columns a SQL-side edit cleared.
+
+        Only records the ids; once started, the runner submits them as a
+        MATERIALIZE job. Ids queued while that job runs are coalesced into
+        the next one, so a burst of edits to one workspace encodes it once.
+        """
+
+        self._materialize_ids.update(workspace_ids)
+        if self._materialize_ids:
+            self._materialize_requested.set()
+
+    async def _materialize_forever(self) -> None:
+        while True:
+            await self._materialize_requested.wait()
+            self._materialize_requested.clear()
+            workspace_ids, self._materialize_ids = sorted(self._materialize_ids), set()
+            try:
+                job_id = await self.submit(
+                    MATERIALIZE,
+                    materialize_job(workspace_ids),
+                    params={"workspaces": len(workspace_ids)},
+                )
+            except Exception:
+                logger.exception("Could not queue %d workspaces to materialize", len(workspace_ids))
+                self._materialize_ids.update(workspace_ids)
+                await asyncio.sleep(self.heartbeat_seconds)
+                self._materialize_requested.set()
+                continue
+            task = self._tasks.get(job_id)
+            if task is not None:
+                await asyncio.wait([task])
+
+    def start(self) -> None:
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_forever())
+        if self._materialize_task is None and MATERIALIZE in self._limits:
+            self._materialize_task = asyncio.create_task(self._materialize_forever())
+
+    async def shutdown(self) -> None:
+        for background in (self._heartbeat_task, self._materialize_task):
+            if background is not None:
+                background.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await background
+        self._heartbeat_task = self._materialize_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def import_job(path: Path, *, owner_id: str | None, batch_size: int) -> JobBody:
+    async def run(context: JobContext) -> dict[str, Any]:
+        created = 0
+        failures: list[dict[str, Any]] = []
+        processed = 0
+
+        async def on_batch(results: list[ImportResult]) -> None:
+            nonlocal created, processed
+            processed += len(results)
+            for result in results:
+                if result.ok:
+                    created += 1
+                elif len(failures) < MAX_REPORTED_FAILURES:
+                    failures.append(result.to_dict())
+            await context.report(processed)
+
+        try:
+            with path.open("rb") as stream:
+                try:
+                    entries = iter_import_entries(stream)
+                except zipfile.BadZipFile as exc:
+                    raise JobError("Invalid zip archive") from exc
+                async with context.sessionmaker() as session:
+                    await import_workspaces(
+                        session,
+                        entries,
+                        owner_id=owner_id,
+                        batch_size=batch_size,
+                        executor=context.executor,
+                        on_batch=on_batch,
+                    )
+        finally:
+            path.unlink(missing_ok=True)
+        context.total = processed
+        return {"created": created, "failed": processed - created, "failures": failures}
+
+    return run
+
+
+def export_job(
+    *,
+    format: str,
+    owner_id: str | None,
+    updated_since: datetime | None,
+) -> JobBody:
+    async def run(context: JobContext) -> dict[str, Any]:
+        async with context.sessionmaker() as session:
+            total = await count_workspaces(
+                session,
+                owner_id=owner_id,
+                updated_since=updated_since,
+            )
+        await context.report(0, total, force=True)
+
+        async def records() -> AsyncIterator[WorkspaceRecord]:
+            exported = 0
+            async with context.sessionmaker() as session:
+                async for record in stream_workspaces(
+                    session,
+                    owner_id=owner_id,
+                    updated_since=updated_since,
+                ):
+                    yield record
+                    exported += 1
+                    await context.report(exported)
+
+        path = context.artifact_path(".zip" if format == "zip" else ".ndjson")
+        encode = iter_zip_export if format == "zip" else iter_ndjson_export
+        chunks = encode(records(), executor=context.executor)
+        try:
+            with path.open("wb") as output:
+                async for chunk in chunks:
+                    output.write(chunk)
+        except BaseException:
+            # A failed or interrupted export never becomes downloadable.
+            path.unlink(missing_ok=True)
+            raise
+        return {"artifact": path.name, "format": format, "bytes": os.path.getsize(path)}
+
+    return run
+
+
+def validate_job() -> JobBody:
+    async def run(context: JobContext) -> dict[str, Any]:
+        async with context.sessionmaker() as session:
+            await context.report(0, await count_workspaces(session), force=True)
+
+        checked = 0
+        invalid: list[dict[str, Any]] = []
+        invalid_count = 0
+        async with context.sessionmaker() as session:
+            async for record in stream_workspaces(session, include_export=True):
+                errors = []
+                try:
+                    validate_workspace_payload(record.data)
+                except WorkspaceValidationError as exc:
+                    errors.append(str(exc))
+                if record.export_bytes is not None and not verify_workspace_export(record):
+                    errors.append("Materialized export does not match data")
+                if errors:
+                    invalid_count += 1
+                    if len(invalid) < MAX_REPORTED_FAILURES:
+                        invalid.append({"workspace_id": record.id, "errors": errors})
+                checked += 1
+                await context.report(checked)
+        return {"checked": checked, "invalid": invalid_count, "failures": invalid}
+
+    return run
+
+
+def materialize_job(workspace_ids: Collection[str]) -> JobBody:
+    async def run(context: JobContext) -> dict[str, Any]:
+        async with context.sessionmaker() as session:
+            stale = await stale_workspaces(session, list(workspace_ids))
+            await context.report(0, len(stale), force=True)
+            for index, workspace_id in enumerate(stale, 1):
+                await refresh_workspace_export(session, workspace_id, executor=context.executor)
+                await context.report(index)
+        return {"requested": len(workspace_ids), "materialized": len(stale)}
+
+    return run
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import Iterable
+
+_STRUCTURAL = re.compile(r'["{}\[\],:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_NON_WHITESPACE = re.compile(r"\S")
+
+MAX_CAPTURE_CHARS = 64 * 1024
+
+
+class JSONScanError(ValueError):
+    pass
+
+
+class TopLevelKeyScanner:
+    """Incrementally scan a JSON document for its top-level object keys.
+
+    Chunks are fed as they arrive; the scanner tracks only nesting depth and
+    string boundaries, so it can reject a payload that is not an object, is
+    truncated, or lacks keys long before a full parse would finish. String
+    values of ``watch`` keys are captured so they can be validated early.
+    It is not a validator: accepted documents still need a real parse.
+    """
+
+    def __init__(self, watch: Iterable[str] = ()) -> None:
+        self.keys: set[str] = set()
+        self.values: dict[str, str] = {}
+        self._watch = frozenset(watch)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._expect_key = False
+        self._current_key: str | None = None
+        self._in_string = False
+        self._escape = False
+        self._capture: list[str] | None = None
+        self._capture_size = 0
+        self._capture_is_key = False
+
+    @property
+    def complete(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: bytes) -> None:
+        try:
+            text = self._decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            raise JSONScanError("Invalid JSON file") from exc
+        self._scan(text)
+
+    def close(self) -> None:
+        try:
+            self._scan(self._decoder.decode(b"", final=True))
+        except UnicodeDecodeError as exc:
+            raise JSONScanError("Invalid JSON file") from exc
+        if not self._done:
+            raise JSONScanError("Invalid JSON file")
+
+    def _append(self, text: str) -> None:
+        if self._capture is None or not text:
+            return
+        self._capture_size += len(text)
+        if self._capture_size > MAX_CAPTURE_CHARS:
+            self._capture = None
+            return
+        self._capture.append(text)
+
+    def _finish_string(self) -> None:
+        self._in_string = False
+        if self._capture is None:
+            if self._capture_is_key:
+                self._current_key = None
+            return
+        try:
+            value = json.loads('"' + "".join(self._capture) + '"')
+        except json.JSONDecodeError as exc:
+            raise JSONScanError("Invalid JSON file") from exc
+        self._capture = None
+        if self._capture_is_key:
+            self.keys.add(value)
+            self._current_key = value
+        elif self._current_key is not None:
+            self.values[self._current_key] = value
+
+    def _scan(self, text: str) -> None:
+        position = 0
+        length = len(text)
+        while position < length:
+            if self._in_string:
+                if self._escape:
+                    self._append(text[position])
+                    self._escape = False
+                    position += 1
+                    continue
+                match = _STRING_SPECIAL.search(text, position)
+                if match is None:
+                    self._append(text[position:])
+                    return
+                self._append(text[position : match.start()])
+                position = match.end()
+                if match.group() == "\\":
+                    self._append("\\")
+                    self._escape = True
+                else:
+                    self._finish_string()
+                continue
+
+            if self._done:
+                if _NON_WHITESPACE.search(text, position) is not None:
+                    raise JSONScanError("Invalid JSON file")
+                return
+
+            if not self._started:
+                match = _NON_WHITESPACE.search(text, position)
+                if match is None:
+                    return
+                if match.group() != "{":
+                    if match.group() in '["-0123456789':
+                        raise JSONScanError("Workspace payload must be a JSON object")
+                    raise JSONScanError("Invalid JSON file")
+                self._started = True
+                self._depth = 1
+                self._expect_key = True
+                position = match.end()
+                continue
+
+            match = _STRUCTURAL.search(text, position)
+            if match is None:
+                return
+            position = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+                self._capture = None
+                self._capture_size = 0
+                self._capture_is_key = self._depth == 1 and self._expect_key
+                if self._capture_is_key or (
+                    self._depth == 1 and self._current_key in self._watch
+                ):
+                    self._capture = []
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._done = True
+            elif self._depth == 1:
+                self._expect_key = char == ","
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from datetime import datetime
+from typing import cast
+
+from sqlalchemy import DateTime, String, Table, Update, bindparam, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from engine.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LoginWriteBehind:
+    """Coalesce last_login_at updates and write them in batches.
+
+    Logins only record a timestamp in memory; repeated logins by one user
+    collapse to the latest. Pending updates are flushed every
+    ``interval_seconds``, as soon as ``batch_size`` users are pending, and
+    on close. A failed flush puts its updates back for the next attempt.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        *,
+        interval_seconds: float = 5.0,
+        batch_size: int = 500,
+    ) -> None:
+        self.sessionmaker = sessionmaker
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.flushed = 0
+        self.coalesced = 0
+        self._pending: dict[str, datetime] = {}
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._full = asyncio.Event()
+
+    def record(self, user_id: str, at: datetime) -> None:
+        previous = self._pending.get(user_id)
+        if previous is not None:
+            self.coalesced += 1
+            if previous >= at:
+                return
+        self._pending[user_id] = at
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    def pending(self, user_id: str) -> datetime | None:
+        return self._pending.get(user_id)
+
+    def pending_snapshot(self) -> dict[str, datetime]:
+        return dict(self._pending)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            self._full.clear()
+            if not batch:
+                return 0
+            try:
+                async with self.sessionmaker() as session:
+                    await write_last_logins(session, batch)
+            except Exception:
+                logger.exception("Could not flush %d login timestamps", len(batch))
+                for user_id, at in batch.items():
+                    self.record(user_id, at)
+                return 0
+            self.flushed += len(batch)
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "coalesced": self.coalesced,
+        }
+
+
+def batched_last_login_update(batch: dict[str, datetime]) -> Update:
+    """UPDATE users ... FROM (VALUES ...) applying a whole batch in one statement."""
+
+    pending = values(
+        column("id", String),
+        column("last_login_at", DateTime(timezone=True)),
+        name="pending",
+    ).data(list(batch.items()))
+    return (
+        update(User)
+        .where(User.id == pending.c.id, User.last_login_at < pending.c.last_login_at)
+        .values(last_login_at=pending.c.last_login_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def write_last_logins(session: AsyncSession, batch: dict[str, datetime]) -> None:
+    """Apply login timestamps, never moving a user's last_login_at backwards."""
+
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(batched_last_login_update(batch))
+    else:
+        table = cast(Table, User.__table__)
+        users = table.c
+        await session.execute(
+            update(table)
+            .where(users.id == bindparam("user_id"), users.last_login_at < bindparam("at"))
+            .values(last_login_at=bindparam("at")),
+            [{"user_id": user_id, "at": at} for user_id, at in batch.items()],
+        )
+    await session.commit()
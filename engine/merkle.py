@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from dataclasses import replace
+from typing import Any
+
+from engine.ids import content_digest
+from engine.patch import Operation, Pointer, resolve
+
+# Digests are SHA-256 truncated like deterministic_id; 128 bits is plenty
+# to tell subtrees apart and keeps stored trees small.
+DIGEST_CHARS = 32
+
+# Containers smaller than this (in canonical JSON bytes), other than the root,
+# are stored as a bare digest; a diff replaces them whole instead of
+# descending into them.
+MIN_BRANCH_BYTES = 1024
+
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+# A stored tree node is either a digest string or [digest, children], where
+# children is a dict of nodes for an object or a list of nodes for an array.
+HashTree = str | list[Any]
+
+
+def _digest(tag: str, body: str) -> str:
+    return content_digest((tag + body).encode("utf-8"))[:DIGEST_CHARS]
+
+
+def _build(value: Any, min_branch_bytes: int = MIN_BRANCH_BYTES) -> tuple[HashTree, str, int]:
+    if isinstance(value, dict):
+        children = {key: _build(value[key]) for key in sorted(value)}
+        digest = _digest(
+            "o", "".join(_ENCODER.encode(key) + child[1] for key, child in children.items())
+        )
+        size = 2 + sum(len(key) + 4 + child[2] for key, child in children.items())
+        if size < min_branch_bytes:
+            return digest, digest, size
+        return [digest, {key: child[0] for key, child in children.items()}], digest, size
+    if isinstance(value, list):
+        items = [_build(item) for item in value]
+        digest = _digest("a", "".join(item[1] for item in items))
+        size = 2 + sum(item[2] + 1 for item in items)
+        if size < min_branch_bytes:
+            return digest, digest, size
+        return [digest, [item[0] for item in items]], digest, size
+    encoded = _ENCODER.encode(value)
+    digest = _digest("v", encoded)
+    return digest, digest, len(encoded)
+
+
+def hash_tree(document: Any) -> tuple[str, HashTree]:
+    """The root digest of a JSON document and its Merkle tree.
+
+    Equal documents always have equal digests, whatever their key order.
+    """
+
+    tree, digest, _ = _build(document, 0)
+    return digest, tree
+
+
+def tree_digest(node: HashTree) -> str:
+    return node if isinstance(node, str) else str(node[0])
+
+
+def object_tree(children: dict[str, HashTree]) -> tuple[str, HashTree]:
+    """hash_tree of an object whose values' trees are ``children``.
+
+    Lets a writer that replaces a few top-level values of a hashed document
+    rehash only the root.
+    """
+
+    digest = _digest(
+        "o", "".join(_ENCODER.encode(key) + tree_digest(children[key]) for key in sorted(children))
+    )
+    return digest, [digest, {key: children[key] for key in sorted(children)}]
+
+
+def diff_trees(left: HashTree, right: HashTree, path: Pointer = ()) -> list[Operation]:
+    """RFC 6902 operations turning the left document into the right one.
+
+    Only subtrees whose digests differ are visited. Arrays are compared by
+    position. "add" and "replace" operations carry no value yet; fill them in
+    from the right document with fill_values.
+    """
+
+    if tree_digest(left) == tree_digest(right):
+        return []
+    if isinstance(left, str) or isinstance(right, str) or type(left[1]) is not type(right[1]):
+        return [Operation("replace", path)]
+
+    operations: list[Operation] = []
+    before, after = left[1], right[1]
+    if isinstance(before, dict):
+        for key in sorted(before.keys() - after.keys()):
+            operations.append(Operation("remove", (*path, key)))
+        for key in sorted(after):
+            if key not in before:
+                operations.append(Operation("add", (*path, key)))
+            else:
+                operations.extend(diff_trees(before[key], after[key], (*path, key)))
+        return operations
+
+    common = min(len(before), len(after))
+    for index in range(common):
+        operations.extend(diff_trees(before[index], after[index], (*path, str(index))))
+    for index in range(common, len(after)):
+        operations.append(Operation("add", (*path, str(index))))
+    for index in reversed(range(common, len(before))):
+        operations.append(Operation("remove", (*path, str(index))))
+    return operations
+
+
+def value_pointers(operations: list[Operation]) -> list[Pointer]:
+    """Paths whose new values fill_values needs."""
+
+    return [operation.path for operation in operations if operation.op != "remove"]
+
+
+def fill_values(
+    operations: list[Operation],
+    value_at: Callable[[Pointer], Any],
+) -> list[Operation]:
+    return [
+        operation
+        if operation.op == "remove"
+        else replace(operation, value=value_at(operation.path))
+        for operation in operations
+    ]
+
+
+def diff_documents(left: Any, right: Any) -> list[Operation]:
+    """Hash two documents and diff them; both are read, neither modified."""
+
+    operations = diff_trees(hash_tree(left)[1], hash_tree(right)[1])
+    return fill_values(operations, lambda pointer: resolve(right, pointer))
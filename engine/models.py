@@ -4,9 +4,26 @@ from datetime import datetime, timezone
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import JSON, Boolean, DateTime, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Table,
+    Text,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+# JSONB on PostgreSQL so workspace content can be indexed and searched.
+WorkspaceData = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Base(DeclarativeBase):
     pass
@@ -14,6 +31,11 @@ class Base(DeclarativeBase):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_last_login_at_id", "last_login_at", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("uq_users_provider_provider_id", "provider", "provider_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     email: Mapped[str] = mapped_column(String(320), unique=True, index=True)
@@ -33,12 +55,120 @@ class User(Base):
 
 class WorkspaceRecord(Base):
     __tablename__ = "workspaces"
+    __table_args__ = (
+        Index("ix_workspaces_updated_at_id", "updated_at", "id"),
+        Index("ix_workspaces_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        Index("ix_workspaces_system_id", "system_id"),
+        Index("ix_workspaces_body_digest", "body_digest"),
+        Index(
+            "ix_workspaces_data_path_ops",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     name: Mapped[str] = mapped_column(String(200))
     system_id: Mapped[str] = mapped_column(String(64))
     owner_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
-    data: Mapped[dict[str, Any]] = mapped_column(JSON)
+    data: Mapped[dict[str, Any]] = mapped_column(WorkspaceData)
+    # Clones share a WorkspaceBody; ``data`` then holds only the top-level
+    # sections that differ from it (see engine.bodies).
+    body_digest: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    # Stored uncompressed on PostgreSQL (see below) so streaming it a range
+    # at a time reads only the TOAST chunks of that range.
+    export_bytes: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    export_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    payload_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    section_counts: Mapped[dict[str, int] | None] = mapped_column(JSON, nullable=True)
+    # Merkle tree over the full document (see engine.merkle) and its root digest.
+    data_digest: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    data_tree: Mapped[Any | None] = mapped_column(JSON, nullable=True, deferred=True)
+    # Bumped by every write to the row; writers compare and swap on it.
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+class WorkspaceBody(Base):
+    """A workspace document shared by clones, addressed by its Merkle root digest."""
+
+    __tablename__ = "workspace_bodies"
+    __table_args__ = (
+        # Content search finds clones through the body they share.
+        Index(
+            "ix_workspace_bodies_data_path_ops",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    digest: Mapped[str] = mapped_column(String(32), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+    # Pushed forward by clones made from this body; unreferenced bodies are
+    # only released once this is old enough.
+    used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+    # Last, so checking used_at never has to read past the document.
+    data: Mapped[dict[str, Any]] = mapped_column(WorkspaceData, deferred=True)
+
+
+class WorkspaceRevision(Base):
+    """One saved version of a workspace: a full snapshot or a delta on the last."""
+
+    __tablename__ = "workspace_revisions"
+    __table_args__ = (Index("ix_workspace_revisions_body_digest", "body_digest"),)
+
+    workspace_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20))
+    # zlib-compressed JSON for deltas; snapshots use the workspace column type,
+    # which PostgreSQL compresses itself.
+    delta: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    snapshot: Mapped[dict[str, Any] | None] = mapped_column(
+        WorkspaceData, nullable=True, deferred=True
+    )
+    # Snapshots of clones hold their private sections on top of this body.
+    body_digest: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+@event.listens_for(WorkspaceRecord.__table__, "after_create")
+def _store_exports_uncompressed(target: Table, connection: Connection, **kw: Any) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text("ALTER TABLE workspaces ALTER COLUMN export_bytes SET STORAGE EXTERNAL")
+        )
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    kind: Mapped[str] = mapped_column(String(20))
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    owner_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    params: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -47,3 +177,4 @@ class WorkspaceRecord(Base):
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
     )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position after the last row of a page ordered by (key, id).
+
+    The key is the sort column's value: a timestamp or a string.
+    """
+
+    key: datetime | str
+    id: str
+
+    def encode(self) -> str:
+        if isinstance(self.key, datetime):
+            value = ["t", self.key.isoformat(), self.id]
+        else:
+            value = ["s", self.key, self.id]
+        raw = json.dumps(value, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str, *, key_type: type[datetime] | type[str] | None = None) -> Cursor:
+        """Decode a token, rejecting it unless its key is a key_type when given."""
+
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            tag, key, id_ = json.loads(raw)
+            if tag == "t":
+                cursor = cls(key=datetime.fromisoformat(key), id=str(id_))
+            elif tag == "s" and isinstance(key, str):
+                cursor = cls(key=key, id=str(id_))
+            else:
+                raise InvalidCursor("Invalid cursor")
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+            raise InvalidCursor("Invalid cursor") from exc
+        if key_type is not None and not isinstance(cursor.key, key_type):
+            raise InvalidCursor("Invalid cursor")
+        return cursor
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None
+
+
+def clamp_page_size(limit: int | None) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(
+    rows: Sequence[T],
+    limit: int,
+    key: Callable[[T], Cursor],
+) -> Page[T]:
+    """Build a page from up to limit + 1 rows; the extra row only signals more."""
+
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return Page(items=items, next_cursor=None)
+    return Page(items=items, next_cursor=key(items[-1]).encode())
@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import copy
+import json
+import re
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Subquery,
+    Text,
+    and_,
+    case,
+    cast,
+    false,
+    func,
+    literal,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from engine.workspace import REQUIRED_PAYLOAD_KEYS
+
+MERGE_PATCH = "application/merge-patch+json"
+JSON_PATCH = "application/json-patch+json"
+PATCH_CONTENT_TYPES = frozenset({MERGE_PATCH, JSON_PATCH})
+
+_OPS = frozenset({"add", "remove", "replace", "move", "copy", "test"})
+_INDEX = re.compile(r"0|[1-9][0-9]*")
+# Tokens PostgreSQL would also read as an array index, but RFC 6901 would not.
+_LOOSE_INDEX = re.compile(r"\s*[+-]?[0-9]+\s*")
+
+
+class PatchError(ValueError):
+    """A patch is malformed or cannot be applied to the document."""
+
+
+# Pointers as token lists; [] is the whole document.
+Pointer = tuple[str, ...]
+
+
+def parse_pointer(pointer: str) -> Pointer:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+
+    if pointer == "":
+        return ()
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON Pointer: {pointer!r}")
+    return tuple(
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    )
+
+
+def format_pointer(tokens: Sequence[str]) -> str:
+    return "".join("/" + token.replace("~", "~0").replace("/", "~1") for token in tokens)
+
+
+def _is_protected(tokens: Pointer) -> bool:
+    # The indexed name/system_id columns mirror these keys; renames go
+    # through rename_workspace and the rest never change after import.
+    return not tokens or tokens[0] in REQUIRED_PAYLOAD_KEYS
+
+
+@dataclass(frozen=True)
+class Operation:
+    """One validated RFC 6902 operation."""
+
+    op: str
+    path: Pointer
+    value: Any = None
+    from_: Pointer | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        document: dict[str, Any] = {"op": self.op, "path": format_pointer(self.path)}
+        if self.from_ is not None:
+            document["from"] = format_pointer(self.from_)
+        elif self.op in ("add", "replace", "test"):
+            document["value"] = self.value
+        return document
+
+
+def parse_json_patch(document: Any) -> list[Operation]:
+    if not isinstance(document, list):
+        raise PatchError("A JSON Patch must be an array of operations")
+    operations = []
+    for index, entry in enumerate(document):
+        if not isinstance(entry, dict) or entry.get("op") not in _OPS:
+            raise PatchError(f"Operation {index} has no valid op")
+        if not isinstance(entry.get("path"), str):
+            raise PatchError(f"Operation {index} has no path")
+        op = entry["op"]
+        path = parse_pointer(entry["path"])
+        from_ = None
+        if op in ("move", "copy"):
+            if not isinstance(entry.get("from"), str):
+                raise PatchError(f"Operation {index} has no from")
+            from_ = parse_pointer(entry["from"])
+            if op == "move" and path[: len(from_)] == from_ and path != from_:
+                raise PatchError(f"Operation {index} moves a value into itself")
+        elif op in ("add", "replace", "test") and "value" not in entry:
+            raise PatchError(f"Operation {index} has no value")
+        if op != "test" and (
+            _is_protected(path) or (op == "move" and from_ is not None and _is_protected(from_))
+        ):
+            raise PatchError(f"Operation {index} changes a protected field")
+        operations.append(Operation(op, path, entry.get("value"), from_))
+    return operations
+
+
+def parse_merge_patch(document: Any) -> dict[str, Any]:
+    if not isinstance(document, dict):
+        raise PatchError("A merge patch for a workspace must be a JSON object")
+    protected = REQUIRED_PAYLOAD_KEYS & document.keys()
+    if protected:
+        raise PatchError(f"Merge patch changes protected fields: {', '.join(sorted(protected))}")
+    return document
+
+
+def changed_pointers(kind: str, patch: Any) -> list[Pointer]:
+    """Paths a parsed patch writes, without any that lie under another."""
+
+    pointers: list[Pointer] = []
+    if kind == MERGE_PATCH:
+
+        def leaves(prefix: Pointer, value: dict[str, Any]) -> None:
+            for key, child in value.items():
+                if isinstance(child, dict) and child:
+                    leaves((*prefix, key), child)
+                else:
+                    pointers.append((*prefix, key))
+
+        leaves((), patch)
+    else:
+        for operation in patch:
+            if operation.op == "test":
+                continue
+            if operation.op == "move" and operation.from_ is not None:
+                pointers.append(operation.from_)
+            pointers.append(operation.path)
+    unique = sorted(set(pointers))
+    return [
+        pointer
+        for pointer in unique
+        if not any(pointer[: len(other)] == other and pointer != other for other in unique)
+    ]
+
+
+# -- Python implementation -------------------------------------------------
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """RFC 7396 MergePatch(target, patch); neither argument is modified."""
+
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def _child(container: Any, token: str, pointer: Pointer) -> Any:
+    if isinstance(container, dict):
+        if token in container:
+            return container[token]
+    elif isinstance(container, list):
+        if _INDEX.fullmatch(token) and int(token) < len(container):
+            return container[int(token)]
+    raise PatchError(f"Path not found: {format_pointer(pointer)}")
+
+
+def resolve(document: Any, pointer: Pointer) -> Any:
+    value = document
+    for depth, token in enumerate(pointer):
+        value = _child(value, token, pointer[: depth + 1])
+    return value
+
+
+def changed_value(document: Any, pointer: Pointer) -> Any:
+    """The value a changed pointer now refers to; "-" means the last element."""
+
+    if pointer and pointer[-1] == "-":
+        parent = resolve(document, pointer[:-1])
+        if isinstance(parent, list) and parent:
+            return parent[-1]
+        raise PatchError(f"Path not found: {format_pointer(pointer)}")
+    return resolve(document, pointer)
+
+
+def _add(document: Any, pointer: Pointer, value: Any) -> Any:
+    if not pointer:
+        return value
+    parent = resolve(document, pointer[:-1])
+    token = pointer[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        if token == "-":
+            parent.append(value)
+        elif _INDEX.fullmatch(token) and int(token) <= len(parent):
+            parent.insert(int(token), value)
+        else:
+            raise PatchError(f"Invalid array index: {format_pointer(pointer)}")
+    else:
+        raise PatchError(f"Path not found: {format_pointer(pointer[:-1])}")
+    return document
+
+
+def _remove(document: Any, pointer: Pointer) -> Any:
+    parent = resolve(document, pointer[:-1])
+    _child(parent, pointer[-1], pointer)
+    if isinstance(parent, dict):
+        del parent[pointer[-1]]
+    else:
+        del parent[int(pointer[-1])]
+    return document
+
+
+def apply_json_patch(
+    document: Any,
+    operations: Sequence[Operation],
+    *,
+    in_place: bool = False,
+) -> Any:
+    """Apply RFC 6902 operations to a copy of ``document``, or to it directly."""
+
+    result = document if in_place else copy.deepcopy(document)
+    for operation in operations:
+        if operation.op == "add":
+            result = _add(result, operation.path, copy.deepcopy(operation.value))
+        elif operation.op == "remove":
+            result = _remove(result, operation.path)
+        elif operation.op == "replace":
+            resolve(result, operation.path)
+            if operation.path:
+                result = _remove(result, operation.path)
+            result = _add(result, operation.path, copy.deepcopy(operation.value))
+        elif operation.op == "test":
+            if not json_equal(resolve(result, operation.path), operation.value):
+                raise PatchError(f"Test failed: {format_pointer(operation.path)}")
+        else:
+            assert operation.from_ is not None
+            value = copy.deepcopy(resolve(result, operation.from_))
+            if operation.op == "move":
+                result = _remove(result, operation.from_)
+            result = _add(result, operation.path, value)
+    return result
+
+
+def json_equal(left: Any, right: Any) -> bool:
+    """Equality as RFC 6902 ``test`` defines it; unlike Python, true != 1."""
+
+    if isinstance(left, bool) or isinstance(right, bool):
+        return isinstance(left, bool) and isinstance(right, bool) and left == right
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(
+            json_equal(value, right[key]) for key, value in left.items()
+        )
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(map(json_equal, left, right))
+    if isinstance(left, (dict, list)) or isinstance(right, (dict, list)):
+        return False
+    return bool(left == right)
+
+
+def apply_patch(kind: str, document: Any, patch: Any) -> Any:
+    if kind == MERGE_PATCH:
+        return apply_merge_patch(document, patch)
+    return apply_json_patch(document, patch)
+
+
+def patch_document(kind: str, patch: Any) -> Any:
+    """The JSON form of a parsed patch; parse_patch(kind, ...) reverses it."""
+
+    if kind == MERGE_PATCH:
+        return patch
+    return [operation.to_json() for operation in patch]
+
+
+def parse_patch(kind: str, document: Any) -> Any:
+    if kind == MERGE_PATCH:
+        return parse_merge_patch(document)
+    if kind == JSON_PATCH:
+        return parse_json_patch(document)
+    raise PatchError(f"Unsupported patch media type: {kind}")
+
+
+# -- PostgreSQL translation ------------------------------------------------
+#
+# A patch becomes a list of steps. Each step maps the document so far to the
+# patched document and a guard saying whether the step applies. Steps refer
+# to the previous document several times, so chaining the expressions
+# directly would grow exponentially; patched_documents gives each step its
+# own subquery instead.
+
+Step = Callable[[ColumnElement[Any]], tuple[ColumnElement[Any], ColumnElement[bool]]]
+
+# Each step is one nested subquery; longer patches are applied in Python.
+MAX_SQL_STEPS = 100
+
+
+def _path(tokens: Sequence[str]) -> ColumnElement[Any]:
+    return cast(literal(list(tokens), ARRAY(Text)), ARRAY(Text))
+
+
+def _jsonb(value: Any) -> ColumnElement[Any]:
+    return cast(literal(json.dumps(value), Text), JSONB)
+
+
+def pointer_value(document: ColumnElement[Any], tokens: Sequence[str]) -> ColumnElement[Any]:
+    return document.op("#>", return_type=JSONB)(_path(tokens))
+
+
+def changed_value_expression(
+    document: ColumnElement[Any],
+    tokens: Pointer,
+) -> ColumnElement[Any]:
+    """SQL counterpart of changed_value."""
+
+    if tokens and tokens[-1] == "-":
+        tokens = (*tokens[:-1], "-1")
+    return pointer_value(document, tokens)
+
+
+def _set(
+    document: ColumnElement[Any],
+    tokens: Sequence[str],
+    value: ColumnElement[Any],
+    create: bool = True,
+) -> ColumnElement[Any]:
+    return func.jsonb_set(document, _path(tokens), value, create, type_=JSONB)
+
+
+def _remove_path(document: ColumnElement[Any], tokens: Sequence[str]) -> ColumnElement[Any]:
+    return document.op("#-", return_type=JSONB)(_path(tokens))
+
+
+def _typeof(document: ColumnElement[Any], tokens: Sequence[str]) -> ColumnElement[Any]:
+    return func.jsonb_typeof(pointer_value(document, tokens))
+
+
+def _exists(document: ColumnElement[Any], tokens: Sequence[str]) -> ColumnElement[bool]:
+    return pointer_value(document, tokens).is_not(None)
+
+
+def _sql_add(
+    document: ColumnElement[Any],
+    tokens: Pointer,
+    value: ColumnElement[Any],
+) -> tuple[ColumnElement[Any], ColumnElement[bool]]:
+    parent, token = tokens[:-1], tokens[-1]
+    kind = _typeof(document, parent)
+    if token == "-":
+        appended = func.jsonb_insert(document, _path((*parent, "-1")), value, True, type_=JSONB)
+        return appended, kind == "array"
+    if not _INDEX.fullmatch(token):
+        return _set(document, tokens, value), kind == "object"
+    inserted = func.jsonb_insert(document, _path(tokens), value, type_=JSONB)
+    in_bounds = int(token) <= func.jsonb_array_length(pointer_value(document, parent))
+    return (
+        case((kind == "array", inserted), else_=_set(document, tokens, value)),
+        # CASE, not AND: jsonb_array_length raises on objects.
+        case((kind == "array", in_bounds), else_=kind == "object"),
+    )
+
+
+def _json_patch_step(operation: Operation) -> Step:
+    def step(document: ColumnElement[Any]) -> tuple[ColumnElement[Any], ColumnElement[bool]]:
+        if operation.op == "add":
+            return _sql_add(document, operation.path, _jsonb(operation.value))
+        if operation.op == "remove":
+            return _remove_path(document, operation.path), _exists(document, operation.path)
+        if operation.op == "replace":
+            replaced = _set(document, operation.path, _jsonb(operation.value), False)
+            return replaced, _exists(document, operation.path)
+        if operation.op == "test":
+            return document, pointer_value(document, operation.path) == _jsonb(operation.value)
+        assert operation.from_ is not None
+        value = pointer_value(document, operation.from_)
+        target = document
+        if operation.op == "move":
+            target = _remove_path(document, operation.from_)
+        added, guard = _sql_add(target, operation.path, value)
+        return added, and_(_exists(document, operation.from_), guard)
+
+    return step
+
+
+def _merge_patch_step(tokens: Pointer, value: Any) -> Step:
+    def step(document: ColumnElement[Any]) -> tuple[ColumnElement[Any], ColumnElement[bool]]:
+        if value is None:
+            return _remove_path(document, tokens), true()
+        if isinstance(value, dict):
+            # Members missing or not objects are replaced by {} before merging.
+            is_object = _typeof(document, tokens) == "object"
+            return case((is_object, document), else_=_set(document, tokens, _jsonb({}))), true()
+        return _set(document, tokens, _jsonb(value)), true()
+
+    return step
+
+
+def _merge_patch_steps(patch: dict[str, Any], prefix: Pointer = ()) -> list[Step]:
+    steps = []
+    for key, value in patch.items():
+        steps.append(_merge_patch_step((*prefix, key), value))
+        if isinstance(value, dict):
+            steps.extend(_merge_patch_steps(value, (*prefix, key)))
+    return steps
+
+
+def patch_steps(kind: str, patch: Any) -> list[Step] | None:
+    """SQL steps applying a parsed patch, or None to apply it in Python.
+
+    Python handles patches longer than MAX_SQL_STEPS and pointers that
+    PostgreSQL would read differently from RFC 6901, such as an array index
+    of "-1" or "01".
+    """
+
+    if kind == MERGE_PATCH:
+        steps = _merge_patch_steps(patch)
+    else:
+        for operation in patch:
+            tokens = [*operation.path, *(operation.from_ or ())]
+            if any(_LOOSE_INDEX.fullmatch(t) and not _INDEX.fullmatch(t) for t in tokens):
+                return None
+        steps = [_json_patch_step(operation) for operation in patch]
+    return steps if len(steps) <= MAX_SQL_STEPS else None
+
+
+def patched_documents(source: Select[Any], steps: Sequence[Step]) -> Subquery:
+    """Apply ``steps`` to the ``document`` column of ``source``.
+
+    The result keeps the other columns of ``source`` and adds ``applies``,
+    which is false if any step's guard failed. Once a step fails, later
+    steps see the unchanged document, so jsonb_set never runs on a path
+    that does not fit.
+    """
+
+    stage = source.add_columns(true().label("applies"))
+    for step in steps:
+        # OFFSET 0 stops PostgreSQL from inlining the subquery, which would
+        # evaluate the earlier steps once per reference again.
+        previous = stage.offset(0).subquery()
+        document, guard = step(previous.c.document)
+        applies = case((previous.c.applies, func.coalesce(guard, false())), else_=false())
+        stage = select(
+            *(column for column in previous.c if column.key not in ("document", "applies")),
+            case((applies, document), else_=previous.c.document).label("document"),
+            applies.label("applies"),
+        )
+    return stage.subquery("patched")
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from engine.bodies import full_document, load_bodies
+from engine.db import replica_ok
+from engine.merkle import diff_documents
+from engine.models import WorkspaceRecord, WorkspaceRevision
+from engine.patch import (
+    JSON_PATCH,
+    MERGE_PATCH,
+    Operation,
+    apply_json_patch,
+    apply_merge_patch,
+    parse_json_patch,
+)
+
+# A full snapshot is stored at versions 1, N + 1, 2N + 1, ...; any version is
+# rebuilt from the snapshot at or below it plus at most N - 1 deltas.
+SNAPSHOT_INTERVAL = 20
+
+SNAPSHOT = "snapshot"
+# Deltas are the patch that produced the version, in one of these formats.
+MERGE_DELTA = "merge-patch"
+JSON_DELTA = "json-patch"
+DELTA_KINDS = {MERGE_PATCH: MERGE_DELTA, JSON_PATCH: JSON_DELTA}
+
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+@dataclass(frozen=True)
+class Delta:
+    """A change to record: ``delta`` turns version - 1 into ``version``."""
+
+    workspace_id: str
+    version: int
+    kind: str
+    delta: Any
+
+
+@dataclass(frozen=True)
+class RevisionSummary:
+    version: int
+    kind: str
+    delta_bytes: int | None
+    created_at: datetime
+
+
+def encode_delta(delta: Any) -> bytes:
+    return zlib.compress(_ENCODER.encode(delta).encode("utf-8"))
+
+
+def decode_delta(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+def is_snapshot_version(version: int) -> bool:
+    return (version - 1) % SNAPSHOT_INTERVAL == 0
+
+
+def apply_delta(document: Any, kind: str, delta: Any) -> Any:
+    """Apply a stored delta. JSON Patch deltas modify ``document`` in place."""
+
+    if kind == MERGE_DELTA:
+        return apply_merge_patch(document, delta)
+    if kind == JSON_DELTA:
+        return apply_json_patch(document, parse_json_patch(delta), in_place=True)
+    raise ValueError(f"Unknown revision kind: {kind}")
+
+
+async def record_snapshots(session: AsyncSession, workspace_ids: Sequence[str]) -> None:
+    """Snapshot the current data of workspaces as their current version.
+
+    Runs as INSERT ... SELECT so the documents never leave the database.
+    Snapshots of clones keep the body reference instead of the full document.
+    """
+
+    if not workspace_ids:
+        return
+    await session.execute(
+        insert(WorkspaceRevision).from_select(
+            ["workspace_id", "version", "kind", "snapshot", "body_digest", "created_at"],
+            select(
+                WorkspaceRecord.id,
+                WorkspaceRecord.version,
+                literal(SNAPSHOT),
+                WorkspaceRecord.data,
+                WorkspaceRecord.body_digest,
+                literal(datetime.now(timezone.utc), WorkspaceRevision.created_at.type),
+            ).where(WorkspaceRecord.id.in_(workspace_ids)),
+        )
+    )
+
+
+async def record_revisions(session: AsyncSession, deltas: Sequence[Delta]) -> None:
+    """Record written versions in the caller's transaction.
+
+    Versions that fall on the snapshot interval are stored in full; the
+    rest store their delta. Call after the workspace rows are updated.
+    """
+
+    snapshots = [delta.workspace_id for delta in deltas if is_snapshot_version(delta.version)]
+    rows = [
+        {
+            "workspace_id": delta.workspace_id,
+            "version": delta.version,
+            "kind": delta.kind,
+            "delta": encode_delta(delta.delta),
+            "created_at": datetime.now(timezone.utc),
+        }
+        for delta in deltas
+        if not is_snapshot_version(delta.version)
+    ]
+    await record_snapshots(session, snapshots)
+    if rows:
+        await session.execute(insert(WorkspaceRevision), rows)
+
+
+async def list_revisions(
+    session: AsyncSession,
+    workspace_id: str,
+    *,
+    before: int | None = None,
+    limit: int = 50,
+) -> list[RevisionSummary]:
+    """Revisions of a workspace, newest first, below version ``before``."""
+
+    statement = (
+        select(
+            WorkspaceRevision.version,
+            WorkspaceRevision.kind,
+            func.length(WorkspaceRevision.delta).label("delta_bytes"),
+            WorkspaceRevision.created_at,
+        )
+        .where(WorkspaceRevision.workspace_id == workspace_id)
+        .order_by(WorkspaceRevision.version.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        statement = statement.where(WorkspaceRevision.version < before)
+    result = await session.execute(replica_ok(statement))
+    return [RevisionSummary(**row._asdict()) for row in result]
+
+
+@dataclass(frozen=True)
+class RevisionChain:
+    """The snapshot at or below a version and the deltas up to it, in order."""
+
+    version: int
+    snapshot: dict[str, Any]
+    deltas: list[tuple[str, bytes]]
+    # The shared body under a clone's snapshot.
+    body: dict[str, Any] | None = None
+
+
+def rebuild_revision(chain: RevisionChain) -> dict[str, Any]:
+    document = full_document(chain.snapshot, chain.body)
+    for kind, delta in chain.deltas:
+        document = apply_delta(document, kind, decode_delta(delta))
+    return document
+
+
+def diff_revisions(base: RevisionChain, target: RevisionChain) -> list[Operation]:
+    """RFC 6902 operations turning the ``base`` version into ``target``."""
+
+    return diff_documents(rebuild_revision(base), rebuild_revision(target))
+
+
+async def load_revision_chain(
+    session: AsyncSession,
+    workspace_id: str,
+    version: int,
+) -> RevisionChain | None:
+    """Read what rebuild_revision needs for ``version``; None if it was not recorded.
+
+    One query reads the nearest snapshot at or below ``version`` and the
+    deltas after it.
+    """
+
+    base = (
+        select(func.max(WorkspaceRevision.version))
+        .where(
+            WorkspaceRevision.workspace_id == workspace_id,
+            WorkspaceRevision.kind == SNAPSHOT,
+            WorkspaceRevision.version <= version,
+        )
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        replica_ok(
+            select(
+                WorkspaceRevision.version,
+                WorkspaceRevision.kind,
+                WorkspaceRevision.delta,
+                WorkspaceRevision.snapshot,
+                WorkspaceRevision.body_digest,
+            )
+            .where(
+                WorkspaceRevision.workspace_id == workspace_id,
+                WorkspaceRevision.version >= base,
+                WorkspaceRevision.version <= version,
+            )
+            .order_by(WorkspaceRevision.version)
+        )
+    )
+    rows = result.all()
+    if not rows or rows[-1].version != version or len(rows) != version - rows[0].version + 1:
+        return None
+    body_digest = rows[0].body_digest
+    bodies = await load_bodies(session, [body_digest], replica=True)
+    return RevisionChain(
+        version=version,
+        snapshot=rows[0].snapshot,
+        deltas=[(row.kind, row.delta) for row in rows[1:]],
+        body=bodies.get(body_digest or ""),
+    )
+
+
+async def get_revision_data(
+    session: AsyncSession,
+    workspace_id: str,
+    version: int,
+) -> dict[str, Any] | None:
+    """A workspace's data as of ``version``; None if it was not recorded."""
+
+    chain = await load_revision_chain(session, workspace_id, version)
+    return None if chain is None else rebuild_revision(chain)
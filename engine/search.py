@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import math
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Unpack
+
+from sqlalchemy import CompoundSelect, Select, func, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from engine.cache import TTLCache
+from engine.db import replica_ok
+from engine.models import WorkspaceRecord
+
+TYPEAHEAD_LIMIT = 10
+MAX_TYPEAHEAD_LIMIT = 50
+# Same default as pg_trgm.word_similarity_threshold.
+WORD_SIMILARITY_THRESHOLD = 0.6
+# Queries shorter than a trigram only get prefix matches.
+MIN_FUZZY_LENGTH = 3
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True)
+class WorkspaceMatch:
+    id: str
+    name: str
+    system_id: str
+
+
+MATCH_COLUMNS = (WorkspaceRecord.id, WorkspaceRecord.name, WorkspaceRecord.system_id)
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+def trigrams(value: str) -> frozenset[str]:
+    """Trigrams of ``value`` the way pg_trgm extracts them.
+
+    Each lowercased alphanumeric word is padded with two leading spaces and
+    one trailing space before it is split into trigrams.
+    """
+
+    grams: set[str] = set()
+    for word in _WORD.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def word_similarity(query: frozenset[str], target: frozenset[str]) -> float:
+    """Share of the query's trigrams found in ``target``.
+
+    Approximates pg_trgm's word_similarity, which also requires the shared
+    trigrams to come from one contiguous stretch of the target.
+    """
+
+    if not query:
+        return 0.0
+    return len(query & target) / len(query)
+
+
+def _sort_key(match: WorkspaceMatch) -> tuple[str, str]:
+    return (match.name.lower(), match.id)
+
+
+def prefix_statement(query: str, limit: int = TYPEAHEAD_LIMIT) -> CompoundSelect[Any]:
+    """The first ``limit`` names, by name, starting with ``query``, plus any
+    system ids starting with it.
+
+    Both branches compare ``lower(...) COLLATE "C"`` so PostgreSQL can range
+    scan the matching expression indexes from migration 0012 and stop after
+    ``limit`` rows, however many names share a short prefix.
+    """
+
+    prefix = escape_like(normalize_query(query)) + "%"
+    name = func.lower(WorkspaceRecord.name).collate("C")
+    system_id = func.lower(WorkspaceRecord.system_id).collate("C")
+    return union_all(
+        select(*MATCH_COLUMNS)
+        .where(name.like(prefix, escape="\\"))
+        .order_by(name, WorkspaceRecord.id)
+        .limit(limit),
+        select(*MATCH_COLUMNS)
+        .where(system_id.like(prefix, escape="\\"))
+        .order_by(name, WorkspaceRecord.id)
+        .limit(limit),
+    )
+
+
+def fuzzy_statement(
+    query: str,
+    limit: int = TYPEAHEAD_LIMIT,
+) -> Select[Unpack[tuple[Any, ...]]]:
+    """Names containing ``query`` or close to it (pg_trgm ``<%``), best first.
+
+    Both predicates are answered from the trigram GIN index.
+    """
+
+    term = normalize_query(query)
+    name = func.lower(WorkspaceRecord.name)
+    return (
+        select(*MATCH_COLUMNS)
+        .where(
+            or_(
+                name.like(f"%{escape_like(term)}%", escape="\\"),
+                literal(term).op("<%")(name),
+            )
+        )
+        .order_by(func.word_similarity(term, name).desc(), name, WorkspaceRecord.id)
+        .limit(limit)
+    )
+
+
+class WorkspaceNameIndex:
+    """In-memory stand-in for the pg_trgm indexes on databases without them.
+
+    Prefix lookups bisect sorted name and system id lists; fuzzy lookups
+    count shared trigrams through an inverted index. Results are ranked the
+    same way as on PostgreSQL.
+    """
+
+    def __init__(self, entries: Iterable[WorkspaceMatch]) -> None:
+        self.entries = {entry.id: entry for entry in entries}
+        self._names = sorted((entry.name.lower(), entry.id) for entry in self.entries.values())
+        self._system_ids = sorted(
+            (entry.system_id.lower(), entry.id) for entry in self.entries.values()
+        )
+        self._trigrams: dict[str, frozenset[str]] = {}
+        self._postings: defaultdict[str, list[str]] = defaultdict(list)
+        for entry in self.entries.values():
+            grams = trigrams(entry.name)
+            self._trigrams[entry.id] = grams
+            for gram in grams:
+                self._postings[gram].append(entry.id)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _prefixed(keys: list[tuple[str, str]], prefix: str) -> Iterable[str]:
+        for key, entry_id in keys[bisect.bisect_left(keys, (prefix, "")) :]:
+            if not key.startswith(prefix):
+                break
+            yield entry_id
+
+    def _fuzzy(self, term: str, query_grams: frozenset[str]) -> Iterable[str]:
+        # A match shares at least ``needed`` trigrams with the query, so it
+        # must appear in one of the rarest len - needed + 1 posting lists.
+        # A substring match holds every trigram without padding, so it
+        # appears in the rarest of those lists.
+        needed = math.ceil(round(WORD_SIMILARITY_THRESHOLD * len(query_grams), 9))
+        postings = sorted((self._postings.get(gram, []) for gram in query_grams), key=len)
+        seeds: set[str] = set()
+        for posting in postings[: len(postings) - needed + 1]:
+            seeds.update(posting)
+        inner = [self._postings.get(gram, []) for gram in query_grams if " " not in gram]
+        if inner:
+            rarest: list[str] = min(inner, key=len)
+            seeds.update(rarest)
+        for entry_id in seeds:
+            shared = len(query_grams & self._trigrams[entry_id])
+            if shared >= needed or term in self.entries[entry_id].name.lower():
+                yield entry_id
+
+    def search(self, query: str, limit: int = TYPEAHEAD_LIMIT) -> list[WorkspaceMatch]:
+        term = normalize_query(query)
+        if not term:
+            return []
+        prefixed = set(self._prefixed(self._system_ids, term))
+        # Prefix matches rank by name, so only the first ``limit`` names count.
+        prefixed.update(itertools.islice(self._prefixed(self._names, term), limit))
+        query_grams = trigrams(term)
+        candidates = set(prefixed)
+        # Prefix matches always rank first; fuzzy ones only fill the rest.
+        if len(prefixed) < limit and len(term) >= MIN_FUZZY_LENGTH and query_grams:
+            candidates.update(self._fuzzy(term, query_grams))
+
+        def rank(entry_id: str) -> tuple[bool, float, str, str]:
+            entry = self.entries[entry_id]
+            if entry_id in prefixed:
+                return (False, 0.0, entry.name.lower(), entry_id)
+            score = word_similarity(query_grams, self._trigrams[entry_id])
+            return (True, -score, entry.name.lower(), entry_id)
+
+        return [self.entries[entry_id] for entry_id in heapq.nsmallest(limit, candidates, key=rank)]
+
+
+async def load_workspace_name_index(session: AsyncSession) -> WorkspaceNameIndex:
+    result = await session.execute(replica_ok(select(*MATCH_COLUMNS)))
+    return WorkspaceNameIndex(WorkspaceMatch(**row._asdict()) for row in result)
+
+
+async def typeahead_workspaces(
+    session: AsyncSession,
+    query: str,
+    *,
+    limit: int = TYPEAHEAD_LIMIT,
+    fallback_cache: TTLCache[WorkspaceNameIndex] | None = None,
+) -> list[WorkspaceMatch]:
+    """Workspaces whose name or system id matches ``query`` as typed.
+
+    Prefix matches come first in name order; if there are fewer than
+    ``limit`` of them, substring and typo-tolerant matches fill the rest,
+    most similar first. On PostgreSQL that is one or two indexed queries.
+    Elsewhere an in-memory
+    WorkspaceNameIndex is built from the table and kept in ``fallback_cache``
+    until it expires, so recent changes can take up to its TTL to appear.
+    """
+
+    term = normalize_query(query)
+    if not term:
+        return []
+    if session.get_bind().dialect.name == "postgresql":
+        result = await session.execute(replica_ok(prefix_statement(term, limit)))
+        matches = sorted({WorkspaceMatch(**row._asdict()) for row in result}, key=_sort_key)
+        matches = matches[:limit]
+        if len(matches) < limit and len(term) >= MIN_FUZZY_LENGTH:
+            result = await session.execute(replica_ok(fuzzy_statement(term, limit)))
+            for row in result:
+                match = WorkspaceMatch(**row._asdict())
+                if match not in matches and len(matches) < limit:
+                    matches.append(match)
+        return matches
+
+    index = fallback_cache.get("workspaces") if fallback_cache is not None else None
+    if index is None:
+        index = await load_workspace_name_index(session)
+        if fallback_cache is not None:
+            fallback_cache.put("workspaces", index)
+    return index.search(query, limit)
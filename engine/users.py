@@ -1,11 +1,39 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import Insert as PostgresqlInsert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import Insert as SqliteInsert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.dml import ReturningInsert
 
+from engine.cache import TTLCache
+from engine.db import replica_ok
 from engine.models import User
+from engine.pagination import Cursor
+from engine.search import escape_like
+
+
+@dataclass(frozen=True)
+class UserSort:
+    column: InstrumentedAttribute[datetime] | InstrumentedAttribute[str]
+    descending: bool
+    key_type: type[datetime] | type[str]
+
+
+USER_SORTS = {
+    "last_login": UserSort(User.last_login_at, descending=True, key_type=datetime),
+    "created": UserSort(User.created_at, descending=True, key_type=datetime),
+    "email": UserSort(User.email, descending=False, key_type=str),
+}
+DEFAULT_USER_SORT = "last_login"
 
 
 def normalize_email(email: str) -> str:
@@ -13,7 +41,7 @@ def normalize_email(email: str) -> str:
 
 
 async def get_user_by_id(session: AsyncSession, user_id: str) -> User | None:
-    result = await session.execute(select(User).where(User.id == user_id))
+    result = await session.execute(replica_ok(select(User).where(User.id == user_id)))
     return result.scalar_one_or_none()
 
 
@@ -22,11 +50,91 @@ async def has_admin(session: AsyncSession) -> bool:
     return result.first() is not None
 
 
-async def list_users(session: AsyncSession) -> list[User]:
-    result = await session.execute(select(User).order_by(User.last_login_at.desc()))
+def user_search_filter(query: str) -> ColumnElement[bool]:
+    """Prefix match on email or display name, shaped to use the pattern indexes."""
+
+    pattern = escape_like(query.strip().lower()) + "%"
+    return or_(
+        User.email.like(pattern, escape="\\"),
+        func.lower(User.display_name).like(pattern, escape="\\"),
+    )
+
+
+def user_cursor(user: User, sort: str = DEFAULT_USER_SORT) -> Cursor:
+    return Cursor(key=getattr(user, USER_SORTS[sort].column.key), id=user.id)
+
+
+async def list_users(
+    session: AsyncSession,
+    *,
+    sort: str = DEFAULT_USER_SORT,
+    search: str | None = None,
+    after: Cursor | None = None,
+    limit: int | None = None,
+) -> list[User]:
+    """List users in sort order, seeking past ``after`` on (sort column, id)."""
+
+    option = USER_SORTS[sort]
+    key = tuple_(option.column, User.id)
+    if option.descending:
+        statement = select(User).order_by(option.column.desc(), User.id.desc())
+    else:
+        statement = select(User).order_by(option.column.asc(), User.id.asc())
+    if search:
+        statement = statement.where(user_search_filter(search))
+    if after is not None:
+        position = (after.key, after.id)
+        statement = statement.where(key < position if option.descending else key > position)
+    if limit is not None:
+        statement = statement.limit(limit)
+    result = await session.execute(replica_ok(statement))
     return list(result.scalars())
 
 
+def _admin_grant(is_admin: bool, bootstrap_admin: bool) -> ColumnElement[bool] | bool:
+    """Admin flag for a login: granted outright, or only while no admin exists."""
+
+    if is_admin:
+        return True
+    if bootstrap_admin:
+        return ~exists().where(User.is_admin.is_(True))
+    return False
+
+
+def upsert_user_statement(
+    dialect_name: str,
+    values: dict[str, Any],
+    *,
+    is_admin: bool = False,
+    bootstrap_admin: bool = False,
+    touch_last_login: bool = True,
+) -> ReturningInsert[User] | None:
+    """Build the single-statement upsert for dialects with ON CONFLICT ... RETURNING.
+
+    Returns None for dialects that need the select-then-write fallback.
+    """
+
+    statement: PostgresqlInsert | SqliteInsert
+    if dialect_name == "postgresql":
+        statement = postgresql_insert(User)
+    elif dialect_name == "sqlite":
+        statement = sqlite_insert(User)
+    else:
+        return None
+    statement = statement.values(**values, is_admin=_admin_grant(is_admin, bootstrap_admin))
+    updates: dict[str, Any] = {
+        "email": statement.excluded.email,
+        "display_name": statement.excluded.display_name,
+        "is_admin": or_(User.is_admin, statement.excluded.is_admin),
+    }
+    if touch_last_login:
+        updates["last_login_at"] = statement.excluded.last_login_at
+    return statement.on_conflict_do_update(
+        index_elements=[User.provider, User.provider_id],
+        set_=updates,
+    ).returning(User)
+
+
 async def upsert_user(
     session: AsyncSession,
     *,
@@ -34,30 +142,80 @@ async def upsert_user(
     provider_id: str,
     email: str,
     display_name: str,
+    is_admin: bool = False,
+    bootstrap_admin: bool = False,
+    touch_last_login: bool = True,
+    user_cache: TTLCache[User] | None = None,
+) -> User:
+    """Create or update a user from a provider login in one round trip.
+
+    ``is_admin`` grants admin outright; ``bootstrap_admin`` grants it only
+    if no admin exists yet, decided inside the same statement. Admin is
+    never revoked here. With ``touch_last_login=False`` an existing user's
+    last_login_at is left for a write-behind queue to update. Any cached
+    copy of the user is invalidated once the change commits, so an admin
+    promotion takes effect on the next request.
+    """
+
+    now = datetime.now(timezone.utc)
+    values = {
+        "id": str(uuid4()),
+        "email": normalize_email(email),
+        "provider": provider,
+        "provider_id": provider_id,
+        "display_name": display_name,
+        "created_at": now,
+        "last_login_at": now,
+    }
+    statement = upsert_user_statement(
+        session.get_bind().dialect.name,
+        values,
+        is_admin=is_admin,
+        bootstrap_admin=bootstrap_admin,
+        touch_last_login=touch_last_login,
+    )
+    if statement is not None:
+        result = await session.scalars(
+            statement,
+            execution_options={"populate_existing": True},
+        )
+        user = result.one()
+        await session.commit()
+    else:
+        user = await _upsert_user_fallback(
+            session,
+            values,
+            is_admin=is_admin or (bootstrap_admin and not await has_admin(session)),
+            touch_last_login=touch_last_login,
+        )
+    if user_cache is not None:
+        user_cache.discard(user.id)
+    return user
+
+
+async def _upsert_user_fallback(
+    session: AsyncSession,
+    values: dict[str, Any],
+    *,
     is_admin: bool,
+    touch_last_login: bool,
 ) -> User:
-    normalized_email = normalize_email(email)
     result = await session.execute(
-        select(User).where(User.provider == provider, User.provider_id == provider_id)
+        select(User).where(
+            User.provider == values["provider"],
+            User.provider_id == values["provider_id"],
+        )
     )
     user = result.scalar_one_or_none()
-    now = datetime.now(timezone.utc)
 
     if user is None:
-        user = User(
-            email=normalized_email,
-            provider=provider,
-            provider_id=provider_id,
-            display_name=display_name,
-            is_admin=is_admin,
-            created_at=now,
-            last_login_at=now,
-        )
+        user = User(**values, is_admin=is_admin)
         session.add(user)
     else:
-        user.email = normalized_email
-        user.display_name = display_name
-        user.last_login_at = now
+        user.email = values["email"]
+        user.display_name = values["display_name"]
+        if touch_last_login:
+            user.last_login_at = values["last_login_at"]
         if is_admin:
             user.is_admin = True
 
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 from typing import Any
 
 DEFAULT_CREATED_AT = datetime(1970, 1, 1, tzinfo=timezone.utc)
+REQUIRED_PAYLOAD_KEYS = frozenset({"system_name", "system_id", "created_at"})
+MAX_NAME_LENGTH = 200
+MAX_SYSTEM_ID_LENGTH = 64
+
+
+class WorkspaceValidationError(ValueError):
+    pass
+
+
+def normalize_workspace_name(name: str) -> str:
+    normalized = " ".join(name.split())
+    if not normalized:
+        raise WorkspaceValidationError("Workspace name is required")
+    if len(normalized) > MAX_NAME_LENGTH:
+        raise WorkspaceValidationError("Workspace name is too long")
+    return normalized
+
 
 @dataclass(frozen=True)
 class Workspace:
@@ -31,3 +48,23 @@ class Workspace:
             "system_id": self.system_id,
             "created_at": self.created_at.isoformat(),
         }
+
+
+def validate_workspace_payload(payload: Any) -> Workspace:
+    """Validate an imported payload and return it with a normalized name."""
+
+    if not isinstance(payload, dict):
+        raise WorkspaceValidationError("Workspace payload must be a JSON object")
+    missing_keys = REQUIRED_PAYLOAD_KEYS - payload.keys()
+    if missing_keys:
+        missing = ", ".join(sorted(missing_keys))
+        raise WorkspaceValidationError(f"Missing required fields: {missing}")
+    try:
+        workspace = Workspace.from_payload(payload)
+    except (TypeError, ValueError) as exc:
+        raise WorkspaceValidationError("Invalid created_at format") from exc
+    if not isinstance(workspace.system_name, str) or not isinstance(workspace.system_id, str):
+        raise WorkspaceValidationError("system_name and system_id must be strings")
+    if len(workspace.system_id) > MAX_SYSTEM_ID_LENGTH:
+        raise WorkspaceValidationError("system_id is too long")
+    return replace(workspace, system_name=normalize_workspace_name(workspace.system_name))
@@ -1,47 +1,1353 @@
 from __future__ import annotations
 
+import json
+import typing
+from collections.abc import AsyncIterator, Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Unpack
+from uuid import uuid4
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    JSON,
+    ColumnElement,
+    CompoundSelect,
+    CursorResult,
+    LargeBinary,
+    Select,
+    Subquery,
+    Text,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    type_coerce,
+    union,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer
+from sqlalchemy.sql.dml import ReturningUpdate
 
-from engine.models import WorkspaceRecord
+from engine.bodies import (
+    attach_bodies,
+    full_document,
+    full_document_expression,
+    load_bodies,
+    private_sections,
+    release_bodies,
+    store_body,
+)
+from engine.db import replica_ok
+from engine.executor import SerializationExecutor
+from engine.export import export_document
+from engine.ids import content_digest, verify_content_digest
+from engine.merkle import (
+    DIGEST_CHARS,
+    HashTree,
+    diff_trees,
+    fill_values,
+    hash_tree,
+    object_tree,
+    value_pointers,
+)
+from engine.models import WorkspaceBody, WorkspaceRecord, WorkspaceRevision
+from engine.pagination import DEFAULT_PAGE_SIZE, Cursor
+from engine.patch import (
+    Operation,
+    PatchError,
+    Pointer,
+    apply_patch,
+    changed_pointers,
+    changed_value,
+    changed_value_expression,
+    format_pointer,
+    patch_document,
+    patch_steps,
+    patched_documents,
+    pointer_value,
+    resolve,
+)
+from engine.revisions import (
+    DELTA_KINDS,
+    MERGE_DELTA,
+    Delta,
+    record_revisions,
+    record_snapshots,
+)
 
 
-async def list_workspaces(session: AsyncSession) -> list[WorkspaceRecord]:
-    result = await session.execute(
-        select(WorkspaceRecord).order_by(WorkspaceRecord.updated_at.desc())
+class WorkspaceConflict(Exception):
+    """A workspace was changed by someone else since the caller read it."""
+
+    def __init__(self, workspace_ids: Sequence[str]) -> None:
+        super().__init__("Workspace was changed by someone else: " + ", ".join(workspace_ids))
+        self.workspace_ids = list(workspace_ids)
+
+
+@dataclass(frozen=True)
+class WorkspaceExport:
+    """Columns needed to serve a workspace export."""
+
+    id: str
+    system_id: str
+    updated_at: datetime
+    export_sha256: str | None
+    payload_bytes: int | None = None
+    export_bytes: bytes | None = None
+    data: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class WorkspacePatch:
+    """A patched workspace's new version and the values at the changed paths."""
+
+    id: str
+    version: int
+    updated_at: datetime
+    changed: dict[str, Any]
+    removed: list[str]
+
+
+@dataclass(frozen=True)
+class WorkspaceTree:
+    """A workspace's Merkle tree as of ``version``; None until it is hashed."""
+
+    id: str
+    version: int
+    data_digest: str | None
+    data_tree: HashTree | None
+    data: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class WorkspaceDiff:
+    """RFC 6902 operations turning the left workspace's data into the right's."""
+
+    left: WorkspaceTree
+    right: WorkspaceTree
+    operations: list[Operation]
+
+
+@dataclass(frozen=True)
+class WorkspaceSummary:
+    """Columns shown on the workspace list; never includes the JSON payload."""
+
+    id: str
+    name: str
+    system_id: str
+    owner_id: str | None
+    created_at: datetime
+    updated_at: datetime
+    payload_bytes: int | None
+    section_counts: dict[str, int] | None
+
+
+def section_counts(data: dict[str, Any]) -> dict[str, int]:
+    """Count the entries of each top-level list or object in a payload."""
+
+    return {
+        key: len(value)
+        for key, value in data.items()
+        if isinstance(value, (list, dict))
+    }
+
+
+def section_counts_expression(document: ColumnElement[Any]) -> ColumnElement[Any]:
+    """section_counts of a JSONB document, computed by PostgreSQL."""
+
+    entries = func.jsonb_each(document).table_valued("key", "value")
+    kind = func.jsonb_typeof(entries.c.value)
+    keys = func.jsonb_object_keys(entries.c.value).table_valued("key")
+    count = case(
+        (kind == "array", func.jsonb_array_length(entries.c.value)),
+        else_=select(func.count()).select_from(keys).scalar_subquery(),
+    )
+    counts = (
+        select(func.coalesce(func.jsonb_object_agg(entries.c.key, count), literal_column("'{}'")))
+        .select_from(entries)
+        .where(kind.in_(["array", "object"]))
+        .scalar_subquery()
+    )
+    return cast(counts, JSON)
+
+
+def patched_summary_values(document: ColumnElement[Any]) -> dict[str, Any]:
+    """List-page columns for a row whose data becomes ``document`` in SQL.
+
+    section_counts is exact. payload_bytes moves by the change in the
+    document's JSONB text length, which spaces its separators where the
+    export does not, so it drifts by a byte or so per added element until
+    the materialize job the patch route queues rewrites it from the data.
+    """
+
+    data = type_coerce(WorkspaceRecord.data, JSONB)
+    return {
+        "section_counts": section_counts_expression(document),
+        "payload_bytes": WorkspaceRecord.payload_bytes
+        + func.octet_length(cast(document, Text))
+        - func.octet_length(cast(data, Text)),
+    }
+
+
+def materialize_tree(data: dict[str, Any]) -> dict[str, Any]:
+    digest, tree = hash_tree(data)
+    return {"data_digest": digest, "data_tree": tree}
+
+
+def materialize_export(data: dict[str, Any]) -> dict[str, Any]:
+    document = export_document(data)
+    return {
+        "export_bytes": document,
+        "export_sha256": content_digest(document),
+        "payload_bytes": len(document),
+        "section_counts": section_counts(data),
+        **materialize_tree(data),
+    }
+
+
+def verify_workspace_export(record: WorkspaceRecord) -> bool:
+    if record.export_bytes is None or record.export_sha256 is None:
+        return False
+    if not verify_content_digest(record.export_bytes, record.export_sha256):
+        return False
+    return export_document(record.data) == record.export_bytes
+
+
+def workspace_values(
+    *,
+    name: str,
+    system_id: str,
+    data: dict[str, Any],
+    created_at: datetime | None = None,
+    owner_id: str | None = None,
+) -> dict[str, Any]:
+    """Return the column values for a new workspace, derived columns included."""
+
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid4()),
+        "name": name,
+        "system_id": system_id,
+        "owner_id": owner_id,
+        "data": data,
+        "created_at": now if created_at is None else created_at,
+        "updated_at": now,
+        **materialize_export(data),
+    }
+
+
+SUMMARY_COLUMNS = (
+    WorkspaceRecord.id,
+    WorkspaceRecord.name,
+    WorkspaceRecord.system_id,
+    WorkspaceRecord.owner_id,
+    WorkspaceRecord.created_at,
+    WorkspaceRecord.updated_at,
+    WorkspaceRecord.payload_bytes,
+    WorkspaceRecord.section_counts,
+)
+
+
+def summary_cursor(summary: WorkspaceSummary) -> Cursor:
+    return Cursor(key=summary.updated_at, id=summary.id)
+
+
+async def list_workspaces(
+    session: AsyncSession,
+    *,
+    owner_id: str | None = None,
+    after: Cursor | None = None,
+    limit: int | None = None,
+) -> list[WorkspaceSummary]:
+    """List workspaces newest first, seeking past ``after`` on (updated_at, id).
+
+    The seek predicate and ordering match the (updated_at, id) indexes, so
+    every page costs the same regardless of how deep it is.
+    """
+
+    statement = select(*SUMMARY_COLUMNS).order_by(
+        WorkspaceRecord.updated_at.desc(),
+        WorkspaceRecord.id.desc(),
+    )
+    if owner_id is not None:
+        statement = statement.where(WorkspaceRecord.owner_id == owner_id)
+    if after is not None:
+        statement = statement.where(
+            tuple_(WorkspaceRecord.updated_at, WorkspaceRecord.id) < (after.key, after.id)
+        )
+    if limit is not None:
+        statement = statement.limit(limit)
+    result = await session.execute(replica_ok(statement))
+    return [WorkspaceSummary(**row._asdict()) for row in result]
+
+
+def control_document(control_id: str) -> dict[str, Any]:
+    """Containment pattern matching an SSP that implements ``control_id``."""
+
+    return {"control-implementation": {"implemented-requirements": [{"control-id": control_id}]}}
+
+
+def json_contains(document: Any, pattern: Any) -> bool:
+    """Python equivalent of PostgreSQL's jsonb ``@>`` containment."""
+
+    if isinstance(pattern, dict):
+        return isinstance(document, dict) and all(
+            key in document and json_contains(document[key], value)
+            for key, value in pattern.items()
+        )
+    if isinstance(pattern, list):
+        return isinstance(document, list) and all(
+            any(json_contains(item, wanted) for item in document) for wanted in pattern
+        )
+    return bool(document == pattern and type(document) is type(pattern))
+
+
+def search_workspaces_statement(
+    pattern: dict[str, Any],
+    *,
+    after: Cursor | None = None,
+    limit: int | None = None,
+) -> Select[Unpack[tuple[Any, ...]]]:
+    """Workspaces whose JSONB data contains ``pattern``, newest first.
+
+    Both arms of the UNION are answered from jsonb_path_ops GIN indexes on
+    PostgreSQL. A workspace whose own data contains the pattern matches,
+    since a clone's private sections override its body. Any other matching
+    clone takes the value of some top-level key of the pattern from its
+    body, so clones are found through the bodies containing one of those
+    values, and only they are checked against their full documents.
+    """
+
+    def matching(statement: Select[Any]) -> Select[Any]:
+        if after is not None:
+            statement = statement.where(
+                tuple_(WorkspaceRecord.updated_at, WorkspaceRecord.id) < (after.key, after.id)
+            )
+        return statement
+
+    data = type_coerce(WorkspaceRecord.data, JSONB)
+    body = type_coerce(WorkspaceBody.data, JSONB)
+    matched: Select[Any] | CompoundSelect[Any] = matching(
+        select(WorkspaceRecord.id).where(data.contains(pattern))
+    )
+    if pattern:
+        clones = (
+            select(WorkspaceRecord.id)
+            .join(WorkspaceBody, WorkspaceBody.digest == WorkspaceRecord.body_digest)
+            .where(
+                or_(*(body.contains({key: value}) for key, value in pattern.items())),
+                body.op("||", return_type=JSONB)(data).contains(pattern),
+            )
+        )
+        matched = union(matched, matching(clones))
+    ids = matched.subquery("matched")
+    statement = (
+        select(*SUMMARY_COLUMNS)
+        .join(ids, ids.c.id == WorkspaceRecord.id)
+        .order_by(WorkspaceRecord.updated_at.desc(), WorkspaceRecord.id.desc())
     )
-    return list(result.scalars())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def search_workspaces(
+    session: AsyncSession,
+    pattern: dict[str, Any],
+    *,
+    after: Cursor | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    scan_batch_size: int = 500,
+) -> list[WorkspaceSummary]:
+    """Search workspace content by JSON containment, paginated like list_workspaces.
+
+    Databases without jsonb scan the table in keyset batches and match in
+    Python; that is only meant for development databases.
+    """
+
+    if session.get_bind().dialect.name == "postgresql":
+        statement = search_workspaces_statement(pattern, after=after, limit=limit)
+        result = await session.execute(replica_ok(statement))
+        return [WorkspaceSummary(**row._asdict()) for row in result]
+
+    matches: list[WorkspaceSummary] = []
+    bodies: dict[str, dict[str, Any]] = {}
+    while len(matches) < limit:
+        statement = select(
+            *SUMMARY_COLUMNS, WorkspaceRecord.data, WorkspaceRecord.body_digest
+        ).order_by(
+            WorkspaceRecord.updated_at.desc(),
+            WorkspaceRecord.id.desc(),
+        )
+        if after is not None:
+            statement = statement.where(
+                tuple_(WorkspaceRecord.updated_at, WorkspaceRecord.id) < (after.key, after.id)
+            )
+        rows = (await session.execute(replica_ok(statement.limit(scan_batch_size)))).all()
+        missing = {row.body_digest for row in rows} - bodies.keys()
+        bodies.update(await load_bodies(session, missing, replica=True))
+        for row in rows:
+            values = row._asdict()
+            body_digest = values.pop("body_digest")
+            document = full_document(values.pop("data"), bodies.get(body_digest or ""))
+            if json_contains(document, pattern):
+                matches.append(WorkspaceSummary(**values))
+                if len(matches) == limit:
+                    break
+        if len(rows) < scan_batch_size:
+            break
+        after = Cursor(key=rows[-1].updated_at, id=rows[-1].id)
+    return matches
+
+
+def _filtered(
+    statement: Select[Any],
+    *,
+    owner_id: str | None,
+    updated_since: datetime | None,
+) -> Select[Any]:
+    if owner_id is not None:
+        statement = statement.where(WorkspaceRecord.owner_id == owner_id)
+    if updated_since is not None:
+        statement = statement.where(WorkspaceRecord.updated_at >= updated_since)
+    return statement
+
+
+async def count_workspaces(
+    session: AsyncSession,
+    *,
+    owner_id: str | None = None,
+    updated_since: datetime | None = None,
+) -> int:
+    statement = _filtered(
+        select(func.count()).select_from(WorkspaceRecord),
+        owner_id=owner_id,
+        updated_since=updated_since,
+    )
+    result = await session.execute(statement)
+    return int(result.scalar_one())
+
+
+async def stream_workspaces(
+    session: AsyncSession,
+    *,
+    owner_id: str | None = None,
+    updated_since: datetime | None = None,
+    include_export: bool = False,
+    batch_size: int = 500,
+) -> AsyncIterator[WorkspaceRecord]:
+    statement = _filtered(
+        select(WorkspaceRecord).order_by(WorkspaceRecord.id),
+        owner_id=owner_id,
+        updated_since=updated_since,
+    )
+    if include_export:
+        statement = statement.options(undefer(WorkspaceRecord.export_bytes))
+    # Clones of a few shared bodies are the common case; load those up front.
+    digests = await session.scalars(
+        replica_ok(
+            _filtered(
+                select(WorkspaceRecord.body_digest)
+                .where(WorkspaceRecord.body_digest.is_not(None))
+                .distinct(),
+                owner_id=owner_id,
+                updated_since=updated_since,
+            )
+        )
+    )
+    bodies = await load_bodies(session, digests, replica=True)
+    result = await session.stream_scalars(
+        statement.execution_options(yield_per=batch_size)
+    )
+    async for record in result:
+        await attach_bodies(session, [record], bodies)
+        yield record
 
 
 async def get_workspace(session: AsyncSession, workspace_id: str) -> WorkspaceRecord | None:
     result = await session.execute(
-        select(WorkspaceRecord).where(WorkspaceRecord.id == workspace_id)
+        replica_ok(select(WorkspaceRecord).where(WorkspaceRecord.id == workspace_id))
     )
-    return result.scalar_one_or_none()
+    record = result.scalar_one_or_none()
+    if record is not None:
+        await attach_bodies(session, [record])
+    return record
 
 
-async def delete_workspace(session: AsyncSession, workspace_id: str) -> bool:
-    record = await get_workspace(session, workspace_id)
-    if record is None:
-        return False
-    await session.delete(record)
+async def get_workspace_export(
+    session: AsyncSession,
+    workspace_id: str,
+    *,
+    include_data: bool = False,
+) -> WorkspaceExport | None:
+    """Read what serving a workspace export needs.
+
+    Only the validators and size are read unless ``include_data``, so a
+    conditional request is answered without fetching the document; the
+    stored export itself is read by read_workspace_export.
+    """
+
+    columns = [
+        WorkspaceRecord.id,
+        WorkspaceRecord.system_id,
+        WorkspaceRecord.updated_at,
+        WorkspaceRecord.export_sha256,
+        WorkspaceRecord.payload_bytes,
+    ]
+    if include_data:
+        columns += [WorkspaceRecord.data, WorkspaceRecord.body_digest]
+    result = await session.execute(
+        replica_ok(select(*columns).where(WorkspaceRecord.id == workspace_id))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    values = row._asdict()
+    body_digest = values.pop("body_digest", None)
+    if body_digest is not None:
+        bodies = await load_bodies(session, [body_digest], replica=True)
+        values["data"] = full_document(values["data"], bodies[body_digest])
+    return WorkspaceExport(**values)
+
+
+# Stored exports are streamed this many bytes at a time, each read in its own
+# short session, so a slow download holds neither a connection nor the whole
+# document.
+EXPORT_READ_BYTES = 1024 * 1024
+
+
+async def read_workspace_export(
+    session: AsyncSession,
+    workspace_id: str,
+    export_sha256: str,
+    offset: int = 0,
+) -> bytes | None:
+    """Read up to EXPORT_READ_BYTES of a stored export, starting at ``offset``.
+
+    Returns None if the stored export no longer has digest ``export_sha256``.
+    """
+
+    chunk = func.substr(
+        WorkspaceRecord.export_bytes, offset + 1, EXPORT_READ_BYTES, type_=LargeBinary
+    )
+    return await session.scalar(
+        replica_ok(
+            select(chunk).where(
+                WorkspaceRecord.id == workspace_id,
+                WorkspaceRecord.export_sha256 == export_sha256,
+            )
+        )
+    )
+
+
+async def iter_workspace_export(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    workspace_id: str,
+    export_sha256: str,
+    first: bytes,
+) -> AsyncIterator[bytes]:
+    """Yield a stored export whose first read returned ``first``.
+
+    Raises WorkspaceConflict if the export is rewritten mid-stream, so the
+    response is cut short instead of splicing two versions together.
+    """
+
+    chunk = first
+    offset = 0
+    while True:
+        yield chunk
+        if len(chunk) < EXPORT_READ_BYTES:
+            return
+        offset += len(chunk)
+        async with sessionmaker() as session:
+            next_chunk = await read_workspace_export(
+                session, workspace_id, export_sha256, offset
+            )
+        if next_chunk is None:
+            raise WorkspaceConflict([workspace_id])
+        chunk = next_chunk
+
+
+async def refresh_workspace_export(
+    session: AsyncSession,
+    workspace_id: str,
+    *,
+    executor: SerializationExecutor | None = None,
+) -> WorkspaceExport | None:
+    """Rematerialize a workspace's derived columns from its data.
+
+    Reads the primary, since the write is a compare and swap on the version
+    it read. Returns None if the workspace does not exist.
+    """
+
+    row = (
+        await session.execute(
+            select(
+                WorkspaceRecord.system_id,
+                WorkspaceRecord.updated_at,
+                WorkspaceRecord.version,
+                WorkspaceRecord.data,
+                WorkspaceRecord.body_digest,
+                WorkspaceRecord.payload_bytes,
+            ).where(WorkspaceRecord.id == workspace_id)
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    bodies = await load_bodies(session, [row.body_digest])
+    data = full_document(row.data, bodies.get(row.body_digest or ""))
+    if executor is None:
+        materialized = materialize_export(data)
+    else:
+        materialized = await executor.run(materialize_export, data, size=row.payload_bytes)
+    await session.execute(
+        update(WorkspaceRecord)
+        .where(
+            WorkspaceRecord.id == workspace_id,
+            WorkspaceRecord.version == row.version,
+        )
+        .values(**materialized)
+    )
     await session.commit()
-    return True
+    return WorkspaceExport(
+        id=workspace_id,
+        system_id=row.system_id,
+        updated_at=row.updated_at,
+        export_sha256=materialized["export_sha256"],
+        payload_bytes=materialized["payload_bytes"],
+        export_bytes=materialized["export_bytes"],
+        data=data,
+    )
 
 
-async def rename_workspace(session: AsyncSession, workspace_id: str, name: str) -> bool:
-    record = await get_workspace(session, workspace_id)
-    if record is None:
-        return False
-    record.name = name
-    if isinstance(record.data, dict):
-        record.data = {**record.data, "system_name": name}
-    record.updated_at = datetime.now(timezone.utc)
+async def stale_workspaces(session: AsyncSession, workspace_ids: Sequence[str]) -> list[str]:
+    """The ids among ``workspace_ids`` whose derived columns were cleared."""
+
+    if not workspace_ids:
+        return []
+    result = await session.scalars(
+        select(WorkspaceRecord.id)
+        .where(
+            WorkspaceRecord.id.in_(workspace_ids),
+            or_(WorkspaceRecord.export_sha256.is_(None), WorkspaceRecord.data_digest.is_(None)),
+        )
+        .order_by(WorkspaceRecord.id)
+    )
+    return list(result)
+
+
+# Columns derived from ``data``. SQL-side edits that cannot keep them exact
+# clear them, and the routes queue the workspace for JobRunner.materialize,
+# which runs refresh_workspace_export off the request path. Until then the
+# export route encodes from ``data`` and diff_workspaces rehashes the tree
+# through refresh_workspace_tree.
+STALE_EXPORT_VALUES: dict[str, Any] = {
+    "export_bytes": None,
+    "export_sha256": None,
+    "payload_bytes": None,
+    "data_digest": None,
+    "data_tree": None,
+}
+
+# Above this many changed paths, a diff loads the right document instead of
+# extracting each value with ``#>``.
+MAX_SQL_VALUES = 100
+MAX_DIFF_ATTEMPTS = 3
+
+
+async def get_workspace_trees(
+    session: AsyncSession,
+    workspace_ids: Sequence[str],
+) -> dict[str, WorkspaceTree]:
+    result = await session.execute(
+        replica_ok(
+            select(
+                WorkspaceRecord.id,
+                WorkspaceRecord.version,
+                WorkspaceRecord.data_digest,
+                WorkspaceRecord.data_tree,
+            ).where(WorkspaceRecord.id.in_(workspace_ids))
+        )
+    )
+    return {row.id: WorkspaceTree(**row._asdict()) for row in result}
+
+
+async def refresh_workspace_tree(
+    session: AsyncSession,
+    workspace_id: str,
+    *,
+    executor: SerializationExecutor | None = None,
+) -> WorkspaceTree | None:
+    """Hash a workspace whose tree was cleared by a SQL-side edit."""
+
+    row = (
+        await session.execute(
+            select(
+                WorkspaceRecord.version, WorkspaceRecord.data, WorkspaceRecord.body_digest
+            ).where(WorkspaceRecord.id == workspace_id)
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    bodies = await load_bodies(session, [row.body_digest])
+    data = full_document(row.data, bodies.get(row.body_digest or ""))
+    if executor is None:
+        materialized = materialize_tree(data)
+    else:
+        materialized = await executor.run(materialize_tree, data)
+    await session.execute(
+        update(WorkspaceRecord)
+        .where(WorkspaceRecord.id == workspace_id, WorkspaceRecord.version == row.version)
+        .values(**materialized)
+    )
+    await session.commit()
+    return WorkspaceTree(id=workspace_id, version=row.version, data=data, **materialized)
+
+
+async def _values_at(
+    session: AsyncSession,
+    tree: WorkspaceTree,
+    pointers: Sequence[Pointer],
+) -> dict[Pointer, Any] | None:
+    """Values at ``pointers`` in the workspace; None if it is past ``tree.version``."""
+
+    if not pointers:
+        return {}
+    if tree.data is not None:
+        return {pointer: resolve(tree.data, pointer) for pointer in pointers}
+    at_version = (WorkspaceRecord.id == tree.id, WorkspaceRecord.version == tree.version)
+    if session.get_bind().dialect.name == "postgresql" and len(pointers) <= MAX_SQL_VALUES:
+        data = full_document_expression()
+        values = (
+            await session.execute(
+                replica_ok(
+                    select(*(pointer_value(data, pointer) for pointer in pointers)).where(
+                        *at_version
+                    )
+                )
+            )
+        ).one_or_none()
+        return None if values is None else dict(zip(pointers, values))
+    row = (
+        await session.execute(
+            replica_ok(
+                select(WorkspaceRecord.data, WorkspaceRecord.body_digest).where(*at_version)
+            )
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    bodies = await load_bodies(session, [row.body_digest], replica=True)
+    document = full_document(row.data, bodies.get(row.body_digest or ""))
+    return {pointer: resolve(document, pointer) for pointer in pointers}
+
+
+async def diff_workspaces(
+    session: AsyncSession,
+    left_id: str,
+    right_id: str,
+    *,
+    executor: SerializationExecutor | None = None,
+) -> WorkspaceDiff | None:
+    """Diff two workspaces' data by comparing their stored Merkle trees.
+
+    Only subtrees whose digests differ are visited, and only the values at
+    the changed paths are read; on PostgreSQL they are extracted with ``#>``
+    so the documents themselves stay in the database. Trees cleared by a
+    SQL-side edit are rehashed first.
+
+    Returns None if either workspace does not exist. Raises WorkspaceConflict
+    if the right workspace keeps changing while it is read.
+    """
+
+    for _ in range(MAX_DIFF_ATTEMPTS):
+        trees = await get_workspace_trees(session, [left_id, right_id])
+        for workspace_id in (left_id, right_id):
+            tree = trees.get(workspace_id)
+            if tree is not None and tree.data_tree is None:
+                tree = await refresh_workspace_tree(session, workspace_id, executor=executor)
+            if tree is None:
+                return None
+            trees[workspace_id] = tree
+        left, right = trees[left_id], trees[right_id]
+        assert left.data_tree is not None and right.data_tree is not None
+        operations = diff_trees(left.data_tree, right.data_tree)
+        values = await _values_at(session, right, value_pointers(operations))
+        if values is not None:
+            return WorkspaceDiff(
+                left=left, right=right, operations=fill_values(operations, values.__getitem__)
+            )
+    raise WorkspaceConflict([right_id])
+
+
+def system_name_expression(dialect_name: str, name: str) -> ColumnElement[Any] | None:
+    """``data`` with system_name replaced, computed by the database.
+
+    Returns None for dialects without a JSON set function.
+    """
+
+    if dialect_name == "postgresql":
+        return func.jsonb_set(
+            WorkspaceRecord.data,
+            literal_column("ARRAY['system_name']"),
+            func.to_jsonb(cast(literal(name), Text)),
+            type_=JSONB,
+        )
+    if dialect_name == "sqlite":
+        return func.json_set(WorkspaceRecord.data, "$.system_name", name)
+    return None
+
+
+def renamed_payload_bytes(dialect_name: str, name: str) -> ColumnElement[Any] | None:
+    """``payload_bytes`` after system_name becomes ``name``, computed by the database.
+
+    Adjusts the stored size by the change in the encoded name's length. The
+    database encodes non-ASCII characters as UTF-8 where the export escapes
+    them, so for such names the result is a few bytes off until the
+    materialize job replaces it. On PostgreSQL renames that splice the
+    export take its exact length instead (see renamed_materialized).
+    """
+
+    if dialect_name == "postgresql":
+        data = type_coerce(WorkspaceRecord.data, JSONB)
+        old = func.octet_length(cast(data.op("->", return_type=JSONB)("system_name"), Text))
+    elif dialect_name == "sqlite":
+        old = func.length(func.json_quote(func.json_extract(WorkspaceRecord.data, "$.system_name")))
+    else:
+        return None
+    return WorkspaceRecord.payload_bytes + len(json.dumps(name)) - old
+
+
+def _root_digest(children: ColumnElement[Any]) -> ColumnElement[Any]:
+    """hash_tree's root digest over a JSONB object of child nodes, or NULL.
+
+    PostgreSQL only encodes keys the way the tree does when they are
+    printable ASCII; for any other key the digest is left NULL.
+    """
+
+    entries = func.jsonb_each(children).table_valued("key", "value")
+    node = entries.c.value
+    scalar = node.op("#>>", return_type=Text)(literal_column("'{}'"))
+    child_digest = case(
+        (func.jsonb_typeof(node) == "string", scalar),
+        else_=node.op("->>", return_type=Text)(0),
+    )
+    body = func.string_agg(
+        cast(func.to_jsonb(entries.c.key), Text) + child_digest,
+        aggregate_order_by(literal_column("''"), entries.c.key.collate("C")),
+    )
+    digest = func.left(
+        func.encode(func.sha256(func.convert_to(literal("o") + body, "UTF8")), "hex"),
+        DIGEST_CHARS,
+    )
+    return (
+        select(case((func.bool_and(entries.c.key.regexp_match("^[ -~]*$")), digest)))
+        .select_from(entries)
+        .scalar_subquery()
+    )
+
+
+def renamed_materialized(
+    workspace_ids: Sequence[str],
+    name: str,
+    expected_versions: Mapping[str, int],
+) -> Subquery:
+    """Rows to rename, locked, with their export and tree for ``name`` (PostgreSQL).
+
+    A rename only changes the compact export's top-level system_name entry,
+    so the new entry is spliced over the old one, found by its encoding, and
+    only the tree's root is rehashed over the new leaf. ``export_bytes`` and
+    ``data_digest`` come back NULL where that would not be exact, leaving
+    them to the materialize job: the old entry is not found exactly once
+    (names PostgreSQL encodes differently, or a nested system_name with the
+    same value), or a top-level key is not printable ASCII.
+    """
+
+    data = type_coerce(WorkspaceRecord.data, JSONB)
+    old_entry = func.convert_to(
+        literal('"system_name":') + cast(data.op("->", return_type=JSONB)("system_name"), Text),
+        "UTF8",
+    )
+    tree = cast(WorkspaceRecord.data_tree, JSONB).op("->", return_type=JSONB)(1)
+    located = (
+        select(
+            WorkspaceRecord.id,
+            WorkspaceRecord.export_bytes,
+            old_entry.label("old_entry"),
+            func.pg_catalog.position(WorkspaceRecord.export_bytes, old_entry).label("at"),
+            func.jsonb_set(
+                tree,
+                literal_column("ARRAY['system_name']"),
+                func.to_jsonb(cast(literal(hash_tree(name)[0]), Text)),
+                type_=JSONB,
+            ).label("children"),
+        )
+        .where(version_matches(workspace_ids, expected_versions))
+        .with_for_update()
+        .subquery("located")
+    )
+    new_entry = literal(b'"system_name":' + json.dumps(name).encode())
+    after = func.substring(located.c.export_bytes, located.c.at + 1)
+    found_once = and_(located.c.at > 0, func.pg_catalog.position(after, located.c.old_entry) == 0)
+    return (
+        select(
+            located.c.id,
+            case(
+                (
+                    found_once,
+                    func.overlay(
+                        located.c.export_bytes,
+                        new_entry,
+                        located.c.at,
+                        func.octet_length(located.c.old_entry),
+                    ),
+                ),
+            ).label("export_bytes"),
+            located.c.children,
+            _root_digest(located.c.children).label("data_digest"),
+        )
+        # Keeps PostgreSQL from inlining the splice into each column using it.
+        .offset(0)
+        .subquery("renamed")
+    )
+
+
+def version_matches(
+    workspace_ids: Sequence[str],
+    expected_versions: Mapping[str, int],
+) -> ColumnElement[bool]:
+    """Rows among ``workspace_ids`` still at the version the caller read.
+
+    Ids without an expected version match unconditionally.
+    """
+
+    checked = [
+        (workspace_id, expected_versions[workspace_id])
+        for workspace_id in workspace_ids
+        if workspace_id in expected_versions
+    ]
+    unchecked = [
+        workspace_id for workspace_id in workspace_ids if workspace_id not in expected_versions
+    ]
+    clauses = []
+    if unchecked:
+        clauses.append(WorkspaceRecord.id.in_(unchecked))
+    if checked:
+        clauses.append(tuple_(WorkspaceRecord.id, WorkspaceRecord.version).in_(checked))
+    return or_(*clauses)
+
+
+async def _raise_on_conflict(
+    session: AsyncSession,
+    workspace_ids: Sequence[str],
+    written: Sequence[str],
+    expected_versions: Mapping[str, int],
+) -> None:
+    """Roll back and raise WorkspaceConflict if a version check failed.
+
+    A checked id that was not written either no longer exists, which callers
+    report as missing, or has moved on to another version.
+    """
+
+    missed = [
+        workspace_id
+        for workspace_id in workspace_ids
+        if workspace_id in expected_versions and workspace_id not in written
+    ]
+    if not missed:
+        return
+    changed = list(
+        await session.scalars(
+            select(WorkspaceRecord.id).where(WorkspaceRecord.id.in_(missed))
+        )
+    )
+    if changed:
+        await session.rollback()
+        raise WorkspaceConflict(changed)
+
+
+def rename_workspaces_statement(
+    dialect_name: str,
+    workspace_ids: Sequence[str],
+    name: str,
+    expected_versions: Mapping[str, int] | None = None,
+) -> ReturningUpdate[str, int] | None:
+    """UPDATE ... RETURNING id, version renaming workspaces without loading their data.
+
+    Rows whose version differs from ``expected_versions`` are left alone;
+    renamed rows move to the next version. On PostgreSQL the materialized
+    export and tree are updated for the new name in the same statement;
+    elsewhere they are cleared for the materialize job.
+    """
+
+    data = system_name_expression(dialect_name, name)
+    payload_bytes = renamed_payload_bytes(dialect_name, name)
+    if data is None or payload_bytes is None:
+        return None
+    values: dict[str, Any] = {**STALE_EXPORT_VALUES, "payload_bytes": payload_bytes}
+    statement = update(WorkspaceRecord)
+    if dialect_name == "postgresql":
+        renamed = renamed_materialized(workspace_ids, name, expected_versions or {})
+        export_bytes = renamed.c.export_bytes
+        statement = statement.where(WorkspaceRecord.id == renamed.c.id)
+        values = {
+            "export_bytes": export_bytes,
+            "export_sha256": func.encode(func.sha256(export_bytes), "hex"),
+            "payload_bytes": func.coalesce(func.octet_length(export_bytes), payload_bytes),
+            "data_digest": renamed.c.data_digest,
+            "data_tree": case(
+                (
+                    renamed.c.data_digest.is_not(None),
+                    cast(func.jsonb_build_array(renamed.c.data_digest, renamed.c.children), JSON),
+                ),
+            ),
+        }
+    else:
+        statement = statement.where(version_matches(workspace_ids, expected_versions or {}))
+    return (
+        statement.values(
+            name=name,
+            data=data,
+            version=WorkspaceRecord.version + 1,
+            updated_at=datetime.now(timezone.utc),
+            **values,
+        )
+        .returning(WorkspaceRecord.id, WorkspaceRecord.version)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rename_workspace(
+    session: AsyncSession,
+    workspace_id: str,
+    name: str,
+    *,
+    expected_version: int | None = None,
+) -> bool:
+    expected = {} if expected_version is None else {workspace_id: expected_version}
+    return bool(await rename_workspaces(session, {workspace_id: name}, expected))
+
+
+async def rename_workspaces(
+    session: AsyncSession,
+    names: Mapping[str, str],
+    expected_versions: Mapping[str, int] | None = None,
+) -> list[str]:
+    """Rename workspaces by id in one transaction; returns the ids that existed.
+
+    Workspaces sharing a new name are renamed by one statement. If any
+    workspace in ``expected_versions`` has been written since that version
+    was read, nothing is renamed and WorkspaceConflict is raised. So it is
+    too when, on dialects renaming row by row, an unchecked workspace keeps
+    changing under the rename.
+    """
+
+    expected_versions = expected_versions or {}
+    by_name: dict[str, list[str]] = {}
+    for workspace_id, name in names.items():
+        by_name.setdefault(name, []).append(workspace_id)
+    dialect_name = session.get_bind().dialect.name
+    versions: dict[str, int] = {}
+    for name, workspace_ids in by_name.items():
+        statement = rename_workspaces_statement(
+            dialect_name, workspace_ids, name, expected_versions
+        )
+        if statement is None:
+            versions.update(
+                await _rename_workspaces_fallback(session, workspace_ids, name, expected_versions)
+            )
+        else:
+            versions.update((row.id, row.version) for row in await session.execute(statement))
+    await _raise_on_conflict(session, list(names), list(versions), expected_versions)
+    await record_revisions(
+        session,
+        [
+            Delta(workspace_id, version, MERGE_DELTA, {"system_name": names[workspace_id]})
+            for workspace_id, version in versions.items()
+        ],
+    )
     await session.commit()
-    return True
+    return list(versions)
+
+
+MAX_RENAME_ATTEMPTS = 3
+
+
+async def _rename_workspaces_fallback(
+    session: AsyncSession,
+    workspace_ids: Sequence[str],
+    name: str,
+    expected_versions: Mapping[str, int],
+) -> dict[str, int]:
+    """Renamed ids and their new versions.
+
+    Raises WorkspaceConflict if an unchecked workspace keeps changing under
+    the rename.
+    """
+
+    renamed = {}
+    for workspace_id in workspace_ids:
+        for _ in range(MAX_RENAME_ATTEMPTS):
+            record = await session.get(WorkspaceRecord, workspace_id, populate_existing=True)
+            if record is None:
+                break
+            version = expected_versions.get(workspace_id, record.version)
+            data = record.data
+            if isinstance(data, dict):
+                data = {**data, "system_name": name}
+            bodies = await load_bodies(session, [record.body_digest])
+            document = full_document(data, bodies.get(record.body_digest or ""))
+            # Compare and swap against the version the new data was computed from.
+            result = await session.execute(
+                update(WorkspaceRecord)
+                .where(WorkspaceRecord.id == workspace_id, WorkspaceRecord.version == version)
+                .values(
+                    name=name,
+                    data=data,
+                    version=version + 1,
+                    updated_at=datetime.now(timezone.utc),
+                    **materialize_export(document),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if typing.cast(CursorResult[Any], result).rowcount:
+                renamed[workspace_id] = version + 1
+                break
+            if workspace_id in expected_versions:
+                break
+            # Unchecked rename lost a race; reread and apply it on top.
+        else:
+            await session.rollback()
+            raise WorkspaceConflict([workspace_id])
+    return renamed
+
+
+async def patch_workspace(
+    session: AsyncSession,
+    workspace_id: str,
+    kind: str,
+    patch: Any,
+    *,
+    expected_version: int | None = None,
+) -> WorkspacePatch | None:
+    """Apply a parsed merge patch or JSON Patch to a workspace's data.
+
+    On PostgreSQL the patch becomes one UPDATE ... FROM built from
+    jsonb_set and friends that returns only the values at the changed paths,
+    so the document itself never crosses the wire. Elsewhere, for clones, or
+    for pointers the SQL translation cannot express, the document is patched
+    in Python and written back with a version check.
+
+    Returns None if the workspace does not exist. Raises PatchError if the
+    patch does not apply and WorkspaceConflict if the workspace is no longer
+    at ``expected_version``.
+    """
+
+    pointers = changed_pointers(kind, patch)
+    steps = None
+    if session.get_bind().dialect.name == "postgresql":
+        steps = patch_steps(kind, patch)
+    if steps is None:
+        return await _patch_workspace_fallback(
+            session, workspace_id, kind, patch, pointers, expected_version
+        )
+
+    patched = patched_documents(
+        select(
+            WorkspaceRecord.id,
+            WorkspaceRecord.version,
+            type_coerce(WorkspaceRecord.data, JSONB).label("document"),
+        ).where(WorkspaceRecord.id == workspace_id, WorkspaceRecord.body_digest.is_(None)),
+        steps,
+    )
+    conditions = [
+        WorkspaceRecord.id == patched.c.id,
+        # Rechecked against the locked row, so a concurrent write between
+        # reading and updating fails the UPDATE instead of being lost.
+        WorkspaceRecord.version == patched.c.version,
+        patched.c.applies,
+    ]
+    if expected_version is not None:
+        conditions.append(WorkspaceRecord.version == expected_version)
+    data = type_coerce(WorkspaceRecord.data, JSONB)
+    values = [changed_value_expression(data, pointer) for pointer in pointers]
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        update(WorkspaceRecord)
+        .where(*conditions)
+        .values(
+            data=patched.c.document,
+            version=WorkspaceRecord.version + 1,
+            updated_at=now,
+            **{**STALE_EXPORT_VALUES, **patched_summary_values(patched.c.document)},
+        )
+        .returning(
+            WorkspaceRecord.version,
+            *values,
+            *(value.is_not(None) for value in values),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None:
+        version = await session.scalar(
+            select(WorkspaceRecord.version).where(WorkspaceRecord.id == workspace_id)
+        )
+        await session.rollback()
+        if version is None:
+            return None
+        if expected_version is not None and version != expected_version:
+            raise WorkspaceConflict([workspace_id])
+        # Either the patch does not apply, and the Python implementation
+        # says why, or the row changed under an unconditional patch.
+        return await _patch_workspace_fallback(
+            session, workspace_id, kind, patch, pointers, expected_version
+        )
+    await record_revisions(
+        session, [Delta(workspace_id, row[0], DELTA_KINDS[kind], patch_document(kind, patch))]
+    )
+    await session.commit()
+    found = row[1 + len(pointers) :]
+    return WorkspacePatch(
+        id=workspace_id,
+        version=row[0],
+        updated_at=now,
+        changed={
+            format_pointer(pointer): value
+            for pointer, value, exists in zip(pointers, row[1:], found)
+            if exists
+        },
+        removed=[
+            format_pointer(pointer) for pointer, exists in zip(pointers, found) if not exists
+        ],
+    )
+
+
+async def _patch_workspace_fallback(
+    session: AsyncSession,
+    workspace_id: str,
+    kind: str,
+    patch: Any,
+    pointers: Sequence[Pointer],
+    expected_version: int | None,
+) -> WorkspacePatch | None:
+    while True:
+        row = (
+            await session.execute(
+                select(
+                    WorkspaceRecord.data, WorkspaceRecord.body_digest, WorkspaceRecord.version
+                ).where(WorkspaceRecord.id == workspace_id)
+            )
+        ).one_or_none()
+        if row is None:
+            await session.rollback()
+            return None
+        if expected_version is not None and row.version != expected_version:
+            await session.rollback()
+            raise WorkspaceConflict([workspace_id])
+        bodies = await load_bodies(session, [row.body_digest])
+        body = bodies.get(row.body_digest or "")
+        try:
+            data = apply_patch(kind, full_document(row.data, body), patch)
+        except PatchError:
+            await session.rollback()
+            raise
+        # A clone stores only the sections that now differ from its body, or
+        # the whole document once a patch removes one of the body's sections.
+        private = None if body is None else private_sections(data, body)
+        now = datetime.now(timezone.utc)
+        result = await session.execute(
+            update(WorkspaceRecord)
+            .where(WorkspaceRecord.id == workspace_id, WorkspaceRecord.version == row.version)
+            .values(
+                data=data if private is None else private,
+                body_digest=None if private is None else row.body_digest,
+                version=row.version + 1,
+                updated_at=now,
+                **materialize_export(data),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if not typing.cast(CursorResult[Any], result).rowcount:
+            # Lost a race with another unconditional write; patch its result.
+            await session.rollback()
+            continue
+        await record_revisions(
+            session,
+            [Delta(workspace_id, row.version + 1, DELTA_KINDS[kind], patch_document(kind, patch))],
+        )
+        await session.commit()
+        changed: dict[str, Any] = {}
+        removed: list[str] = []
+        for pointer in pointers:
+            try:
+                changed[format_pointer(pointer)] = changed_value(data, pointer)
+            except PatchError:
+                removed.append(format_pointer(pointer))
+        return WorkspacePatch(
+            id=workspace_id,
+            version=row.version + 1,
+            updated_at=now,
+            changed=changed,
+            removed=removed,
+        )
+
+
+async def delete_workspace(
+    session: AsyncSession,
+    workspace_id: str,
+    *,
+    expected_version: int | None = None,
+) -> bool:
+    expected = {} if expected_version is None else {workspace_id: expected_version}
+    return bool(await delete_workspaces(session, [workspace_id], expected))
+
+
+async def delete_workspaces(
+    session: AsyncSession,
+    workspace_ids: Sequence[str],
+    expected_versions: Mapping[str, int] | None = None,
+) -> list[str]:
+    """DELETE ... RETURNING id; returns the ids that existed.
+
+    As with rename_workspaces, a workspace written since the version in
+    ``expected_versions`` aborts the whole delete with WorkspaceConflict.
+    """
+
+    if not workspace_ids:
+        return []
+    expected_versions = expected_versions or {}
+    matches = version_matches(workspace_ids, expected_versions)
+    statement = (
+        delete(WorkspaceRecord)
+        .where(matches)
+        .execution_options(synchronize_session=False)
+    )
+    if session.get_bind().dialect.delete_returning:
+        deleted = list(await session.scalars(statement.returning(WorkspaceRecord.id)))
+    else:
+        existing = await session.scalars(
+            select(WorkspaceRecord.id).where(matches)
+        )
+        deleted = list(existing)
+        await session.execute(statement)
+    await _raise_on_conflict(session, workspace_ids, deleted, expected_versions)
+    if deleted:
+        await session.execute(
+            delete(WorkspaceRevision).where(WorkspaceRevision.workspace_id.in_(deleted))
+        )
+        await release_bodies(session)
+    await session.commit()
+    return deleted
 
 
 async def create_workspace(
@@ -53,17 +1359,201 @@ async def create_workspace(
     created_at: datetime | None = None,
     owner_id: str | None = None,
 ) -> WorkspaceRecord:
-    if created_at is None:
-        created_at = datetime.now(timezone.utc)
     record = WorkspaceRecord(
-        name=name,
-        system_id=system_id,
-        owner_id=owner_id,
-        data=data,
-        created_at=created_at,
-        updated_at=datetime.now(timezone.utc),
+        **workspace_values(
+            name=name,
+            system_id=system_id,
+            data=data,
+            created_at=created_at,
+            owner_id=owner_id,
+        )
     )
     session.add(record)
+    await session.flush()
+    await record_snapshots(session, [record.id])
     await session.commit()
     await session.refresh(record)
     return record
+
+
+MAX_CLONE_ATTEMPTS = 3
+
+
+def cloned_data_expression(
+    dialect_name: str, identity: Mapping[str, str]
+) -> ColumnElement[Any] | None:
+    """``data`` with a clone's identity fields, computed by the database.
+
+    Returns None for dialects without a JSON set function.
+    """
+
+    if dialect_name == "postgresql":
+        pairs = [
+            part for key, value in identity.items() for part in (key, cast(literal(value), Text))
+        ]
+        return type_coerce(WorkspaceRecord.data, JSONB).op("||", return_type=JSONB)(
+            func.jsonb_build_object(*pairs)
+        )
+    if dialect_name == "sqlite":
+        paths = [part for key, value in identity.items() for part in (f"$.{key}", value)]
+        return func.json_set(WorkspaceRecord.data, *paths)
+    return None
+
+
+async def clone_workspace(
+    session: AsyncSession,
+    source_id: str,
+    *,
+    name: str,
+    system_id: str,
+    owner_id: str | None = None,
+) -> str | None:
+    """Create a workspace sharing ``source_id``'s document; returns its id.
+
+    The clone refers to the source's body in workspace_bodies and stores only
+    its own name, system id and creation time. The first clone of a document
+    copies it into workspace_bodies with INSERT ... SELECT, and later clones
+    of the same content only touch the body, so no document is read or sent
+    here. A clone of a clone shares the same body and copies the source's
+    private sections. The clone's tree is the source's with its identity
+    leaves replaced; its export is left to the materialize job.
+
+    A source edited in SQL that the materialize job has not rehashed yet has
+    no digest to share a body under, so it is copied whole, again with
+    INSERT ... SELECT.
+
+    Returns None if the source does not exist. Raises WorkspaceConflict if it
+    keeps changing while being cloned.
+    """
+
+    for _ in range(MAX_CLONE_ATTEMPTS):
+        source = (
+            await session.execute(
+                select(
+                    WorkspaceRecord.version,
+                    WorkspaceRecord.body_digest,
+                    WorkspaceRecord.data_digest,
+                    WorkspaceRecord.data_tree,
+                    WorkspaceRecord.section_counts,
+                ).where(WorkspaceRecord.id == source_id)
+            )
+        ).one_or_none()
+        if source is None:
+            await session.rollback()
+            return None
+        now = datetime.now(timezone.utc)
+        identity = {"system_name": name, "system_id": system_id, "created_at": now.isoformat()}
+        workspace_id = str(uuid4())
+        if source.body_digest is None and source.data_digest is None:
+            copied = await _copy_workspace(
+                session, source_id, source.version, workspace_id, identity, owner_id, now
+            )
+            if copied is None:
+                await refresh_workspace_tree(session, source_id)
+                continue
+            if not copied:
+                await session.rollback()
+                continue
+            await record_snapshots(session, [workspace_id])
+            await session.commit()
+            return workspace_id
+
+        private: dict[str, Any] | None = {}
+        digest = source.body_digest
+        if digest is not None:
+            private = await session.scalar(
+                select(WorkspaceRecord.data).where(
+                    WorkspaceRecord.id == source_id, WorkspaceRecord.version == source.version
+                )
+            )
+        else:
+            digest = source.data_digest
+        if private is None or not await store_body(session, digest, source_id, source.version):
+            await session.rollback()
+            continue
+
+        data = {**private, **identity}
+        tree: dict[str, Any] = {}
+        if source.data_tree is not None:
+            leaves = {key: hash_tree(value)[1] for key, value in identity.items()}
+            data_digest, data_tree = object_tree({**source.data_tree[1], **leaves})
+            tree = {"data_digest": data_digest, "data_tree": data_tree}
+        await session.execute(
+            insert(WorkspaceRecord).values(
+                id=workspace_id,
+                name=name,
+                system_id=system_id,
+                owner_id=owner_id,
+                data=data,
+                body_digest=digest,
+                section_counts=None
+                if source.section_counts is None
+                else {**source.section_counts, **section_counts(data)},
+                created_at=now,
+                updated_at=now,
+                **{**STALE_EXPORT_VALUES, **tree},
+            )
+        )
+        await record_snapshots(session, [workspace_id])
+        await session.commit()
+        return workspace_id
+    raise WorkspaceConflict([source_id])
+
+
+async def _copy_workspace(
+    session: AsyncSession,
+    source_id: str,
+    version: int,
+    workspace_id: str,
+    identity: Mapping[str, str],
+    owner_id: str | None,
+    now: datetime,
+) -> bool | None:
+    """Copy a workspace's data under a clone's identity with INSERT ... SELECT.
+
+    Returns False if the source is no longer at ``version``, and None if the
+    dialect cannot overlay the identity fields in SQL.
+    """
+
+    data = cloned_data_expression(session.get_bind().dialect.name, identity)
+    if data is None:
+        return None
+    result = await session.execute(
+        insert(WorkspaceRecord).from_select(
+            [
+                "id",
+                "name",
+                "system_id",
+                "owner_id",
+                "data",
+                "section_counts",
+                "created_at",
+                "updated_at",
+            ],
+            select(
+                literal(workspace_id),
+                literal(identity["system_name"]),
+                literal(identity["system_id"]),
+                literal(owner_id, WorkspaceRecord.owner_id.type),
+                data,
+                WorkspaceRecord.section_counts,
+                literal(now, WorkspaceRecord.created_at.type),
+                literal(now, WorkspaceRecord.updated_at.type),
+            ).where(WorkspaceRecord.id == source_id, WorkspaceRecord.version == version),
+        )
+    )
+    return bool(typing.cast(CursorResult[Any], result).rowcount)
+
+
+async def insert_workspaces(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """Insert rows built by workspace_values in a single transaction.
+
+    SQLAlchemy's insertmanyvalues batching renders these as multi-row
+    ``INSERT ... VALUES`` statements and reuses the compiled statement.
+    """
+
+    if not rows:
+        return
+    await session.execute(insert(WorkspaceRecord), rows)
+    await record_snapshots(session, [row["id"] for row in rows])
+    await session.commit()
@@ -0,0 +1,138 @@
+"""Benchmark copy-on-write workspace clones against full copies.
+
+Seeds one synthetic SSP per size and times clone_workspace on it: the first
+clone, which copies the document into workspace_bodies inside the database,
+and later clones, which copy nothing. The baseline inserts a full copy of
+the document, as cloning without shared bodies would have to. Prints the
+storage report afterwards.
+
+    python scripts/bench_workspace_clone.py --database-url postgresql+asyncpg://.../bench
+    python scripts/bench_workspace_clone.py --database-url sqlite+aiosqlite:///bench.db
+
+The target database must be empty or disposable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.bodies import clone_storage  # noqa: E402
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.models import Base, WorkspaceRecord  # noqa: E402
+from engine.workspaces import (  # noqa: E402
+    clone_workspace,
+    get_workspace,
+    insert_workspaces,
+    workspace_values,
+)
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+WORDS = ["access", "account", "audit", "boundary", "control", "encrypt", "identity", "logging",
+         "monitor", "network", "policy", "privilege", "review", "session", "system", "user"]
+
+
+def _document(rng: random.Random, controls: int) -> dict[str, Any]:
+    return {
+        "system_name": "Clone Bench",
+        "system_id": f"bench-{controls}",
+        "created_at": CREATED.isoformat(),
+        "control-implementation": {
+            "implemented-requirements": [
+                {
+                    "control-id": f"ac-{index}",
+                    "description": " ".join(rng.choice(WORDS) for _ in range(60)),
+                }
+                for index in range(controls)
+            ]
+        },
+    }
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+async def run(database_url: str, sizes: list[int], clones: int) -> None:
+    engine = create_async_engine(database_url)
+    sessionmaker = create_sessionmaker(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(0)
+    print(f"{'controls':>9} {'first ms':>9} {'clone p50':>10} {'clone p99':>10} {'copy p50':>9}")
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            for controls in sizes:
+                data = _document(rng, controls)
+                row = workspace_values(name="Clone Bench", system_id=data["system_id"], data=data)
+                await insert_workspaces(session, [row])
+
+                started = time.perf_counter()
+                await clone_workspace(session, row["id"], name="Clone 0", system_id="clone-0")
+                first_ms = (time.perf_counter() - started) * 1000
+
+                clone_ms: list[float] = []
+                for index in range(1, clones):
+                    started = time.perf_counter()
+                    await clone_workspace(
+                        session, row["id"], name=f"Clone {index}", system_id=f"clone-{index}"
+                    )
+                    clone_ms.append((time.perf_counter() - started) * 1000)
+
+                copy_ms: list[float] = []
+                for index in range(clones):
+                    started = time.perf_counter()
+                    record = await get_workspace(session, row["id"])
+                    assert record is not None
+                    copy = {**record.data, "system_id": f"copy-{index}"}
+                    await insert_workspaces(
+                        session,
+                        [workspace_values(name="Copy", system_id=copy["system_id"], data=copy)],
+                    )
+                    copy_ms.append((time.perf_counter() - started) * 1000)
+
+                print(
+                    f"{controls:>9} {first_ms:>9.2f} {_percentile(clone_ms, 0.5):>10.2f} "
+                    f"{_percentile(clone_ms, 0.99):>10.2f} {_percentile(copy_ms, 0.5):>9.2f}"
+                )
+            storage = await clone_storage(session)
+    finally:
+        await engine.dispose()
+
+    print(
+        f"{storage.clones} clones of {storage.bodies} bodies: "
+        f"{storage.body_bytes} body bytes, {storage.private_bytes} private bytes, "
+        f"{storage.saved_bytes} bytes saved"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--clones", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.sizes, args.clones))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark concurrent workspace editors: version checks against row locks.
+
+Seeds a scratch PostgreSQL database with a few hot workspaces and runs the
+same workload twice. Each editor repeatedly picks a workspace, reads it,
+waits for a short "think" time and renames it.
+
+- optimistic: read the version without locking, then rename_workspace with
+  expected_version. On WorkspaceConflict, read again and retry.
+- pessimistic: SELECT ... FOR UPDATE, then rename while holding the row
+  lock through the think time.
+
+Reports committed edits per second, p50/p99 edit latency and the number of
+optimistic retries.
+
+    python scripts/bench_workspace_contention.py --database-url postgresql+asyncpg://.../bench
+
+The target database must be empty or disposable. Row locks behave very
+differently on SQLite, so only PostgreSQL is supported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.models import Base, WorkspaceRecord  # noqa: E402
+from engine.workspaces import (  # noqa: E402
+    WorkspaceConflict,
+    insert_workspaces,
+    rename_workspace,
+    workspace_values,
+)
+
+OPTIMISTIC = "optimistic"
+PESSIMISTIC = "pessimistic"
+
+
+async def _seed(session: AsyncSession, hot: int) -> list[str]:
+    rows = [
+        workspace_values(
+            name=f"Hot {index}",
+            system_id=f"hot-{index:04d}",
+            data={"system_name": f"Hot {index}", "system_id": f"hot-{index:04d}"},
+        )
+        for index in range(hot)
+    ]
+    await insert_workspaces(session, rows)
+    return [row["id"] for row in rows]
+
+
+async def _edit_optimistic(
+    session: AsyncSession,
+    workspace_id: str,
+    name: str,
+    think: float,
+) -> int:
+    retries = 0
+    while True:
+        version = await session.scalar(
+            select(WorkspaceRecord.version).where(WorkspaceRecord.id == workspace_id)
+        )
+        await session.rollback()
+        await asyncio.sleep(think)
+        try:
+            await rename_workspace(session, workspace_id, name, expected_version=version)
+            return retries
+        except WorkspaceConflict:
+            retries += 1
+
+
+async def _edit_pessimistic(
+    session: AsyncSession,
+    workspace_id: str,
+    name: str,
+    think: float,
+) -> int:
+    await session.execute(
+        select(WorkspaceRecord.version)
+        .where(WorkspaceRecord.id == workspace_id)
+        .with_for_update()
+    )
+    await asyncio.sleep(think)
+    # Commits, releasing the row lock.
+    await rename_workspace(session, workspace_id, name)
+    return 0
+
+
+async def _editor(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    mode: str,
+    workspace_ids: list[str],
+    edits: int,
+    think: float,
+    seed: int,
+    latencies: list[float],
+) -> int:
+    rng = random.Random(seed)
+    edit = _edit_optimistic if mode == OPTIMISTIC else _edit_pessimistic
+    retries = 0
+    async with sessionmaker() as session:
+        for number in range(edits):
+            started = time.perf_counter()
+            name = f"Edit {seed}-{number}"
+            retries += await edit(session, rng.choice(workspace_ids), name, think)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return retries
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+async def run(database_url: str, hot: int, editors: int, edits: int, think_ms: float) -> None:
+    # One connection per editor, so the pool is not what is being measured.
+    engine = create_async_engine(database_url, pool_size=editors, max_overflow=0)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Contention benchmarks need PostgreSQL row locks")
+    sessionmaker = create_sessionmaker(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            workspace_ids = await _seed(session, hot)
+
+        print(f"{editors} editors x {edits} edits on {hot} workspaces, think {think_ms:g} ms")
+        print(f"{'mode':>12} {'edits/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'retries':>8}")
+        for mode in (OPTIMISTIC, PESSIMISTIC):
+            latencies: list[float] = []
+            started = time.perf_counter()
+            retries = await asyncio.gather(
+                *(
+                    _editor(
+                        sessionmaker, mode, workspace_ids, edits, think_ms / 1000, seed, latencies
+                    )
+                    for seed in range(editors)
+                )
+            )
+            elapsed = time.perf_counter() - started
+            print(
+                f"{mode:>12} {len(latencies) / elapsed:>9.1f} {_percentile(latencies, 0.5):>8.2f} "
+                f"{_percentile(latencies, 0.99):>8.2f} {sum(retries):>8}"
+            )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch PostgreSQL database URL")
+    parser.add_argument("--workspaces", type=int, default=20, help="Hot workspaces to edit")
+    parser.add_argument("--editors", type=int, default=32)
+    parser.add_argument("--edits", type=int, default=50, help="Edits per editor")
+    parser.add_argument("--think-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.workspaces, args.editors, args.edits, args.think_ms))
+
+
+if __name__ == "__main__":
+    main()
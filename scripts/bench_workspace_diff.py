@@ -0,0 +1,143 @@
+"""Benchmark Merkle-tree workspace diffs against a full JSON comparison.
+
+Seeds pairs of large synthetic SSPs that differ in a handful of controls
+and times diff_workspaces, which compares the stored hash trees and reads
+only the changed values. The baseline loads both documents and compares
+them in Python, as a diff without the trees would have to.
+
+    python scripts/bench_workspace_diff.py --database-url postgresql+asyncpg://.../bench
+    python scripts/bench_workspace_diff.py --database-url sqlite+aiosqlite:///bench.db
+
+The target database must be empty or disposable. Exits non-zero if any
+Merkle diff disagrees with the full comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.merkle import diff_documents  # noqa: E402
+from engine.models import Base, WorkspaceRecord  # noqa: E402
+from engine.workspaces import diff_workspaces, insert_workspaces, workspace_values  # noqa: E402
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+WORDS = ["access", "account", "audit", "boundary", "control", "encrypt", "identity", "logging",
+         "monitor", "network", "policy", "privilege", "review", "session", "system", "user"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _document(rng: random.Random, controls: int, system_id: str) -> dict[str, Any]:
+    return {
+        "system_name": "Diff Bench",
+        "system_id": system_id,
+        "created_at": CREATED.isoformat(),
+        "control-implementation": {
+            "implemented-requirements": [
+                {
+                    "control-id": f"ac-{index}",
+                    "description": _sentence(rng, 60),
+                    "responsible-roles": ["system-owner", "isso"],
+                }
+                for index in range(controls)
+            ]
+        },
+    }
+
+
+def _variant(rng: random.Random, document: dict[str, Any], changes: int) -> dict[str, Any]:
+    variant = copy.deepcopy(document)
+    variant["system_id"] = document["system_id"] + "-b"
+    requirements = variant["control-implementation"]["implemented-requirements"]
+    for index in rng.sample(range(len(requirements)), changes):
+        requirements[index]["description"] = _sentence(rng, 60)
+    return variant
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+async def run(database_url: str, controls: int, pairs: int, changes: int) -> bool:
+    engine = create_async_engine(database_url)
+    sessionmaker = create_sessionmaker(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(0)
+    merkle_ms: list[float] = []
+    full_ms: list[float] = []
+    agree = True
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            ids = []
+            for pair in range(pairs):
+                left = _document(rng, controls, f"bench-{pair}")
+                rows = [
+                    workspace_values(name="Diff Bench", system_id=data["system_id"], data=data)
+                    for data in (left, _variant(rng, left, changes))
+                ]
+                await insert_workspaces(session, rows)
+                ids.append((rows[0]["id"], rows[1]["id"]))
+
+            for left_id, right_id in ids:
+                started = time.perf_counter()
+                diff = await diff_workspaces(session, left_id, right_id)
+                merkle_ms.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                result = await session.execute(
+                    select(WorkspaceRecord.id, WorkspaceRecord.data).where(
+                        WorkspaceRecord.id.in_([left_id, right_id])
+                    )
+                )
+                documents = {row.id: row.data for row in result}
+                full = diff_documents(documents[left_id], documents[right_id])
+                full_ms.append((time.perf_counter() - started) * 1000)
+                agree = agree and diff is not None and diff.operations == full
+    finally:
+        await engine.dispose()
+
+    print(f"{pairs} pairs of {controls}-control SSPs, {changes} changed controls each")
+    print(f"{'method':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, samples in (("merkle", merkle_ms), ("full", full_ms)):
+        print(f"{label:>10} {_percentile(samples, 0.5):>8.2f} {_percentile(samples, 0.99):>8.2f}")
+    return agree
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--controls", type=int, default=2000)
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=3)
+    args = parser.parse_args()
+    if not asyncio.run(run(args.database_url, args.controls, args.pairs, args.changes)):
+        raise SystemExit("Merkle diff disagreed with the full comparison")
+
+
+if __name__ == "__main__":
+    main()
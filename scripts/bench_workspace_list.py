@@ -0,0 +1,159 @@
+"""Benchmark workspace list pagination as the table grows.
+
+Seeds a scratch database in tiers and times the first page, a page near the
+end of the list reached by keyset cursor, and the same deep page reached by
+OFFSET for comparison. Keyset pages should stay flat across tiers while
+OFFSET grows with depth.
+
+    python scripts/bench_workspace_list.py --database-url postgresql+asyncpg://.../bench
+    python scripts/bench_workspace_list.py --database-url sqlite+aiosqlite:///bench.db \\
+        --sizes 100,10000,100000
+
+The target database must be empty or disposable: tables are created with
+metadata.create_all and the workspaces table is filled with synthetic rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.models import Base, WorkspaceRecord  # noqa: E402
+from engine.pagination import Cursor  # noqa: E402
+from engine.workspaces import SUMMARY_COLUMNS, list_workspaces  # noqa: E402
+
+PAGE_SIZE = 50
+INSERT_BATCH = 5000
+OWNERS = [str(uuid4()) for _ in range(20)]
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _rows(start: int, stop: int) -> list[dict[str, Any]]:
+    rows = []
+    for index in range(start, stop):
+        system_id = f"sys-{index:08d}"
+        stamp = BASE_TIME + timedelta(seconds=index)
+        rows.append(
+            {
+                "id": str(uuid4()),
+                "name": f"Workspace {index}",
+                "system_id": system_id,
+                "owner_id": OWNERS[index % len(OWNERS)],
+                "data": {"system_name": f"Workspace {index}", "system_id": system_id},
+                "payload_bytes": 80,
+                "section_counts": {},
+                "created_at": stamp,
+                "updated_at": stamp,
+            }
+        )
+    return rows
+
+
+async def _seed(session: AsyncSession, start: int, stop: int) -> None:
+    for offset in range(start, stop, INSERT_BATCH):
+        await session.execute(
+            insert(WorkspaceRecord),
+            _rows(offset, min(offset + INSERT_BATCH, stop)),
+        )
+        await session.commit()
+
+
+async def _timed(repeat: int, call: Any) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def _measure(session: AsyncSession, size: int, repeat: int) -> dict[str, float]:
+    depth = max(size - PAGE_SIZE, 0)
+    row = (
+        await session.execute(
+            select(WorkspaceRecord.updated_at, WorkspaceRecord.id)
+            .order_by(WorkspaceRecord.updated_at.desc(), WorkspaceRecord.id.desc())
+            .offset(max(depth - 1, 0))
+            .limit(1)
+        )
+    ).one()
+    cursor = Cursor(key=row.updated_at, id=row.id)
+
+    async def first_page() -> None:
+        await list_workspaces(session, limit=PAGE_SIZE + 1)
+
+    async def keyset_deep() -> None:
+        await list_workspaces(session, after=cursor, limit=PAGE_SIZE + 1)
+
+    async def owner_deep() -> None:
+        await list_workspaces(session, owner_id=OWNERS[0], after=cursor, limit=PAGE_SIZE + 1)
+
+    async def offset_deep() -> None:
+        await session.execute(
+            select(*SUMMARY_COLUMNS)
+            .order_by(WorkspaceRecord.updated_at.desc(), WorkspaceRecord.id.desc())
+            .offset(depth)
+            .limit(PAGE_SIZE + 1)
+        )
+
+    return {
+        "first": await _timed(repeat, first_page),
+        "keyset_deep": await _timed(repeat, keyset_deep),
+        "owner_keyset_deep": await _timed(repeat, owner_deep),
+        "offset_deep": await _timed(repeat, offset_deep),
+    }
+
+
+async def run(database_url: str, sizes: list[int], repeat: int) -> None:
+    engine = create_async_engine(database_url)
+    sessionmaker = create_sessionmaker(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    print(f"{'rows':>10} {'first ms':>10} {'keyset ms':>10} {'owner ms':>10} {'offset ms':>10}")
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            seeded = 0
+            for size in sorted(sizes):
+                await _seed(session, seeded, size)
+                seeded = size
+                timings = await _measure(session, size, repeat)
+                print(
+                    f"{size:>10} {timings['first']:>10.2f} {timings['keyset_deep']:>10.2f} "
+                    f"{timings['owner_keyset_deep']:>10.2f} {timings['offset_deep']:>10.2f}"
+                )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--sizes", default="100,10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(run(args.database_url, sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Benchmark workspace revision storage and reconstruction latency.
+
+Seeds one large synthetic SSP and saves a series of edits through
+patch_workspace and rename_workspace. It then reports:
+
+- storage per revision, for deltas and snapshots, against a full copy of
+  the document;
+- the time to rebuild past versions, by how many deltas follow the nearest
+  snapshot.
+
+    python scripts/bench_workspace_revisions.py --database-url postgresql+asyncpg://.../bench
+    python scripts/bench_workspace_revisions.py --database-url sqlite+aiosqlite:///bench.db
+
+The target database must be empty or disposable. On PostgreSQL, snapshot
+sizes are the compressed on-disk size (pg_column_size). Exits non-zero if the
+newest revision does not rebuild to the stored document.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.models import Base, WorkspaceRecord, WorkspaceRevision  # noqa: E402
+from engine.patch import JSON_PATCH, MERGE_PATCH, parse_json_patch  # noqa: E402
+from engine.revisions import SNAPSHOT, SNAPSHOT_INTERVAL, get_revision_data  # noqa: E402
+from engine.workspaces import (  # noqa: E402
+    insert_workspaces,
+    patch_workspace,
+    rename_workspace,
+    workspace_values,
+)
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+WORDS = ["access", "account", "audit", "boundary", "control", "encrypt", "identity", "logging",
+         "monitor", "network", "policy", "privilege", "review", "session", "system", "user"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _document(rng: random.Random, controls: int) -> dict[str, Any]:
+    return {
+        "system_name": "Revision Bench",
+        "system_id": "bench-revisions",
+        "created_at": CREATED.isoformat(),
+        "control-implementation": {
+            "implemented-requirements": [
+                {
+                    "control-id": f"ac-{index}",
+                    "description": _sentence(rng, 60),
+                    "responsible-roles": ["system-owner", "isso"],
+                }
+                for index in range(controls)
+            ]
+        },
+    }
+
+
+def _edit(rng: random.Random, controls: int, number: int) -> tuple[str, Any]:
+    index = rng.randrange(controls)
+    if number % 3:
+        return JSON_PATCH, parse_json_patch(
+            [
+                {
+                    "op": "replace",
+                    "path": f"/control-implementation/implemented-requirements/{index}/description",
+                    "value": _sentence(rng, 60),
+                }
+            ]
+        )
+    return MERGE_PATCH, {"metadata": {"last-reviewed": f"edit {number}"}}
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+async def run(database_url: str, controls: int, count: int, samples: int) -> bool:
+    engine = create_async_engine(database_url)
+    sessionmaker = create_sessionmaker(engine)
+    postgres = engine.dialect.name == "postgresql"
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(0)
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            row = workspace_values(
+                name="Revision Bench",
+                system_id="bench-revisions",
+                data=_document(rng, controls),
+                created_at=CREATED,
+            )
+            await insert_workspaces(session, [row])
+            workspace_id = row["id"]
+
+            save_ms = []
+            for number in range(2, count + 1):
+                started = time.perf_counter()
+                if number % 10 == 0:
+                    await rename_workspace(session, workspace_id, f"Revision Bench {number}")
+                else:
+                    kind, patch = _edit(rng, controls, number)
+                    await patch_workspace(session, workspace_id, kind, patch)
+                save_ms.append((time.perf_counter() - started) * 1000)
+
+            snapshot_size = (
+                func.pg_column_size(WorkspaceRevision.snapshot)
+                if postgres
+                else func.length(WorkspaceRevision.snapshot)
+            )
+            sizes = (
+                await session.execute(
+                    select(
+                        WorkspaceRevision.kind == SNAPSHOT,
+                        func.count(),
+                        func.avg(
+                            func.coalesce(func.length(WorkspaceRevision.delta), snapshot_size)
+                        ),
+                    )
+                    .where(WorkspaceRevision.workspace_id == workspace_id)
+                    .group_by(WorkspaceRevision.kind == SNAPSHOT)
+                )
+            ).all()
+            current = (
+                await session.execute(
+                    select(WorkspaceRecord.data).where(WorkspaceRecord.id == workspace_id)
+                )
+            ).scalar_one()
+
+            by_depth: dict[int, list[float]] = {}
+            for _ in range(samples):
+                version = rng.randint(1, count)
+                started = time.perf_counter()
+                await get_revision_data(session, workspace_id, version)
+                elapsed = (time.perf_counter() - started) * 1000
+                by_depth.setdefault((version - 1) % SNAPSHOT_INTERVAL, []).append(elapsed)
+            latest = await get_revision_data(session, workspace_id, count)
+    finally:
+        await engine.dispose()
+
+    full_bytes = len(json.dumps(current, separators=(",", ":")).encode("utf-8"))
+    print(f"{count} revisions of a {full_bytes / 1024:.0f} KiB document, "
+          f"snapshot every {SNAPSHOT_INTERVAL}; median save {_percentile(save_ms, 0.5):.2f} ms")
+    total = 0.0
+    for is_snapshot, rows, average in sizes:
+        label = "snapshot" if is_snapshot else "delta"
+        total += rows * float(average)
+        print(f"  {label:>8}: {rows:>5} rows, {float(average):>10.0f} bytes each")
+    print(f"  average {total / count:.0f} bytes per revision vs {full_bytes} for a full copy")
+    print(f"{'deltas':>8} {'p50 ms':>8} {'p99 ms':>8} {'samples':>8}")
+    for depth in sorted(by_depth):
+        timings = by_depth[depth]
+        p50, p99 = _percentile(timings, 0.5), _percentile(timings, 0.99)
+        print(f"{depth:>8} {p50:>8.2f} {p99:>8.2f} {len(timings):>8}")
+    return bool(latest == current)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--controls", type=int, default=2000)
+    parser.add_argument("--revisions", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=400)
+    args = parser.parse_args()
+    if not asyncio.run(run(args.database_url, args.controls, args.revisions, args.samples)):
+        raise SystemExit("Newest revision did not rebuild to the stored document")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Benchmark workspace content search and check it uses the GIN index.
+
+Seeds a scratch PostgreSQL database with synthetic SSPs, each implementing a
+random set of controls, and clones of some of them, then times
+search_workspaces for a rare and a common control. Every query is run under
+EXPLAIN ANALYZE and the plan is checked for the jsonb_path_ops indexes on
+workspaces and on the clones' shared bodies; the same search with index
+scans disabled is timed for comparison.
+
+    python scripts/bench_workspace_search.py --database-url postgresql+asyncpg://.../bench
+
+The target database must be empty or disposable: tables and indexes are
+created with metadata.create_all and the workspaces table is filled with
+synthetic rows. Containment search needs jsonb, so only PostgreSQL is
+supported. Exits non-zero when the rare-control search does not use both
+indexes, scans a table sequentially, or filters out rows it fetched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import ClauseElement, Executable, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.models import Base, WorkspaceRecord  # noqa: E402
+from engine.workspaces import (  # noqa: E402
+    clone_workspace,
+    control_document,
+    search_workspaces,
+    search_workspaces_statement,
+    workspace_values,
+)
+
+PAGE_SIZE = 50
+INSERT_BATCH = 2000
+INDEX_NAME = "ix_workspaces_data_path_ops"
+BODY_INDEX_NAME = "ix_workspace_bodies_data_path_ops"
+FAMILIES = ["ac", "at", "au", "ca", "cm", "cp", "ia", "ir", "ma", "mp", "pe", "pl", "ps", "ra",
+            "sa", "sc", "si", "sr"]
+CATALOG = [f"{family}-{number}" for family in FAMILIES for number in range(1, 26)]
+COMMON_CONTROL = "ac-2"
+RARE_CONTROL = "zz-1"
+RARE_EVERY = 500
+# Every so many workspaces is cloned; rare-control workspaces always are.
+CLONE_EVERY = 50
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Any) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return "EXPLAIN (ANALYZE, FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _rows(start: int, stop: int, rng: random.Random) -> list[dict[str, Any]]:
+    rows = []
+    for index in range(start, stop):
+        system_id = f"ssp-{index:08d}"
+        controls = rng.sample(CATALOG, rng.randint(50, 150))
+        if COMMON_CONTROL not in controls:
+            controls.append(COMMON_CONTROL)
+        if index % RARE_EVERY == 0:
+            controls.append(RARE_CONTROL)
+        stamp = BASE_TIME + timedelta(seconds=index)
+        row = workspace_values(
+            name=f"SSP {index}",
+            system_id=system_id,
+            data={
+                "system_name": f"SSP {index}",
+                "system_id": system_id,
+                "control-implementation": {
+                    "implemented-requirements": [
+                        {"control-id": control, "uuid": str(uuid4())} for control in controls
+                    ]
+                },
+            },
+            created_at=stamp,
+        )
+        rows.append({**row, "updated_at": stamp})
+    return rows
+
+
+async def _seed(session: AsyncSession, size: int) -> int:
+    rng = random.Random(0)
+    sources = []
+    for offset in range(0, size, INSERT_BATCH):
+        rows = _rows(offset, min(offset + INSERT_BATCH, size), rng)
+        await session.execute(insert(WorkspaceRecord), rows)
+        await session.commit()
+        sources += [row["id"] for row in rows[:: CLONE_EVERY]]
+    for index, source_id in enumerate(sources):
+        await clone_workspace(
+            session, source_id, name=f"Clone {index}", system_id=f"clone-{index:08d}"
+        )
+    return len(sources)
+
+
+async def _vacuum(engine: AsyncEngine) -> None:
+    # Freshly loaded GIN indexes hold their entries in a pending list, and
+    # have no statistics, until vacuumed; the planner then avoids them.
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("workspaces", "workspace_bodies"):
+            await connection.execute(text(f"VACUUM ANALYZE {table}"))
+
+
+def _plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+async def _explain(session: AsyncSession, control: str) -> dict[str, Any]:
+    statement = search_workspaces_statement(control_document(control), limit=PAGE_SIZE + 1)
+    raw = (await session.execute(Explain(statement))).scalar_one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    nodes = _plan_nodes(plan["Plan"])
+    indexes = {node.get("Index Name") for node in nodes}
+    return {
+        "uses_index": INDEX_NAME in indexes and BODY_INDEX_NAME in indexes,
+        "seq_scans": [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"],
+        # Rows fetched and then thrown away: by a filter, such as the check
+        # of a clone's full document, or by rechecking a lossy index match.
+        "rechecked": sum(
+            node.get("Rows Removed by Filter", 0) + node.get("Rows Removed by Index Recheck", 0)
+            for node in nodes
+        ),
+        "nodes": " > ".join(node["Node Type"] for node in nodes),
+        "execution_ms": plan["Execution Time"],
+    }
+
+
+async def _timed(session: AsyncSession, control: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await search_workspaces(session, control_document(control), limit=PAGE_SIZE + 1)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def run(database_url: str, size: int, repeat: int) -> bool:
+    engine = create_async_engine(database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Content search benchmarks need PostgreSQL (jsonb)")
+    sessionmaker = create_sessionmaker(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            clones = await _seed(session, size)
+        await _vacuum(engine)
+
+        async with sessionmaker() as session:
+            results = {}
+            for control in (RARE_CONTROL, COMMON_CONTROL):
+                indexed = await _explain(session, control)
+                indexed["median_ms"] = await _timed(session, control, repeat)
+                await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+                await session.execute(text("SET LOCAL enable_indexscan = off"))
+                scan = await _explain(session, control)
+                scan["median_ms"] = await _timed(session, control, repeat)
+                await session.rollback()
+                results[control] = (indexed, scan)
+    finally:
+        await engine.dispose()
+
+    print(f"{size} workspaces, {clones} clones, {len(CATALOG) + 1} controls, "
+          f"page size {PAGE_SIZE}")
+    for control, (indexed, scan) in results.items():
+        print(f"\n{control}:")
+        print(f"  indexed   {indexed['median_ms']:>9.2f} ms  uses both indexes: "
+              f"{indexed['uses_index']}  seq scans: {indexed['seq_scans'] or 'none'}  "
+              f"rows rechecked away: {indexed['rechecked']}  plan: {indexed['nodes']}")
+        print(f"  seq scan  {scan['median_ms']:>9.2f} ms  plan: {scan['nodes']}")
+    rare = results[RARE_CONTROL][0]
+    return bool(rare["uses_index"] and not rare["seq_scans"] and not rare["rechecked"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch PostgreSQL database URL")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if not asyncio.run(run(args.database_url, args.size, args.repeat)):
+        raise SystemExit(
+            f"Rare-control search did not stay on {INDEX_NAME} and {BODY_INDEX_NAME}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Benchmark workspace typeahead latency against the 20 ms p99 target.
+
+Seeds a scratch database with synthetic workspace names and times
+typeahead_workspaces for short prefixes, full-word prefixes, typos and
+system id prefixes, reporting p50 and p99 per kind. On PostgreSQL the
+pg_trgm and prefix indexes from migration 0012 are created first; on
+other databases the in-memory fallback index is built once and its lookups
+are timed.
+
+    python scripts/bench_workspace_typeahead.py --database-url postgresql+asyncpg://.../bench
+    python scripts/bench_workspace_typeahead.py --database-url sqlite+aiosqlite:///bench.db \\
+        --size 100000
+
+The target database must be empty or disposable. On PostgreSQL, exits
+non-zero when any p99 is over the target; the in-memory fallback is meant
+for development-sized tables and is only reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engine.cache import TTLCache  # noqa: E402
+from engine.db import create_sessionmaker  # noqa: E402
+from engine.models import Base, WorkspaceRecord  # noqa: E402
+from engine.search import WorkspaceNameIndex, typeahead_workspaces  # noqa: E402
+
+TARGET_P99_MS = 20.0
+INSERT_BATCH = 5000
+WORDS = [
+    "payroll", "payments", "gateway", "portal", "identity", "billing", "records", "archive",
+    "analytics", "benefits", "claims", "grants", "inventory", "ledger", "licensing", "mail",
+    "monitoring", "network", "permits", "procurement", "registry", "reporting", "scheduling",
+    "storage", "tracking", "training", "travel", "vault", "warehouse", "workflow",
+]
+QUALIFIERS = ["cloud", "legacy", "regional", "shared", "internal", "public", "mobile", "core"]
+PG_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_workspaces_name_trgm ON workspaces "
+    "USING gin (lower(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_workspaces_name_prefix ON workspaces "
+    '((lower(name) COLLATE "C"), id)',
+    "CREATE INDEX IF NOT EXISTS ix_workspaces_system_id_prefix ON workspaces "
+    '((lower(system_id) COLLATE "C"))',
+]
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _name(rng: random.Random, index: int) -> str:
+    return f"{rng.choice(QUALIFIERS).title()} {rng.choice(WORDS).title()} {index}"
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2 :]
+
+
+def _queries(rng: random.Random, count: int) -> dict[str, list[str]]:
+    return {
+        "short prefix": [rng.choice(QUALIFIERS)[:2] for _ in range(count)],
+        "word prefix": [f"{rng.choice(QUALIFIERS)} {rng.choice(WORDS)[:4]}" for _ in range(count)],
+        "typo": [_typo(rng.choice(WORDS), rng) for _ in range(count)],
+        "system id": [f"sys-{rng.randrange(10_000):04d}" for _ in range(count)],
+    }
+
+
+async def _seed(session: AsyncSession, size: int) -> None:
+    rng = random.Random(0)
+    for offset in range(0, size, INSERT_BATCH):
+        rows: list[dict[str, Any]] = []
+        for index in range(offset, min(offset + INSERT_BATCH, size)):
+            name = _name(rng, index)
+            system_id = f"sys-{index:08d}"
+            stamp = BASE_TIME + timedelta(seconds=index)
+            rows.append(
+                {
+                    "id": str(uuid4()),
+                    "name": name,
+                    "system_id": system_id,
+                    "data": {"system_name": name, "system_id": system_id},
+                    "created_at": stamp,
+                    "updated_at": stamp,
+                }
+            )
+        await session.execute(insert(WorkspaceRecord), rows)
+        await session.commit()
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+async def run(database_url: str, size: int, count: int) -> bool:
+    engine = create_async_engine(database_url)
+    sessionmaker = create_sessionmaker(engine)
+    postgres = engine.dialect.name == "postgresql"
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    cache = TTLCache[WorkspaceNameIndex](1, 3600)
+    results: dict[str, tuple[float, float]] = {}
+    try:
+        async with sessionmaker() as session:
+            existing = int(
+                (await session.execute(select(func.count()).select_from(WorkspaceRecord)))
+                .scalar_one()
+            )
+            if existing:
+                raise SystemExit(f"workspaces table is not empty ({existing} rows)")
+            await _seed(session, size)
+            if postgres:
+                for statement in PG_INDEXES:
+                    await session.execute(text(statement))
+                await session.execute(text("ANALYZE workspaces"))
+                await session.commit()
+            else:
+                started = time.perf_counter()
+                await typeahead_workspaces(session, "warmup", fallback_cache=cache)
+                build_ms = (time.perf_counter() - started) * 1000
+                print(f"in-memory index built in {build_ms:.0f} ms")
+
+            for kind, queries in _queries(random.Random(1), count).items():
+                samples = []
+                for query in queries:
+                    started = time.perf_counter()
+                    await typeahead_workspaces(session, query, fallback_cache=cache)
+                    samples.append((time.perf_counter() - started) * 1000)
+                results[kind] = (_percentile(samples, 0.5), _percentile(samples, 0.99))
+    finally:
+        await engine.dispose()
+
+    mode = "pg_trgm" if postgres else "in-memory fallback"
+    print(f"{size} workspaces, {mode}, {count} queries per kind")
+    print(f"{'kind':>14} {'p50 ms':>8} {'p99 ms':>8}")
+    for kind, (p50, p99) in results.items():
+        print(f"{kind:>14} {p50:>8.2f} {p99:>8.2f}")
+    return not postgres or all(p99 <= TARGET_P99_MS for _, p99 in results.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    if not asyncio.run(run(args.database_url, args.size, args.queries)):
+        raise SystemExit(f"p99 over the {TARGET_P99_MS:.0f} ms target")
+
+
+if __name__ == "__main__":
+    main()
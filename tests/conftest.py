@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def database_url(request, tmp_path) -> str:
+    """A scratch database: a SQLite file, or the PostgreSQL at TEST_POSTGRES_URL.
+
+    Tests drop and recreate every table in it, so TEST_POSTGRES_URL must
+    point at a disposable database; without it the PostgreSQL run is skipped.
+    """
+
+    if request.param == "sqlite":
+        pytest.importorskip("aiosqlite")
+        return f"sqlite+aiosqlite:///{tmp_path / 'workspaces.db'}"
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pytest.importorskip("asyncpg")
+    return url
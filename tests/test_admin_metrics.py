@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+
+from web.app import create_app
+from web.security import require_admin
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def test_admin_metrics_requires_auth() -> None:
+    app = create_app()
+    client = TestClient(app)
+
+    response = client.get("/admin/metrics")
+
+    assert response.status_code == 401
+
+
+def test_admin_metrics_reports_serialization() -> None:
+    app = create_app()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    client = TestClient(app)
+
+    response = client.get("/admin/metrics")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["serialization"]["queue_depth"] == 0
+    assert set(payload["serialization"]["modes"]) == {"inline", "thread", "process"}
+    assert payload["export_cache"]["entries"] == 0
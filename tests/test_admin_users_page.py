@@ -41,7 +41,7 @@ def test_admin_users_page_renders() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_users(session):
+    async def fake_list_users(session, **kwargs):
         return [
             DummyUser(
                 id="user-1",
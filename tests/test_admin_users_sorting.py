@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 from fastapi.testclient import TestClient
 
 import web.routes.users as users_routes
+from engine.pagination import Cursor
 from web.app import create_app
 from web.security import require_admin
 
@@ -41,7 +42,7 @@ def test_users_page_ordering() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_users(session):
+    async def fake_list_users(session, **kwargs):
         return [
             DummyUser(
                 id="user-new",
@@ -74,3 +75,47 @@ def test_users_page_ordering() -> None:
         assert response.text.index("new@example.com") < response.text.index("old@example.com")
     finally:
         users_routes.list_users = original_list
+
+
+def test_users_page_forwards_sort_search_and_cursor() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    calls = []
+
+    async def fake_list_users(session, **kwargs):
+        calls.append(kwargs)
+        return [
+            DummyUser(
+                id=f"user-{index}",
+                email=f"user{index}@example.com",
+                display_name=f"User {index}",
+                provider="github",
+                is_admin=False,
+                created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                last_login_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            )
+            for index in range(kwargs["limit"])
+        ]
+
+    original_list = users_routes.list_users
+    users_routes.list_users = fake_list_users
+
+    try:
+        client = TestClient(app)
+        response = client.get("/admin/users?sort=email&q=%20User&limit=2")
+
+        assert response.status_code == 200
+        assert calls[-1] == {"sort": "email", "search": "User", "after": None, "limit": 3}
+        assert "user2@example.com" not in response.text
+        assert "Next page" in response.text
+
+        next_cursor = Cursor(key="user1@example.com", id="user-1").encode()
+        response = client.get(f"/admin/users?sort=email&cursor={next_cursor}")
+        assert response.status_code == 200
+        assert calls[-1]["after"] == Cursor(key="user1@example.com", id="user-1")
+
+        assert client.get(f"/admin/users?sort=created&cursor={next_cursor}").status_code == 400
+        assert client.get("/admin/users?sort=provider").status_code == 400
+    finally:
+        users_routes.list_users = original_list
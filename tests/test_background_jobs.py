@@ -0,0 +1,414 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+import engine.bulk_import as bulk_import
+import engine.jobs as jobs
+import web.routes.jobs as jobs_routes
+from engine.db import create_engine, create_sessionmaker
+from engine.jobs import JobRunner
+from engine.models import Base, Job
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+    id = "user-1"
+
+
+def _install_job_store(monkeypatch) -> dict:
+    store: dict = {}
+
+    async def fake_create_job(session, *, kind, owner_id=None, params=None):
+        now = datetime.now(timezone.utc)
+        job = SimpleNamespace(
+            id=f"job-{len(store) + 1}",
+            kind=kind,
+            status=jobs.QUEUED,
+            owner_id=owner_id,
+            params=params,
+            progress=0,
+            total=None,
+            result=None,
+            error=None,
+            created_at=now,
+            updated_at=now,
+            finished_at=None,
+        )
+        store[job.id] = job
+        return job
+
+    async def fake_get_job(session, job_id):
+        return store.get(job_id)
+
+    async def fake_update_job(session, job_id, *, expected_status=None, **values):
+        if expected_status is not None and store[job_id].status != expected_status:
+            return False
+        for key, value in values.items():
+            setattr(store[job_id], key, value)
+        return True
+
+    monkeypatch.setattr(jobs, "create_job", fake_create_job)
+    monkeypatch.setattr(jobs, "get_job", fake_get_job)
+    monkeypatch.setattr(jobs, "update_job", fake_update_job)
+    monkeypatch.setattr(jobs_routes, "get_job", fake_get_job)
+    return store
+
+
+def test_runner_bounds_concurrency_per_kind(monkeypatch, tmp_path) -> None:
+    store = _install_job_store(monkeypatch)
+
+    async def scenario() -> None:
+        runner = JobRunner(
+            DummySessionMaker(),
+            limits={jobs.IMPORT: 1, jobs.EXPORT: 1},
+            artifact_dir=tmp_path,
+        )
+        release = asyncio.Event()
+
+        async def blocking(context):
+            await release.wait()
+            return {"ok": True}
+
+        async def quick(context):
+            return {"ok": True}
+
+        first = await runner.submit(jobs.IMPORT, blocking)
+        second = await runner.submit(jobs.IMPORT, quick)
+        other = await runner.submit(jobs.EXPORT, quick)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert store[first].status == jobs.RUNNING
+        assert store[second].status == jobs.QUEUED
+        assert store[other].status == jobs.SUCCEEDED
+        assert runner.metrics()[jobs.IMPORT] == {"limit": 1, "running": 1, "waiting": 1}
+
+        release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert store[first].status == jobs.SUCCEEDED
+        assert store[second].status == jobs.SUCCEEDED
+
+    asyncio.run(scenario())
+
+
+def test_runner_marks_failed_and_interrupted_jobs(monkeypatch, tmp_path) -> None:
+    store = _install_job_store(monkeypatch)
+
+    async def scenario() -> None:
+        runner = JobRunner(DummySessionMaker(), limits={jobs.VALIDATE: 1}, artifact_dir=tmp_path)
+
+        async def broken(context):
+            raise RuntimeError("boom")
+
+        async def forever(context):
+            await asyncio.Event().wait()
+            return {}
+
+        failed = await runner.submit(jobs.VALIDATE, broken)
+        running = await runner.submit(jobs.VALIDATE, forever)
+        queued = await runner.submit(jobs.VALIDATE, forever)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await runner.shutdown()
+
+        assert store[failed].status == jobs.FAILED
+        assert store[failed].error == "boom"
+        assert store[running].error == "Interrupted by shutdown"
+        assert store[queued].error == "Interrupted by shutdown"
+
+    asyncio.run(scenario())
+
+
+def test_import_job_fails_on_corrupt_zip_archive(monkeypatch, tmp_path) -> None:
+    store = _install_job_store(monkeypatch)
+    path = tmp_path / "workspaces.zip"
+    path.write_bytes(b"PK\x03\x04" + b"garbage" * 20)
+
+    async def scenario() -> None:
+        runner = JobRunner(DummySessionMaker(), limits={jobs.IMPORT: 1}, artifact_dir=tmp_path)
+        job_id = await runner.submit(
+            jobs.IMPORT, jobs.import_job(path, owner_id=None, batch_size=10)
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        await runner.shutdown()
+
+        assert store[job_id].status == jobs.FAILED
+        assert store[job_id].error == "Invalid zip archive"
+        assert not path.exists()
+
+    asyncio.run(scenario())
+
+
+def test_runner_keeps_jobs_failed_while_running(monkeypatch, tmp_path) -> None:
+    store = _install_job_store(monkeypatch)
+
+    async def scenario() -> str:
+        runner = JobRunner(DummySessionMaker(), limits={jobs.VALIDATE: 1}, artifact_dir=tmp_path)
+        release = asyncio.Event()
+
+        async def slow(context):
+            await release.wait()
+            return {"ok": True}
+
+        job_id = await runner.submit(jobs.VALIDATE, slow)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # A heartbeat elsewhere decided this worker had stopped.
+        await jobs.update_job(None, job_id, status=jobs.FAILED, error="Interrupted")
+        release.set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await runner.shutdown()
+        return job_id
+
+    job_id = asyncio.run(scenario())
+
+    assert store[job_id].status == jobs.FAILED
+    assert store[job_id].result is None
+
+
+def test_export_job_deletes_partial_artifact_on_failure(monkeypatch, tmp_path) -> None:
+    store = _install_job_store(monkeypatch)
+
+    async def fake_count_workspaces(session, **filters):
+        return 2
+
+    async def fake_stream_workspaces(session, **filters):
+        yield SimpleNamespace(id="w-1", system_id="sys-1", data={"a": 1}, payload_bytes=None)
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(jobs, "count_workspaces", fake_count_workspaces)
+    monkeypatch.setattr(jobs, "stream_workspaces", fake_stream_workspaces)
+
+    async def scenario() -> str:
+        runner = JobRunner(DummySessionMaker(), limits={jobs.EXPORT: 1}, artifact_dir=tmp_path)
+        job_id = await runner.submit(
+            jobs.EXPORT, jobs.export_job(format="ndjson", owner_id=None, updated_since=None)
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        await runner.shutdown()
+        return job_id
+
+    job_id = asyncio.run(scenario())
+
+    assert store[job_id].status == jobs.FAILED
+    assert store[job_id].error == "connection lost"
+    assert not list(tmp_path.iterdir())
+
+
+def test_heartbeat_deletes_expired_export_artifacts(tmp_path) -> None:
+    pytest.importorskip("aiosqlite")
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    engine = create_engine(Settings(), f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+
+    async def scenario() -> tuple[list[str], list[str]]:
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            runner = JobRunner(
+                sessionmaker,
+                limits={jobs.EXPORT: 1},
+                artifact_dir=artifacts,
+                artifact_ttl_seconds=60,
+            )
+            async with sessionmaker() as session:
+                done = (await jobs.create_job(session, kind=jobs.EXPORT)).id
+                running = (await jobs.create_job(session, kind=jobs.EXPORT)).id
+                fresh = (await jobs.create_job(session, kind=jobs.EXPORT)).id
+                await jobs.update_job(session, done, status=jobs.SUCCEEDED)
+                await jobs.update_job(session, running, status=jobs.RUNNING)
+                await jobs.update_job(session, fresh, status=jobs.SUCCEEDED)
+            expired = time.time() - 120
+            for name in (f"{done}.zip", f"{running}.ndjson", "upload-1234", f"{fresh}.ndjson"):
+                (artifacts / name).write_bytes(b"{}")
+                if name != f"{fresh}.ndjson":
+                    os.utime(artifacts / name, (expired, expired))
+            await runner.heartbeat()
+            kept = sorted([f"{running}.ndjson", "upload-1234", f"{fresh}.ndjson"])
+            return kept, sorted(path.name for path in artifacts.iterdir())
+        finally:
+            await engine.dispose()
+
+    kept, remaining = asyncio.run(scenario())
+
+    assert remaining == kept
+
+
+def test_job_status_hides_expired_export_downloads(monkeypatch, tmp_path) -> None:
+    store = _install_job_store(monkeypatch)
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.state.settings = app.state.settings.model_copy(update={"job_artifact_dir": tmp_path})
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    client = TestClient(app)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            job = await jobs.create_job(None, kind=jobs.EXPORT)
+            await jobs.update_job(
+                None,
+                job.id,
+                status=jobs.SUCCEEDED,
+                result={"artifact": f"{job.id}.ndjson", "format": "ndjson"},
+            )
+
+    asyncio.run(scenario())
+    (tmp_path / "job-1.ndjson").write_bytes(b"{}\n")
+
+    assert client.get("/admin/jobs/job-1").json()["download_url"] == "/admin/jobs/job-1/download"
+    assert client.get("/admin/jobs/job-1/download").content == b"{}\n"
+    assert "download_url" not in client.get("/admin/jobs/job-2").json()
+    assert client.get("/admin/jobs/job-2/download").status_code == 404
+    assert len(store) == 2
+
+
+def test_heartbeat_fails_jobs_orphaned_by_a_stopped_worker(tmp_path) -> None:
+    pytest.importorskip("aiosqlite")
+    engine = create_engine(Settings(), f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+
+    async def scenario() -> dict:
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            runner = JobRunner(sessionmaker, limits={jobs.VALIDATE: 1}, artifact_dir=tmp_path)
+            async with sessionmaker() as session:
+                ids = {
+                    label: (await jobs.create_job(session, kind=jobs.VALIDATE)).id
+                    for label in ("running", "queued", "fresh", "done")
+                }
+                await jobs.update_job(session, ids["running"], status=jobs.RUNNING)
+                await jobs.update_job(session, ids["done"], status=jobs.SUCCEEDED)
+                # Left behind by a worker that stopped before this one started.
+                stale = datetime.now(timezone.utc) - timedelta(hours=1)
+                await session.execute(
+                    update(Job)
+                    .where(Job.id.in_([ids["running"], ids["queued"], ids["done"]]))
+                    .values(updated_at=stale)
+                )
+                await session.commit()
+
+            async def forever(context):
+                await asyncio.Event().wait()
+                return {}
+
+            own = await runner.submit(jobs.VALIDATE, forever)
+            async with sessionmaker() as session:
+                await session.execute(update(Job).where(Job.id == own).values(updated_at=stale))
+                await session.commit()
+            failed = await runner.heartbeat()
+            await runner.shutdown()
+            async with sessionmaker() as session:
+                found = {label: await jobs.get_job(session, ids[label]) for label in ids}
+            return {"failed": failed, **{label: job.status for label, job in found.items()}}
+        finally:
+            await engine.dispose()
+
+    result = asyncio.run(scenario())
+
+    assert result == {
+        "failed": 2,
+        "running": jobs.FAILED,
+        "queued": jobs.FAILED,
+        "fresh": jobs.QUEUED,
+        "done": jobs.SUCCEEDED,
+    }
+
+
+def _csrf(client: TestClient) -> str:
+    response = client.get("/admin/workspaces/import")
+    marker = 'name="csrf_token" value="'
+    start = response.text.find(marker) + len(marker)
+    end = response.text.find('"', start)
+    return response.text[start:end]
+
+
+def test_background_bulk_import_returns_job(monkeypatch, tmp_path) -> None:
+    _install_job_store(monkeypatch)
+    inserted: list = []
+
+    async def fake_insert_workspaces(session, rows):
+        inserted.extend(rows)
+
+    monkeypatch.setattr(bulk_import, "insert_workspaces", fake_insert_workspaces)
+
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.state.job_runner.sessionmaker = app.state.sessionmaker
+    app.state.job_runner.artifact_dir = tmp_path
+    app.state.settings = app.state.settings.model_copy(update={"job_artifact_dir": tmp_path})
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    upload = "\n".join(
+        [
+            json.dumps(
+                {
+                    "system_name": "Alpha",
+                    "system_id": "alpha",
+                    "created_at": "1970-01-01T00:00:00+00:00",
+                }
+            ),
+            "{broken",
+        ]
+    ).encode()
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/admin/workspaces/import/bulk?background=1",
+            data={"csrf_token": _csrf(client)},
+            files={"workspace_file": ("workspaces.ndjson", upload, "application/x-ndjson")},
+        )
+        assert response.status_code == 202
+        status_url = response.json()["status_url"]
+        assert response.headers["location"] == status_url
+
+        deadline = time.monotonic() + 5
+        while True:
+            job = client.get(status_url).json()
+            if job["status"] in (jobs.SUCCEEDED, jobs.FAILED) or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+
+    assert job["status"] == jobs.SUCCEEDED
+    assert job["kind"] == jobs.IMPORT
+    assert job["result"]["created"] == 1
+    assert job["result"]["failed"] == 1
+    assert [row["system_id"] for row in inserted] == ["alpha"]
+    assert not list(tmp_path.iterdir())
+
+
+def test_job_status_missing_returns_404(monkeypatch) -> None:
+    _install_job_store(monkeypatch)
+    app = create_app()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    client = TestClient(app)
+
+    assert client.get("/admin/jobs/missing").status_code == 404
+    assert client.get("/admin/jobs/missing/download").status_code == 404
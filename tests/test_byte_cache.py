@@ -0,0 +1,26 @@
+from engine.cache import ByteLRUCache
+
+
+def test_byte_cache_evicts_least_recently_used() -> None:
+    cache = ByteLRUCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.stats.bytes == 8
+    assert cache.stats.evictions == 1
+
+
+def test_byte_cache_tee_skips_oversized_values() -> None:
+    cache = ByteLRUCache(max_bytes=100, max_entry_bytes=5)
+
+    assert b"".join(cache.tee("small", iter([b"ab", b"cd"]))) == b"abcd"
+    assert b"".join(cache.tee("large", iter([b"abc", b"def"]))) == b"abcdef"
+
+    assert cache.get("small") == b"abcd"
+    assert cache.get("large") is None
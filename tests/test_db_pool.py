@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+
+from engine.db import InstrumentedAsyncQueuePool, create_engine, engine_options, pool_metrics
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def test_pool_settings_reach_the_engine() -> None:
+    settings = Settings(
+        database_url="postgresql+asyncpg://u:p@localhost/db",
+        db_pool_size=7,
+        db_max_overflow=3,
+        db_pool_recycle_seconds=600,
+        db_pool_timeout_seconds=2,
+        db_pool_pre_ping=False,
+        db_statement_cache_size=0,
+    )
+    options = engine_options(settings)
+    engine = create_engine(settings)
+
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0}
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, InstrumentedAsyncQueuePool)
+    assert pool.size() == 7
+    assert pool._max_overflow == 3
+    assert pool._recycle == 600
+    assert pool._timeout == 2
+    assert pool._pre_ping is False
+
+
+def test_in_memory_sqlite_keeps_default_pool() -> None:
+    options = engine_options(Settings(database_url="sqlite+aiosqlite://"))
+
+    assert "poolclass" not in options
+
+
+def test_pool_metrics_count_checkouts_overflow_and_timeouts(tmp_path) -> None:
+    pytest.importorskip("aiosqlite")
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        db_pool_size=1,
+        db_max_overflow=1,
+        db_pool_timeout_seconds=0.05,
+    )
+    engine = create_engine(settings)
+
+    async def scenario() -> dict:
+        try:
+            async with engine.connect() as first, engine.connect() as second:
+                await first.execute(text("select 1"))
+                await second.execute(text("select 1"))
+                busy = pool_metrics(engine)
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+            assert busy["checked_out"] == 2
+            assert busy["overflow"] == 1
+            return pool_metrics(engine)
+        finally:
+            await engine.dispose()
+
+    metrics = asyncio.run(scenario())
+
+    stats = metrics["stats"]
+    assert metrics["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["overflow_events"] == 1
+    assert stats["timeouts"] == 1
+    assert sum(stats["wait_histogram"]) == 2
+    assert len(stats["wait_histogram"]) == len(stats["wait_buckets_ms"]) + 1
+
+
+def test_admin_metrics_reports_db_pool() -> None:
+    app = create_app()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    client = TestClient(app)
+
+    payload = client.get("/admin/metrics").json()
+
+    assert payload["db_pool"]["pool"] == "InstrumentedAsyncQueuePool"
+    assert payload["db_pool"]["stats"]["checkouts"] == 0
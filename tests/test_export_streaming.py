@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from engine.export import iter_canonical_json, iter_export_workspace
+from engine.workspace import Workspace
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+GOLDEN_DIR = Path(__file__).parent / "golden_exports"
+
+
+def test_streamed_export_matches_golden() -> None:
+    payload = json.loads((FIXTURES_DIR / "workspace.json").read_text())
+    workspace = Workspace.from_payload(payload)
+    chunks = list(iter_export_workspace(workspace))
+    expected = (GOLDEN_DIR / "ssp.json").read_bytes()
+    assert b"".join(chunks) == expected
+
+
+def test_canonical_chunks_match_json_dumps() -> None:
+    payload = {
+        "workspace": {
+            "system_name": "Demo é",
+            "controls": [{"id": f"ac-{index}", "notes": None} for index in range(200)],
+            "meta": {"z": 1.5, "a": True},
+        }
+    }
+    compact = b"".join(iter_canonical_json(payload, chunk_size=64))
+    pretty = b"".join(iter_canonical_json(payload, pretty=True, chunk_size=64))
+
+    assert compact == json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    assert pretty == json.dumps(payload, sort_keys=True, indent=2).encode("utf-8")
+    assert len(list(iter_canonical_json(payload, chunk_size=64))) > 1
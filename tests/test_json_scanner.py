@@ -0,0 +1,45 @@
+import pytest
+
+from engine.jsonscan import JSONScanError, TopLevelKeyScanner
+
+
+def _scan(payload: bytes, chunk_size: int) -> TopLevelKeyScanner:
+    scanner = TopLevelKeyScanner(watch={"created_at"})
+    for start in range(0, len(payload), chunk_size):
+        scanner.feed(payload[start : start + chunk_size])
+    scanner.close()
+    return scanner
+
+
+def test_scanner_collects_top_level_keys_across_chunks() -> None:
+    payload = (
+        '{"system_name": "D\\"emo é", "nested": {"created_at": "x", "list": ["a", {"b": 1}]},'
+        ' "created_at": "1970-01-01T00:00:00+00:00", "k\\u00e9y": [1, 2]}'
+    ).encode("utf-8")
+
+    for chunk_size in (1, 3, 7, len(payload)):
+        scanner = _scan(payload, chunk_size)
+        assert scanner.keys == {"system_name", "nested", "created_at", "kéy"}
+        assert scanner.values == {"created_at": "1970-01-01T00:00:00+00:00"}
+
+
+@pytest.mark.parametrize(
+    ("payload", "message"),
+    [
+        (b"[1, 2]", "Workspace payload must be a JSON object"),
+        (b"not-json", "Invalid JSON file"),
+        (b'{"system_name": "Demo"', "Invalid JSON file"),
+        (b'{"system_name": "Demo"} trailing', "Invalid JSON file"),
+        (b"", "Invalid JSON file"),
+    ],
+)
+def test_scanner_rejects_bad_documents(payload: bytes, message: str) -> None:
+    with pytest.raises(JSONScanError, match=message):
+        _scan(payload, 4)
+
+
+def test_scanner_rejects_non_object_on_first_chunk() -> None:
+    scanner = TopLevelKeyScanner()
+
+    with pytest.raises(JSONScanError):
+        scanner.feed(b'  ["' + b"x" * 100)
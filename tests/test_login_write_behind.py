@@ -0,0 +1,123 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+import engine.logins as logins
+import web.routes.users as users_routes
+from engine.logins import LoginWriteBehind, batched_last_login_update
+from web.app import create_app
+from web.security import require_admin
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+@dataclass
+class DummyUser:
+    id: str
+    email: str
+    display_name: str
+    provider: str
+    is_admin: bool
+    created_at: datetime
+    last_login_at: datetime
+
+
+def test_updates_coalesce_and_flush_when_batch_fills(monkeypatch) -> None:
+    flushed = []
+
+    async def fake_write(session, batch):
+        flushed.append(batch)
+
+    monkeypatch.setattr(logins, "write_last_logins", fake_write)
+
+    async def scenario() -> LoginWriteBehind:
+        queue = LoginWriteBehind(DummySessionMaker(), interval_seconds=60, batch_size=2)
+        queue.start()
+        queue.record("a", T0)
+        queue.record("a", T0 + timedelta(minutes=1))
+        queue.record("a", T0)
+        assert queue.pending("a") == T0 + timedelta(minutes=1)
+        queue.record("b", T0)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        queue.record("c", T0)
+        await queue.close()
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert flushed == [{"a": T0 + timedelta(minutes=1), "b": T0}, {"c": T0}]
+    assert queue.metrics() == {"pending": 0, "flushed": 3, "coalesced": 2}
+
+
+def test_failed_flush_keeps_updates_pending(monkeypatch) -> None:
+    async def failing_write(session, batch):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(logins, "write_last_logins", failing_write)
+    queue = LoginWriteBehind(DummySessionMaker())
+    queue.record("a", T0)
+
+    assert asyncio.run(queue.flush()) == 0
+    assert queue.pending("a") == T0
+
+
+def test_postgres_flush_is_one_update_from_values() -> None:
+    statement = batched_last_login_update({"a": T0, "b": T0})
+    sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+    assert sql.startswith("UPDATE users SET last_login_at=pending.last_login_at FROM (VALUES")
+    assert "AS pending (id, last_login_at)" in sql
+    assert "users.last_login_at < pending.last_login_at" in sql
+
+
+def test_users_page_shows_pending_login() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.state.login_write_behind = LoginWriteBehind(DummySessionMaker())
+    app.state.login_write_behind.record("user-1", T0 + timedelta(days=1))
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    async def fake_list_users(session, **kwargs):
+        return [
+            DummyUser(
+                id="user-1",
+                email="user@example.com",
+                display_name="User",
+                provider="github",
+                is_admin=False,
+                created_at=T0,
+                last_login_at=T0,
+            )
+        ]
+
+    original_list = users_routes.list_users
+    users_routes.list_users = fake_list_users
+
+    try:
+        client = TestClient(app)
+        response = client.get("/admin/users")
+
+        assert (T0 + timedelta(days=1)).isoformat() in response.text
+    finally:
+        users_routes.list_users = original_list
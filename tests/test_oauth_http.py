@@ -0,0 +1,175 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import web.routes.auth as auth_routes
+from web.app import create_app
+from web.auth import OAuthHTTP, configure_oauth, fetch_github_identity
+from web.settings import Settings
+
+STAND_IN = "http://oauth.test"
+
+
+def _stand_in_provider() -> tuple[FastAPI, dict]:
+    """A local stand-in for the GitHub API and Google's OIDC endpoints."""
+
+    app = FastAPI()
+    calls: dict = {"metadata": 0, "user": 0, "emails": 0}
+    emails_started = asyncio.Event()
+
+    @app.get("/api/user")
+    async def user() -> dict:
+        calls["user"] += 1
+        # Only answers once the emails request is in flight, so a sequential
+        # client would time out here.
+        await asyncio.wait_for(emails_started.wait(), timeout=2)
+        return {"id": 42, "login": "octo", "name": None, "email": None}
+
+    @app.get("/api/user/emails")
+    async def emails() -> list:
+        calls["emails"] += 1
+        emails_started.set()
+        return [
+            {"email": "other@example.com", "primary": False},
+            {"email": "octo@example.com", "primary": True},
+        ]
+
+    @app.get("/.well-known/openid-configuration")
+    async def metadata() -> dict:
+        calls["metadata"] += 1
+        return {
+            "issuer": STAND_IN,
+            "authorization_endpoint": f"{STAND_IN}/authorize",
+            "token_endpoint": f"{STAND_IN}/token",
+            "userinfo_endpoint": f"{STAND_IN}/userinfo",
+        }
+
+    return app, calls
+
+
+def _settings() -> Settings:
+    return Settings(
+        github_client_id="id",
+        github_client_secret="secret",
+        github_api_base_url=f"{STAND_IN}/api/",
+        google_client_id="id",
+        google_client_secret="secret",
+        google_server_metadata_url=f"{STAND_IN}/.well-known/openid-configuration",
+        oauth_metadata_refresh_seconds=0,
+    )
+
+
+def test_github_profile_and_emails_fetched_concurrently() -> None:
+    provider, calls = _stand_in_provider()
+    settings = _settings()
+    http = OAuthHTTP(
+        configure_oauth(settings),
+        settings,
+        transport=httpx.ASGITransport(app=provider),
+    )
+
+    async def scenario() -> dict:
+        try:
+            first = http.client("github")
+            identity = await fetch_github_identity(http, {"access_token": "token"})
+            assert http.client("github") is first
+            return identity
+        finally:
+            await http.aclose()
+
+    identity = asyncio.run(scenario())
+
+    assert identity == {"email": "octo@example.com", "provider_id": "42", "display_name": "octo"}
+    assert calls["user"] == calls["emails"] == 1
+
+
+def test_metadata_prefetched_once_and_handed_to_authlib() -> None:
+    provider, calls = _stand_in_provider()
+    settings = _settings()
+    oauth = configure_oauth(settings)
+    http = OAuthHTTP(oauth, settings, transport=httpx.ASGITransport(app=provider))
+
+    async def scenario() -> dict:
+        try:
+            await http.start()
+            google = oauth.create_client("google")
+            loaded = await google.load_server_metadata()
+            await http.metadata("google")
+            return loaded
+        finally:
+            await http.aclose()
+
+    metadata = asyncio.run(scenario())
+
+    assert metadata["userinfo_endpoint"] == f"{STAND_IN}/userinfo"
+    assert calls["metadata"] == 1
+
+
+def test_metadata_only_fetched_for_providers_that_publish_it() -> None:
+    provider, calls = _stand_in_provider()
+    settings = _settings().model_copy(
+        update={"google_client_id": "", "oauth_metadata_refresh_seconds": 60}
+    )
+    http = OAuthHTTP(
+        configure_oauth(settings),
+        settings,
+        transport=httpx.ASGITransport(app=provider),
+    )
+
+    async def scenario() -> None:
+        try:
+            await http.start()
+            assert http._refresh_task is None
+        finally:
+            await http.aclose()
+
+    asyncio.run(scenario())
+
+    assert http.metadata_urls == {}
+    assert calls["metadata"] == 0
+
+
+def test_callback_uses_pooled_client(monkeypatch) -> None:
+    provider, calls = _stand_in_provider()
+    app = create_app()
+    settings = _settings()
+    app.state.oauth = configure_oauth(settings)
+    app.state.oauth_http = OAuthHTTP(
+        app.state.oauth,
+        settings,
+        transport=httpx.ASGITransport(app=provider),
+    )
+    github = app.state.oauth.create_client("github")
+    saved = {}
+
+    async def fake_authorize_access_token(request):
+        return {"access_token": "token", "token_type": "bearer"}
+
+    async def fake_upsert_user(session, **kwargs):
+        saved.update(kwargs)
+
+        class Saved:
+            id = "user-42"
+
+        return Saved()
+
+    class DummySession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    app.state.sessionmaker = lambda: DummySession()
+    monkeypatch.setattr(github, "authorize_access_token", fake_authorize_access_token)
+    monkeypatch.setattr(auth_routes, "upsert_user", fake_upsert_user)
+
+    with TestClient(app) as client:
+        response = client.get("/auth/callback/github", follow_redirects=False)
+
+    assert response.status_code == 307
+    assert saved["email"] == "octo@example.com"
+    assert saved["provider_id"] == "42"
+    assert calls["metadata"] == 1
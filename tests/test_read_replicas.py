@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from engine.db import create_engine, create_sessionmaker, read_routing
+from engine.models import Base, User
+from engine.users import get_user_by_id, list_users, upsert_user
+from web.app import PRIMARY_COOKIE, create_app
+from web.security import require_admin
+from web.settings import Settings
+
+pytest.importorskip("aiosqlite")
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def _user(email: str) -> User:
+    return User(
+        id="user-1",
+        email=email,
+        provider="github",
+        provider_id="1",
+        display_name=email.split("@")[0],
+        is_admin=False,
+        created_at=NOW,
+        last_login_at=NOW,
+    )
+
+
+def _databases(tmp_path):
+    """A primary and a lagging replica: the same user with a different email."""
+
+    settings = Settings()
+    primary = create_engine(settings, f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(settings, f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+
+    async def seed() -> None:
+        for engine, email in ((primary, "primary@example.com"), (replica, "replica@example.com")):
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            async with create_sessionmaker(engine)() as session:
+                session.add(_user(email))
+                await session.commit()
+            await engine.dispose()
+
+    asyncio.run(seed())
+    return primary, replica
+
+
+def test_reads_go_to_replica_and_writes_to_primary(tmp_path) -> None:
+    primary, replica = _databases(tmp_path)
+    sessionmaker = create_sessionmaker(primary, [replica])
+
+    async def scenario() -> dict:
+        try:
+            async with sessionmaker() as session:
+                listed = [user.email for user in await list_users(session)]
+            async with sessionmaker() as session:
+                await upsert_user(
+                    session,
+                    provider="github",
+                    provider_id="2",
+                    email="new@example.com",
+                    display_name="new",
+                )
+                after_write = [user.email for user in await list_users(session)]
+            with read_routing(primary_only=True):
+                async with sessionmaker() as session:
+                    pinned = await get_user_by_id(session, "user-1")
+            return {"listed": listed, "after_write": after_write, "pinned": pinned.email}
+        finally:
+            await primary.dispose()
+            await replica.dispose()
+
+    result = asyncio.run(scenario())
+
+    assert result["listed"] == ["replica@example.com"]
+    assert sorted(result["after_write"]) == ["new@example.com", "primary@example.com"]
+    assert result["pinned"] == "primary@example.com"
+
+
+def test_requests_stick_to_primary_after_a_write(tmp_path) -> None:
+    primary, replica = _databases(tmp_path)
+    app = create_app()
+    app.state.engine = primary
+    app.state.replica_engines = [replica]
+    app.state.sessionmaker = create_sessionmaker(primary, [replica])
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    @app.post("/test-write")
+    async def test_write() -> dict:
+        return {}
+
+    @app.get("/test-login")
+    async def test_login(request: Request) -> dict:
+        async with request.app.state.sessionmaker() as session:
+            await upsert_user(
+                session,
+                provider="github",
+                provider_id="1",
+                email="primary@example.com",
+                display_name="primary",
+            )
+        return {}
+
+    with TestClient(app) as client:
+        assert "replica@example.com" in client.get("/admin/users").text
+
+        response = client.post("/test-write")
+        assert PRIMARY_COOKIE in response.cookies
+        page = client.get("/admin/users").text
+        assert "primary@example.com" in page
+        assert "replica@example.com" not in page
+
+        client.cookies.clear()
+        assert "replica@example.com" in client.get("/admin/users").text
+        assert PRIMARY_COOKIE in client.get("/test-login").cookies
@@ -0,0 +1,29 @@
+import asyncio
+import json
+
+from engine.executor import SerializationExecutor
+
+
+def test_executor_routes_by_payload_size() -> None:
+    executor = SerializationExecutor(inline_max_bytes=10, process_min_bytes=1000)
+
+    async def scenario() -> list:
+        small = await executor.run(json.loads, b"[1]", size=3)
+        medium = await executor.run(json.loads, b"[2]", size=100)
+        large = await executor.run(json.loads, b"[3]", size=5000)
+        chunks = [
+            chunk async for chunk in executor.iterate(iter([b"a", b"b"]), size=100)
+        ]
+        return [small, medium, large, chunks]
+
+    try:
+        assert asyncio.run(scenario()) == [[1], [2], [3], [b"a", b"b"]]
+    finally:
+        executor.shutdown()
+
+    metrics = executor.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["modes"]["inline"]["completed"] == 1
+    assert metrics["modes"]["thread"]["completed"] == 4
+    assert metrics["modes"]["process"]["completed"] == 1
+    assert metrics["off_loop_seconds"] > 0
@@ -0,0 +1,104 @@
+import asyncio
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from web.uploads import read_upload_form
+
+BOUNDARY = "csrfboundary"
+TOKEN = "expected-token"
+
+
+def _field(name: str, value: str) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        f"{value}\r\n"
+    ).encode()
+
+
+def _file_header() -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="workspace_file"; filename="w.json"\r\n'
+        "Content-Type: application/json\r\n\r\n"
+    ).encode()
+
+
+def _upload(chunks: list[bytes], headers: dict[str, str] | None = None):
+    """Parse chunks as an import upload; returns the fields or error and the chunks read."""
+
+    received: list[bytes] = []
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        message = messages[len(received)]
+        received.append(message["body"])
+        return message
+
+    raw_headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})}
+    request = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/admin/workspaces/import",
+            "headers": [(key.encode(), value.encode()) for key, value in raw_headers.items()],
+            "session": {"csrf_token": TOKEN},
+        },
+        receive,
+    )
+
+    async def parse():
+        try:
+            form = await read_upload_form(request, max_bytes=1024 * 1024, spool_bytes=16)
+        except HTTPException as exc:
+            return exc
+        try:
+            return {
+                key: value if isinstance(value, str) else await value.read()
+                for key, value in form.multi_items()
+            }
+        finally:
+            await form.close()
+
+    return asyncio.run(parse()), received
+
+
+def _chunks(token_field: bytes) -> list[bytes]:
+    data = [b"x" * 100 for _ in range(5)]
+    return [token_field + _file_header(), *data, f"\r\n--{BOUNDARY}--\r\n".encode()]
+
+
+def test_upload_with_a_forged_token_stops_before_the_file() -> None:
+    error, received = _upload(_chunks(_field("csrf_token", "forged")))
+
+    assert isinstance(error, HTTPException)
+    assert error.detail == "Invalid CSRF token"
+    assert len(received) == 1
+
+
+def test_upload_without_a_token_ahead_of_the_file_stops_at_the_file() -> None:
+    error, received = _upload(_chunks(b""))
+
+    assert isinstance(error, HTTPException)
+    assert error.detail == "Invalid CSRF token"
+    assert len(received) == 1
+
+
+def test_upload_without_any_token_is_refused() -> None:
+    error, _ = _upload([_field("name", "Demo") + f"--{BOUNDARY}--\r\n".encode()])
+
+    assert isinstance(error, HTTPException)
+    assert error.detail == "Invalid CSRF token"
+
+
+def test_upload_accepts_the_token_field_or_header() -> None:
+    form, received = _upload(_chunks(_field("csrf_token", TOKEN)))
+    assert form == {"csrf_token": TOKEN, "workspace_file": b"x" * 500}
+    assert len(received) == 7
+
+    form, _ = _upload(_chunks(b""), headers={"x-csrf-token": TOKEN})
+    assert form == {"workspace_file": b"x" * 500}
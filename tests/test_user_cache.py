@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import web.app as app_module
+import web.security as security
+from engine.cache import TTLCache
+from web.app import create_app
+from web.security import UserResolutionStats, load_user, require_admin
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyUser:
+    id = "user-1"
+    is_admin = True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str] = TTLCache(2, ttl_seconds=10, clock=clock)
+
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.stats.evictions == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+
+    cache.put("a", "A")
+    cache.discard("a")
+    assert cache.get("a") is None
+    assert cache.stats.invalidations == 1
+    assert cache.stats.hit_rate == 1 / 4
+
+
+def test_load_user_hits_database_once_per_ttl(monkeypatch) -> None:
+    loads = []
+
+    async def fake_get_user_by_id(session, user_id):
+        loads.append(user_id)
+        return DummyUser()
+
+    monkeypatch.setattr(security, "get_user_by_id", fake_get_user_by_id)
+    cache = TTLCache(10, ttl_seconds=30)
+    stats = UserResolutionStats()
+    request = SimpleNamespace(
+        session={"user_id": "user-1"},
+        app=SimpleNamespace(state=SimpleNamespace(user_cache=cache, user_resolution=stats)),
+    )
+
+    async def resolve_many() -> None:
+        for _ in range(5):
+            assert (await load_user(request, DummySessionMaker())).id == "user-1"
+
+    asyncio.run(resolve_many())
+
+    assert loads == ["user-1"]
+    assert stats.database_loads == 1
+    assert cache.stats.hits == 4
+
+    cache.discard("user-1")
+    asyncio.run(load_user(request, DummySessionMaker()))
+    assert loads == ["user-1", "user-1"]
+
+
+def test_static_and_health_skip_user_resolution(monkeypatch) -> None:
+    async def fail_load_user(request, sessionmaker=None):
+        raise AssertionError("user resolution should be skipped")
+
+    monkeypatch.setattr(app_module, "load_user", fail_load_user)
+    app = create_app()
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/static/does-not-exist.css").status_code == 404
+    assert app.state.user_resolution.skipped == 2
+
+
+def test_admin_metrics_reports_user_resolution(monkeypatch) -> None:
+    async def fake_load_user(request, sessionmaker=None):
+        return DummyUser()
+
+    monkeypatch.setattr(app_module, "load_user", fake_load_user)
+    app = create_app()
+    app.dependency_overrides[require_admin] = lambda: DummyUser()
+    client = TestClient(app)
+
+    client.get("/health")
+    payload = client.get("/admin/metrics").json()["user_resolution"]
+
+    assert payload["skipped_requests"] == 1
+    assert payload["db_round_trips_saved"] >= 1
+    assert payload["cache"]["hit_rate"] == 0.0
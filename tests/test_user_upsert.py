@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from engine.users import upsert_user_statement
+
+VALUES = {
+    "id": "user-1",
+    "email": "admin@example.com",
+    "provider": "github",
+    "provider_id": "42",
+    "display_name": "Admin",
+    "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    "last_login_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+}
+
+
+def _compiled(**kwargs) -> str:
+    statement = upsert_user_statement("postgresql", VALUES, **kwargs)
+    return " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+
+def test_postgres_upsert_is_single_statement() -> None:
+    sql = _compiled()
+
+    assert sql.startswith("INSERT INTO users")
+    assert "ON CONFLICT (provider, provider_id) DO UPDATE SET" in sql
+    assert "is_admin = (users.is_admin OR excluded.is_admin)" in sql
+    assert "created_at = excluded" not in sql
+    assert "RETURNING users.id" in sql
+
+
+def test_bootstrap_admin_is_decided_in_statement() -> None:
+    assert "NOT (EXISTS (SELECT" in _compiled(bootstrap_admin=True)
+    assert "EXISTS" not in _compiled(is_admin=True)
+
+
+def test_other_dialects_use_fallback() -> None:
+    assert upsert_user_statement("mysql", VALUES) is None
@@ -0,0 +1,110 @@
+import io
+import json
+import zipfile
+from dataclasses import dataclass
+
+from fastapi.testclient import TestClient
+
+import web.routes.workspaces as workspaces_routes
+from web.app import create_app
+from web.security import require_admin
+
+
+@dataclass
+class DummyRecord:
+    id: str
+    system_id: str
+    data: dict
+    payload_bytes: int | None = None
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+RECORDS = [
+    DummyRecord(id="w-1", system_id="sys-a", data={"system_name": "A"}),
+    DummyRecord(id="w-2", system_id="sys-b", data={"system_name": "B"}),
+    DummyRecord(id="w-3", system_id="sys-a", data={"system_name": "A copy"}),
+]
+
+
+def _client(captured: dict) -> TestClient:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    async def fake_stream_workspaces(session, *, owner_id=None, updated_since=None):
+        captured["owner_id"] = owner_id
+        for record in RECORDS:
+            yield record
+
+    workspaces_routes.stream_workspaces = fake_stream_workspaces
+    return TestClient(app)
+
+
+def test_bulk_export_ndjson() -> None:
+    original_stream = workspaces_routes.stream_workspaces
+    captured: dict = {}
+    try:
+        client = _client(captured)
+        response = client.get("/admin/workspaces/export?owner_id=user-1")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.content.splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"workspace": record.data} for record in RECORDS
+        ]
+        assert lines[0] == b'{"workspace":{"system_name":"A"}}'
+        assert captured["owner_id"] == "user-1"
+        modes = client.app.state.executor.metrics()["modes"]
+        assert modes["thread"]["completed"] > 0
+        assert modes["inline"]["completed"] == 0
+    finally:
+        workspaces_routes.stream_workspaces = original_stream
+
+
+def test_bulk_export_zip() -> None:
+    original_stream = workspaces_routes.stream_workspaces
+    try:
+        client = _client({})
+        response = client.get("/admin/workspaces/export?format=zip")
+
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.namelist() == [
+            "workspace-sys-a.json",
+            "workspace-sys-b.json",
+            "workspace-sys-a-w-3.json",
+        ]
+        assert json.loads(archive.read("workspace-sys-b.json")) == {
+            "workspace": {"system_name": "B"}
+        }
+        assert client.app.state.executor.metrics()["modes"]["thread"]["completed"] > 0
+    finally:
+        workspaces_routes.stream_workspaces = original_stream
+
+
+def test_bulk_export_rejects_unknown_format() -> None:
+    original_stream = workspaces_routes.stream_workspaces
+    try:
+        client = _client({})
+        response = client.get("/admin/workspaces/export?format=xml")
+
+        assert response.status_code == 400
+    finally:
+        workspaces_routes.stream_workspaces = original_stream
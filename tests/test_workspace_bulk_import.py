@@ -0,0 +1,155 @@
+import io
+import json
+import zipfile
+
+from fastapi.testclient import TestClient
+
+import engine.bulk_import as bulk_import
+from web.app import create_app
+from web.security import require_admin
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+    id = "user-1"
+
+
+def _csrf(client: TestClient) -> str:
+    response = client.get("/admin/workspaces/import")
+    marker = 'name="csrf_token" value="'
+    start = response.text.find(marker) + len(marker)
+    end = response.text.find('"', start)
+    return response.text[start:end]
+
+
+def _payload(name: str, system_id: str) -> dict:
+    return {"system_name": name, "system_id": system_id, "created_at": "1970-01-01T00:00:00+00:00"}
+
+
+def _run_import(upload: bytes, batches: list) -> dict:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    async def fake_insert_workspaces(session, rows):
+        batches.append(rows)
+
+    original_insert = bulk_import.insert_workspaces
+    bulk_import.insert_workspaces = fake_insert_workspaces
+
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/admin/workspaces/import/bulk",
+            data={"csrf_token": _csrf(client)},
+            files={"workspace_file": ("workspaces", upload, "application/octet-stream")},
+        )
+        assert response.status_code == 200
+        return response.json()
+    finally:
+        bulk_import.insert_workspaces = original_insert
+
+
+def test_bulk_import_ndjson_reports_each_record() -> None:
+    lines = [
+        json.dumps(_payload("  Alpha   System ", "a")),
+        "",
+        json.dumps({"workspace": _payload("Beta", "b")}),
+        "not json",
+        json.dumps(_payload("x" * 201, "c")),
+    ]
+    batches: list = []
+
+    report = _run_import("\n".join(lines).encode("utf-8"), batches)
+
+    assert report["created"] == 2
+    assert report["failed"] == 2
+    statuses = [(result["source"], result["status"]) for result in report["results"]]
+    assert statuses == [
+        ("line 1", "created"),
+        ("line 3", "created"),
+        ("line 4", "error"),
+        ("line 5", "error"),
+    ]
+    assert report["results"][3]["error"] == "Workspace name is too long"
+    rows = batches[0]
+    assert [row["name"] for row in rows] == ["Alpha System", "Beta"]
+    assert rows[0]["owner_id"] == "user-1"
+    assert rows[0]["id"] == report["results"][0]["workspace_id"]
+    assert rows[0]["export_sha256"]
+
+
+def test_bulk_import_zip_archive() -> None:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("workspace-a.json", json.dumps(_payload("Alpha", "a")))
+        archive.writestr("README.txt", "ignored")
+        archive.writestr("workspace-b.json", json.dumps(_payload("Beta", "b")))
+    batches: list = []
+
+    report = _run_import(buffer.getvalue(), batches)
+
+    assert report["created"] == 2
+    assert [result["source"] for result in report["results"]] == [
+        "workspace-a.json",
+        "workspace-b.json",
+    ]
+
+
+def test_bulk_import_rejects_corrupt_zip_archive() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    client = TestClient(app)
+
+    response = client.post(
+        "/admin/workspaces/import/bulk",
+        data={"csrf_token": _csrf(client)},
+        files={"workspace_file": ("workspaces.zip", b"PK\x03\x04" + b"garbage" * 20)},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid zip archive"
+
+
+def test_zip_entries_report_corrupt_members() -> None:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("workspace-a.json", json.dumps(_payload("Alpha", "a")) * 20)
+    data = bytearray(buffer.getvalue())
+    # Flip a byte inside the compressed member so its CRC no longer matches.
+    data[len("workspace-a.json") + 40] ^= 0xFF
+
+    entries = list(bulk_import.iter_import_entries(io.BytesIO(bytes(data))))
+
+    assert [entry.error for entry in entries] == ["Corrupt archive entry"]
+
+
+def test_prepare_batch_splits_input_into_batches() -> None:
+    entries = bulk_import.iter_ndjson_entries(
+        io.BytesIO(
+            b"".join(
+                json.dumps(_payload(f"Name {index}", str(index))).encode("utf-8") + b"\n"
+                for index in range(5)
+            )
+        )
+    )
+
+    sizes = []
+    while (prepared := bulk_import.prepare_batch(entries, 2)) is not None:
+        sizes.append(len(prepared.rows))
+
+    assert sizes == [2, 2, 1]
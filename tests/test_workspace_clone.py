@@ -0,0 +1,314 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql
+
+import engine.bodies as bodies
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.bodies import CloneStorage, private_sections
+from engine.db import create_engine, create_sessionmaker
+from engine.merkle import hash_tree
+from engine.models import Base, WorkspaceBody, WorkspaceRecord
+from engine.patch import JSON_PATCH, MERGE_PATCH, parse_json_patch
+from engine.revisions import get_revision_data
+from engine.workspaces import WorkspaceConflict, workspace_values
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _ssp() -> dict:
+    return {
+        "system_name": "Payroll",
+        "system_id": "sys-1",
+        "created_at": CREATED.isoformat(),
+        "controls": [{"id": f"ac-{index}", "description": "Control " * 20} for index in range(50)],
+        "roles": ["isso", "owner"],
+    }
+
+
+def test_private_sections_keep_only_diverged_sections() -> None:
+    body = _ssp()
+    document = {**body, "roles": ["isso"], "notes": "Draft"}
+
+    assert private_sections(document, body) == {"roles": ["isso"], "notes": "Draft"}
+    assert private_sections(body, body) == {}
+    assert private_sections({"system_name": "Payroll"}, body) is None
+
+
+def test_search_statement_checks_clones_against_full_documents() -> None:
+    statement = workspaces.search_workspaces_statement({"roles": ["isso"]}, limit=10)
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "workspaces.data @>" in sql
+    assert "JOIN workspace_bodies ON workspace_bodies.digest = workspaces.body_digest" in sql
+    assert "(workspace_bodies.data || workspaces.data) @>" in sql
+
+
+def _run(database_url, scenario):
+    engine = create_engine(Settings(), database_url)
+
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            row = workspace_values(
+                name="Payroll", system_id="sys-1", data=_ssp(), created_at=CREATED
+            )
+            async with sessionmaker() as session:
+                await workspaces.insert_workspaces(session, [row])
+            return await scenario(sessionmaker, row["id"])
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_clone_shares_the_source_body(database_url) -> None:
+    async def scenario(sessionmaker, source_id):
+        async with sessionmaker() as session:
+            clone_id = await workspaces.clone_workspace(
+                session, source_id, name="Payroll copy", system_id="sys-2"
+            )
+            second_id = await workspaces.clone_workspace(
+                session, clone_id, name="Payroll copy 2", system_id="sys-3"
+            )
+            stored = (
+                await session.execute(
+                    select(WorkspaceRecord.data, WorkspaceRecord.body_digest).where(
+                        WorkspaceRecord.id == clone_id
+                    )
+                )
+            ).one()
+            clone = (await workspaces.get_workspace(session, clone_id)).data
+            second = (await workspaces.get_workspace(session, second_id)).data
+            trees = await workspaces.get_workspace_trees(session, [clone_id, second_id])
+            digests = [trees[clone_id].data_digest, trees[second_id].data_digest]
+            stale = await workspaces.stale_workspaces(session, [clone_id, second_id])
+            export = await workspaces.refresh_workspace_export(session, clone_id)
+            found = await workspaces.search_workspaces(session, {"system_id": "sys-2"})
+            diff = await workspaces.diff_workspaces(session, source_id, clone_id)
+            storage = await bodies.clone_storage(session)
+            body_count = await session.scalar(select(func.count()).select_from(WorkspaceBody))
+            missing = await workspaces.clone_workspace(
+                session, "missing", name="Missing", system_id="sys-4"
+            )
+        return (
+            stored, clone, second, digests, stale, export, found, diff, storage, body_count, missing
+        )
+
+    (stored, clone, second, digests, stale, export, found, diff, storage, body_count, missing) = (
+        _run(database_url, scenario)
+    )
+
+    assert set(stored.data) == {"system_name", "system_id", "created_at"}
+    assert stored.body_digest is not None
+    assert clone["controls"] == _ssp()["controls"]
+    assert clone["system_name"] == "Payroll copy"
+    assert second["system_id"] == "sys-3" and second["roles"] == ["isso", "owner"]
+    # Trees come from the source's without rehashing; exports wait for the job.
+    assert digests == [hash_tree(clone)[0], hash_tree(second)[0]]
+    assert len(stale) == 2
+    assert b'"Payroll copy"' in export.export_bytes
+    assert [summary.name for summary in found] == ["Payroll copy"]
+    assert {operation.path[0] for operation in diff.operations} == {
+        "system_name",
+        "system_id",
+        "created_at",
+    }
+    assert body_count == 1
+    assert storage.clones == 2 and storage.bodies == 1
+    # Two clones and their version 1 snapshots share one stored copy.
+    assert storage.saved_bytes == 3 * storage.body_bytes
+    assert missing is None
+
+
+def test_clone_copies_sources_edited_in_sql_without_hashing(database_url, monkeypatch) -> None:
+    async def no_refresh(session, workspace_id, **kwargs):
+        raise AssertionError("clone rehashed its source")
+
+    monkeypatch.setattr(workspaces, "refresh_workspace_tree", no_refresh)
+
+    async def scenario(sessionmaker, source_id):
+        async with sessionmaker() as session:
+            # As a rename on SQLite, or a PostgreSQL patch, leaves the row.
+            await session.execute(
+                update(WorkspaceRecord)
+                .where(WorkspaceRecord.id == source_id)
+                .values(**workspaces.STALE_EXPORT_VALUES)
+            )
+            await session.commit()
+            clone_id = await workspaces.clone_workspace(
+                session, source_id, name="Payroll copy", system_id="sys-2"
+            )
+            stored = (
+                await session.execute(
+                    select(
+                        WorkspaceRecord.data,
+                        WorkspaceRecord.body_digest,
+                        WorkspaceRecord.section_counts,
+                        WorkspaceRecord.version,
+                    ).where(WorkspaceRecord.id == clone_id)
+                )
+            ).one()
+            snapshot = await get_revision_data(session, clone_id, 1)
+        return stored, snapshot
+
+    stored, snapshot = _run(database_url, scenario)
+
+    assert stored.body_digest is None
+    assert stored.data == {
+        **_ssp(),
+        "system_name": "Payroll copy",
+        "system_id": "sys-2",
+        "created_at": stored.data["created_at"],
+    }
+    assert stored.data["created_at"] != CREATED.isoformat()
+    assert stored.section_counts == {"controls": 50, "roles": 2}
+    assert stored.version == 1
+    assert snapshot == stored.data
+
+
+def test_patches_store_only_diverged_sections(database_url) -> None:
+    async def scenario(sessionmaker, source_id):
+        async with sessionmaker() as session:
+            clone_id = await workspaces.clone_workspace(
+                session, source_id, name="Payroll copy", system_id="sys-2"
+            )
+            await workspaces.patch_workspace(session, clone_id, MERGE_PATCH, {"roles": ["isso"]})
+            await workspaces.patch_workspace(
+                session,
+                clone_id,
+                JSON_PATCH,
+                parse_json_patch([{"op": "replace", "path": "/controls/3/id", "value": "ac-x"}]),
+            )
+            diverged = await session.scalar(
+                select(WorkspaceRecord.data).where(WorkspaceRecord.id == clone_id)
+            )
+            full = (await workspaces.get_workspace(session, clone_id)).data
+            await workspaces.patch_workspace(session, clone_id, MERGE_PATCH, {"roles": None})
+            detached = (
+                await session.execute(
+                    select(WorkspaceRecord.data, WorkspaceRecord.body_digest).where(
+                        WorkspaceRecord.id == clone_id
+                    )
+                )
+            ).one()
+            first = await get_revision_data(session, clone_id, 1)
+            second = await get_revision_data(session, clone_id, 2)
+        return set(diverged), full, detached, first, second
+
+    diverged, full, detached, first, second = _run(database_url, scenario)
+
+    assert diverged == {"system_name", "system_id", "created_at", "roles", "controls"}
+    assert full["roles"] == ["isso"] and full["controls"][3]["id"] == "ac-x"
+    assert detached.body_digest is None
+    assert "roles" not in detached.data and detached.data["controls"][0]["id"] == "ac-0"
+    assert first["roles"] == ["isso", "owner"] and first["system_name"] == "Payroll copy"
+    assert second["roles"] == ["isso"]
+
+
+def test_bodies_are_released_with_their_last_clone(database_url, monkeypatch) -> None:
+    monkeypatch.setattr(bodies, "BODY_GRACE", timedelta(0))
+
+    async def scenario(sessionmaker, source_id):
+        async with sessionmaker() as session:
+            clone_id = await workspaces.clone_workspace(
+                session, source_id, name="Payroll copy", system_id="sys-2"
+            )
+            await workspaces.delete_workspace(session, source_id)
+            kept = await session.scalar(select(func.count()).select_from(WorkspaceBody))
+            await workspaces.delete_workspace(session, clone_id)
+            released = await session.scalar(select(func.count()).select_from(WorkspaceBody))
+        return kept, released
+
+    assert _run(database_url, scenario) == (1, 0)
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    id = "admin-1"
+    is_admin = True
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    return TestClient(app)
+
+
+def _csrf(client: TestClient) -> str:
+    response = client.get("/admin/workspaces/import")
+    marker = 'name="csrf_token" value="'
+    start = response.text.find(marker) + len(marker)
+    return response.text[start : response.text.find('"', start)]
+
+
+def test_clone_routes(client, monkeypatch) -> None:
+    calls = []
+
+    async def fake_clone_workspace(session, source_id, *, name, system_id, owner_id=None):
+        calls.append((source_id, name, owner_id))
+        if source_id == "missing":
+            return None
+        if source_id == "busy":
+            raise WorkspaceConflict([source_id])
+        return "w2"
+
+    async def fake_clone_storage(session):
+        return CloneStorage(clones=2, bodies=1, body_bytes=900, private_bytes=200, saved_bytes=900)
+
+    monkeypatch.setattr(workspaces_routes, "clone_workspace", fake_clone_workspace)
+    monkeypatch.setattr(workspaces_routes, "clone_storage", fake_clone_storage)
+    queued: list[list[str]] = []
+    monkeypatch.setattr(client.app.state.job_runner, "materialize", queued.append)
+
+    csrf_token = _csrf(client)
+    cloned = client.post(
+        "/admin/workspaces/w1/clone",
+        data={"name": " Payroll copy ", "csrf_token": csrf_token},
+        follow_redirects=False,
+    )
+    missing = client.post(
+        "/admin/workspaces/missing/clone", data={"name": "Copy", "csrf_token": csrf_token}
+    )
+    busy = client.post(
+        "/admin/workspaces/busy/clone", data={"name": "Copy", "csrf_token": csrf_token}
+    )
+    storage = client.get("/admin/workspaces/storage")
+
+    assert cloned.status_code == 303
+    assert cloned.headers["location"] == "/admin/workspaces/w2"
+    assert calls[0] == ("w1", "Payroll copy", "admin-1")
+    assert queued == [["w2"]]
+    assert missing.status_code == 404
+    assert busy.status_code == 409
+    assert storage.json() == {
+        "clones": 2,
+        "bodies": 1,
+        "body_bytes": 900,
+        "private_bytes": 200,
+        "saved_bytes": 900,
+    }
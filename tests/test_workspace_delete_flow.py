@@ -52,7 +52,7 @@ def test_workspace_delete_requires_csrf() -> None:
             updated_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
         )
 
-    async def fake_delete_workspace(session, workspace_id: str):
+    async def fake_delete_workspace(session, workspace_id: str, expected_version=None):
         return True
 
     original_get = workspaces_routes.get_workspace
@@ -81,3 +81,37 @@ def test_workspace_delete_requires_csrf() -> None:
     finally:
         workspaces_routes.get_workspace = original_get
         workspaces_routes.delete_workspace = original_delete
+
+
+def test_workspace_delete_selected(monkeypatch) -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    deleted = []
+
+    async def fake_list_workspaces(session, **kwargs):
+        return []
+
+    async def fake_delete_workspaces(session, workspace_ids):
+        deleted.extend(workspace_ids)
+        return workspace_ids
+
+    monkeypatch.setattr(workspaces_routes, "list_workspaces", fake_list_workspaces)
+    monkeypatch.setattr(workspaces_routes, "delete_workspaces", fake_delete_workspaces)
+
+    client = TestClient(app)
+    page = client.get("/admin/workspaces")
+    marker = 'name="csrf_token" value="'
+    start = page.text.find(marker) + len(marker)
+    csrf_token = page.text[start : page.text.find('"', start)]
+
+    empty = client.post("/admin/workspaces/delete", data={"csrf_token": csrf_token})
+    response = client.post(
+        "/admin/workspaces/delete",
+        data={"csrf_token": csrf_token, "workspace_ids": ["w1", "w2"]},
+        follow_redirects=False,
+    )
+
+    assert empty.status_code == 400
+    assert response.status_code == 303
+    assert deleted == ["w1", "w2"]
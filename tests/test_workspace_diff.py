@@ -0,0 +1,192 @@
+import asyncio
+import copy
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.db import create_engine, create_sessionmaker
+from engine.merkle import diff_documents, diff_trees, hash_tree
+from engine.models import Base, WorkspaceRecord
+from engine.patch import MERGE_PATCH, Operation, apply_json_patch
+from engine.revisions import RevisionChain, encode_delta
+from engine.workspaces import WorkspaceConflict, WorkspaceDiff, WorkspaceTree, workspace_values
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _ssp(system_id: str) -> dict:
+    return {
+        "system_name": "Payroll",
+        "system_id": system_id,
+        "created_at": CREATED.isoformat(),
+        "controls": [
+            {"id": f"ac-{index}", "description": f"Control {index} " * 20, "roles": ["isso"]}
+            for index in range(200)
+        ],
+    }
+
+
+def test_diff_patch_turns_left_into_right() -> None:
+    left = _ssp("sys-1")
+    right = copy.deepcopy(left)
+    right["controls"][42]["description"] = "Rewritten"
+    right["controls"][7]["roles"].append("owner")
+    right["controls"].append({"id": "ac-200"})
+    right["notes"] = "Reviewed"
+    del right["created_at"]
+
+    operations = diff_documents(left, right)
+
+    assert [(operation.op, operation.path) for operation in operations] == [
+        ("remove", ("created_at",)),
+        ("replace", ("controls", "7")),
+        ("replace", ("controls", "42")),
+        ("add", ("controls", "200")),
+        ("add", ("notes",)),
+    ]
+    assert apply_json_patch(copy.deepcopy(left), operations) == right
+    assert diff_documents(right, left) != []
+    assert diff_documents(left, copy.deepcopy(left)) == []
+
+
+def test_digests_ignore_key_order_but_not_types() -> None:
+    assert hash_tree({"a": 1, "b": [True]}) == hash_tree({"b": [True], "a": 1})
+    digests = {hash_tree(value)[0] for value in (1, 1.0, "1", True, [1], {"1": 1}, None)}
+    assert len(digests) == 7
+
+    digest, tree = hash_tree(_ssp("sys-1"))
+    assert isinstance(tree, list) and tree[0] == digest
+    assert isinstance(tree[1]["controls"][0], str)
+    assert diff_trees(tree, tree) == []
+
+
+def _run(tmp_path, scenario):
+    pytest.importorskip("aiosqlite")
+    engine = create_engine(Settings(), f"sqlite+aiosqlite:///{tmp_path / 'workspaces.db'}")
+
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            rows = [
+                workspace_values(
+                    name="Payroll", system_id=system_id, data=_ssp(system_id), created_at=CREATED
+                )
+                for system_id in ("sys-1", "sys-2")
+            ]
+            async with sessionmaker() as session:
+                await workspaces.insert_workspaces(session, rows)
+            return await scenario(sessionmaker, rows[0]["id"], rows[1]["id"])
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_diff_workspaces_reads_only_changed_values(tmp_path) -> None:
+    async def scenario(sessionmaker, left_id, right_id):
+        async with sessionmaker() as session:
+            await workspaces.patch_workspace(session, right_id, MERGE_PATCH, {"notes": "Draft"})
+            first = await workspaces.diff_workspaces(session, left_id, right_id)
+            # A SQL-side edit clears the tree; the next diff rehashes it.
+            await session.execute(
+                update(WorkspaceRecord)
+                .where(WorkspaceRecord.id == right_id)
+                .values(**workspaces.STALE_EXPORT_VALUES)
+            )
+            await session.commit()
+            second = await workspaces.diff_workspaces(session, left_id, right_id)
+            stored = await workspaces.get_workspace_trees(session, [right_id])
+            missing = await workspaces.diff_workspaces(session, left_id, "missing")
+        return first, second, stored[right_id], missing
+
+    first, second, stored, missing = _run(tmp_path, scenario)
+
+    assert [operation.to_json() for operation in first.operations] == [
+        {"op": "add", "path": "/notes", "value": "Draft"},
+        {"op": "replace", "path": "/system_id", "value": "sys-2"},
+    ]
+    assert first.right.version == 2
+    assert second.operations == first.operations
+    assert stored.data_digest == first.right.data_digest
+    assert stored.data_tree is not None
+    assert missing is None
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    return TestClient(app)
+
+
+def test_diff_routes(client, monkeypatch) -> None:
+    async def fake_diff_workspaces(session, left_id, right_id, *, executor=None):
+        if right_id == "missing":
+            return None
+        if right_id == "busy":
+            raise WorkspaceConflict([right_id])
+        return WorkspaceDiff(
+            left=WorkspaceTree(id=left_id, version=1, data_digest="a", data_tree="a"),
+            right=WorkspaceTree(id=right_id, version=3, data_digest="b", data_tree="b"),
+            operations=[Operation("replace", ("notes",), "Final")],
+        )
+
+    async def fake_load_revision_chain(session, workspace_id, version):
+        if version > 2:
+            return None
+        deltas = [("merge-patch", encode_delta({"notes": "Final"}))] if version == 2 else []
+        return RevisionChain(version=version, snapshot={"notes": "Draft"}, deltas=deltas)
+
+    monkeypatch.setattr(workspaces_routes, "diff_workspaces", fake_diff_workspaces)
+    monkeypatch.setattr(workspaces_routes, "load_revision_chain", fake_load_revision_chain)
+
+    diff = client.get("/admin/workspaces/diff?left=w1&right=w2")
+    missing = client.get("/admin/workspaces/diff?left=w1&right=missing")
+    busy = client.get("/admin/workspaces/diff?left=w1&right=busy")
+    revision = client.get("/admin/workspaces/w1/revisions/2/diff")
+    reverse = client.get("/admin/workspaces/w1/revisions/1/diff?base=2")
+    unknown = client.get("/admin/workspaces/w1/revisions/3/diff")
+
+    assert diff.json() == {
+        "left": {"id": "w1", "version": 1, "digest": "a"},
+        "right": {"id": "w2", "version": 3, "digest": "b"},
+        "identical": False,
+        "patch": [{"op": "replace", "path": "/notes", "value": "Final"}],
+    }
+    assert missing.status_code == 404
+    assert busy.status_code == 409
+    assert revision.json() == {
+        "id": "w1",
+        "base": 1,
+        "version": 2,
+        "patch": [{"op": "replace", "path": "/notes", "value": "Final"}],
+    }
+    assert reverse.json()["patch"] == [{"op": "replace", "path": "/notes", "value": "Draft"}]
+    assert unknown.status_code == 404
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+import web.routes.workspaces as workspaces_routes
+from engine.export import iter_canonical_json
+from engine.ids import content_digest
+from web.app import create_app
+from web.security import require_admin
+
+
+@dataclass
+class DummyWorkspace:
+    id: str
+    name: str
+    system_id: str
+    owner_id: str | None
+    data: dict
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass
+class DummyExport:
+    id: str
+    system_id: str
+    updated_at: datetime
+    export_sha256: str | None
+    payload_bytes: int | None = None
+    data: dict | None = None
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def test_workspace_export_serves_materialized_bytes() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    document = b'{"workspace":{"system_name":"Demo"}}'
+    encodes = []
+    reads = []
+
+    async def fake_get_workspace_export(session, workspace_id: str, *, include_data=False):
+        reads.append("data" if include_data else "validators")
+        return DummyExport(
+            id=workspace_id,
+            system_id="system-1",
+            updated_at=datetime(2026, 1, 20, 8, 30, tzinfo=timezone.utc),
+            export_sha256=content_digest(document),
+            data={"system_name": "Demo"} if include_data else None,
+        )
+
+    def counting_encoder(payload, *, pretty=False):
+        encodes.append(pretty)
+        return iter_canonical_json(payload, pretty=pretty)
+
+    async def fake_read_workspace_export(session, workspace_id, export_sha256, offset=0):
+        reads.append("export")
+        return document[offset:]
+
+    original_get = workspaces_routes.get_workspace_export
+    original_encoder = workspaces_routes.iter_canonical_json
+    original_read = workspaces_routes.read_workspace_export
+    workspaces_routes.get_workspace_export = fake_get_workspace_export
+    workspaces_routes.read_workspace_export = fake_read_workspace_export
+    workspaces_routes.iter_canonical_json = counting_encoder
+
+    try:
+        client = TestClient(app)
+        first = client.get("/admin/workspaces/workspace-1/export")
+        assert first.status_code == 200
+        assert first.content == document
+        assert first.headers["etag"] == f'"{content_digest(document)}"'
+        assert first.headers["last-modified"] == "Tue, 20 Jan 2026 08:30:00 GMT"
+
+        repeat = client.get(
+            "/admin/workspaces/workspace-1/export",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert repeat.status_code == 304
+        assert encodes == []
+        # The revalidation read only the validators.
+        assert reads == ["validators", "export", "validators"]
+
+        pretty = client.get("/admin/workspaces/workspace-1/export?pretty=1")
+        assert pretty.status_code == 200
+        assert pretty.headers["etag"] != first.headers["etag"]
+        cached = client.get("/admin/workspaces/workspace-1/export?pretty=1")
+        assert cached.content == pretty.content
+        revalidated = client.get(
+            "/admin/workspaces/workspace-1/export?pretty=1",
+            headers={"If-None-Match": pretty.headers["etag"]},
+        )
+        assert revalidated.status_code == 304
+        assert encodes == [True]
+        # Neither the cache hit nor the revalidation read the document.
+        assert reads[3:] == ["validators", "data", "validators", "validators"]
+    finally:
+        workspaces_routes.get_workspace_export = original_get
+        workspaces_routes.read_workspace_export = original_read
+        workspaces_routes.iter_canonical_json = original_encoder
+
+
+def test_workspace_export_encodes_stale_rows_without_writing() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    data = {"system_name": "Demo"}
+    reads = []
+
+    async def fake_get_workspace_export(session, workspace_id: str, *, include_data=False):
+        reads.append(include_data)
+        return DummyExport(
+            id=workspace_id,
+            system_id="system-1",
+            updated_at=datetime(2026, 1, 20, tzinfo=timezone.utc),
+            export_sha256=None,
+            data=data if include_data else None,
+        )
+
+    original_get = workspaces_routes.get_workspace_export
+    workspaces_routes.get_workspace_export = fake_get_workspace_export
+
+    try:
+        client = TestClient(app)
+        response = client.get("/admin/workspaces/workspace-1/export")
+
+        assert response.status_code == 200
+        assert response.content == b"".join(iter_canonical_json({"workspace": data}))
+        assert reads == [False, True]
+    finally:
+        workspaces_routes.get_workspace_export = original_get
+
+
+def test_workspace_detail_honours_if_modified_since() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    async def fake_get_workspace(session, workspace_id: str):
+        return DummyWorkspace(
+            id=workspace_id,
+            name="Demo",
+            system_id="system-1",
+            owner_id=None,
+            data={"system_name": "Demo"},
+            created_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
+            updated_at=datetime(2026, 1, 20, 8, 30, 15, 500, tzinfo=timezone.utc),
+        )
+
+    original_get = workspaces_routes.get_workspace
+    workspaces_routes.get_workspace = fake_get_workspace
+
+    try:
+        client = TestClient(app)
+        page = client.get("/admin/workspaces/workspace-1")
+        assert page.status_code == 200
+
+        by_etag = client.get(
+            "/admin/workspaces/workspace-1",
+            headers={"If-None-Match": page.headers["etag"]},
+        )
+        assert by_etag.status_code == 304
+
+        by_date = client.get(
+            "/admin/workspaces/workspace-1",
+            headers={"If-Modified-Since": page.headers["last-modified"]},
+        )
+        assert by_date.status_code == 304
+    finally:
+        workspaces_routes.get_workspace = original_get
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
 from fastapi.testclient import TestClient
 
 import web.routes.workspaces as workspaces_routes
+from engine.ids import content_digest
 from web.app import create_app
 from web.security import require_admin
 
@@ -11,7 +13,10 @@ from web.security import require_admin
 class DummyRecord:
     id: str
     system_id: str
-    data: dict
+    updated_at: datetime
+    export_sha256: str | None
+    data: dict | None
+    payload_bytes: int | None = None
 
 
 class DummySession:
@@ -36,11 +41,24 @@ def test_workspace_export_sets_download_header() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyUser()
 
-    async def fake_get_workspace(session, workspace_id: str):
-        return DummyRecord(id=workspace_id, system_id="system-1", data={"system_name": "Demo"})
+    document = b'{"workspace":{"system_name":"Demo"}}'
 
-    original_get_workspace = workspaces_routes.get_workspace
-    workspaces_routes.get_workspace = fake_get_workspace
+    async def fake_get_workspace_export(session, workspace_id: str, *, include_data=False):
+        return DummyRecord(
+            id=workspace_id,
+            system_id="system-1",
+            updated_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
+            export_sha256=content_digest(document),
+            data={"system_name": "Demo"} if include_data else None,
+        )
+
+    async def fake_read_workspace_export(session, workspace_id, export_sha256, offset=0):
+        return document[offset:]
+
+    original_get_workspace = workspaces_routes.get_workspace_export
+    original_read = workspaces_routes.read_workspace_export
+    workspaces_routes.get_workspace_export = fake_get_workspace_export
+    workspaces_routes.read_workspace_export = fake_read_workspace_export
 
     try:
         client = TestClient(app)
@@ -50,4 +68,5 @@ def test_workspace_export_sets_download_header() -> None:
         expected = "attachment; filename=\"workspace-system-1.json\""
         assert response.headers.get("content-disposition") == expected
     finally:
-        workspaces_routes.get_workspace = original_get_workspace
+        workspaces_routes.get_workspace_export = original_get_workspace
+        workspaces_routes.read_workspace_export = original_read
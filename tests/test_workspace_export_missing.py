@@ -27,11 +27,13 @@ def test_workspace_export_missing_returns_404() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_get_workspace(session, workspace_id: str):
+    async def fake_get_workspace_export(
+        session, workspace_id: str, *, include_export=False, include_data=False
+    ):
         return None
 
-    original_get = workspaces_routes.get_workspace
-    workspaces_routes.get_workspace = fake_get_workspace
+    original_get = workspaces_routes.get_workspace_export
+    workspaces_routes.get_workspace_export = fake_get_workspace_export
 
     try:
         client = TestClient(app)
@@ -39,4 +41,4 @@ def test_workspace_export_missing_returns_404() -> None:
 
         assert response.status_code == 404
     finally:
-        workspaces_routes.get_workspace = original_get
+        workspaces_routes.get_workspace_export = original_get
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import engine.workspaces as workspaces
+from engine.db import create_engine, create_sessionmaker
+from engine.export import export_document
+from engine.models import Base
+from engine.workspaces import WorkspaceConflict, workspace_values
+from web.settings import Settings
+
+DATA = {"system_name": "Payroll", "controls": [{"id": f"ac-{n}"} for n in range(50)]}
+
+
+def _run(database_url, scenario):
+    engine = create_engine(Settings(), database_url)
+
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            row = workspace_values(name="Payroll", system_id="sys-1", data=DATA)
+            async with sessionmaker() as session:
+                await workspaces.insert_workspaces(session, [row])
+            return await scenario(sessionmaker, row)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_stored_export_is_read_one_range_at_a_time(database_url, monkeypatch) -> None:
+    monkeypatch.setattr(workspaces, "EXPORT_READ_BYTES", 100)
+
+    async def scenario(sessionmaker, row):
+        async with sessionmaker() as session:
+            first = await workspaces.read_workspace_export(
+                session, row["id"], row["export_sha256"]
+            )
+            missing = await workspaces.read_workspace_export(session, row["id"], "0" * 64)
+        chunks = [
+            chunk
+            async for chunk in workspaces.iter_workspace_export(
+                sessionmaker, row["id"], row["export_sha256"], first
+            )
+        ]
+        return first, missing, chunks
+
+    first, missing, chunks = _run(database_url, scenario)
+
+    assert first == export_document(DATA)[:100]
+    assert missing is None
+    assert b"".join(chunks) == export_document(DATA)
+    assert max(len(chunk) for chunk in chunks) == 100
+
+
+def test_export_stream_stops_when_the_export_is_rewritten(database_url, monkeypatch) -> None:
+    monkeypatch.setattr(workspaces, "EXPORT_READ_BYTES", 100)
+
+    async def scenario(sessionmaker, row):
+        async with sessionmaker() as session:
+            first = await workspaces.read_workspace_export(
+                session, row["id"], row["export_sha256"]
+            )
+        stream = workspaces.iter_workspace_export(
+            sessionmaker, row["id"], row["export_sha256"], first
+        )
+        chunks = [await anext(stream)]
+        async with sessionmaker() as session:
+            await workspaces.rename_workspace(session, row["id"], "Renamed")
+            await workspaces.refresh_workspace_export(session, row["id"])
+        with pytest.raises(WorkspaceConflict):
+            async for chunk in stream:
+                chunks.append(chunk)
+        return chunks
+
+    assert _run(database_url, scenario) == [export_document(DATA)[:100]]
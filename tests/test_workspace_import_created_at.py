@@ -27,7 +27,7 @@ def test_import_rejects_invalid_created_at() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     async def fake_create_workspace_record(
@@ -0,0 +1,111 @@
+from fastapi.testclient import TestClient
+
+import web.routes.workspaces as workspaces_routes
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+    id = "user-1"
+
+
+def _csrf_for_import(client: TestClient) -> str:
+    response = client.get("/admin/workspaces")
+    assert response.status_code == 200
+    marker = 'name="csrf_token" value="'
+    start = response.text.find(marker)
+    assert start != -1
+    start += len(marker)
+    end = response.text.find('"', start)
+    return response.text[start:end]
+
+
+def test_import_rejects_oversized_upload() -> None:
+    app = create_app()
+    app.state.settings = Settings(workspace_import_max_bytes=1024, workspace_import_spool_bytes=16)
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    async def fake_list_workspaces(session, **kwargs):
+        return []
+
+    created = []
+
+    async def fake_create_workspace_record(session, **kwargs):
+        created.append(kwargs)
+
+    original_list = workspaces_routes.list_workspaces
+    original_create = workspaces_routes.create_workspace_record
+    workspaces_routes.list_workspaces = fake_list_workspaces
+    workspaces_routes.create_workspace_record = fake_create_workspace_record
+
+    try:
+        client = TestClient(app)
+        csrf_token = _csrf_for_import(client)
+        payload = b'{"system_name": "' + b"x" * 200_000 + b'"}'
+        response = client.post(
+            "/admin/workspaces/import",
+            data={"csrf_token": csrf_token},
+            files={"workspace_file": ("workspace.json", payload, "application/json")},
+        )
+
+        assert response.status_code == 413
+        assert created == []
+    finally:
+        workspaces_routes.list_workspaces = original_list
+        workspaces_routes.create_workspace_record = original_create
+
+
+def test_import_spools_and_accepts_upload_within_limit() -> None:
+    app = create_app()
+    app.state.settings = Settings(workspace_import_max_bytes=4096, workspace_import_spool_bytes=16)
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+
+    async def fake_list_workspaces(session, **kwargs):
+        return []
+
+    created = []
+
+    async def fake_create_workspace_record(session, **kwargs):
+        created.append(kwargs)
+
+    original_list = workspaces_routes.list_workspaces
+    original_create = workspaces_routes.create_workspace_record
+    workspaces_routes.list_workspaces = fake_list_workspaces
+    workspaces_routes.create_workspace_record = fake_create_workspace_record
+
+    try:
+        client = TestClient(app)
+        csrf_token = _csrf_for_import(client)
+        payload = (
+            b'{"system_name": "Demo", "system_id": "abc", '
+            b'"created_at": "1970-01-01T00:00:00+00:00", "notes": "' + b"n" * 1000 + b'"}'
+        )
+        response = client.post(
+            "/admin/workspaces/import",
+            data={"csrf_token": csrf_token},
+            files={"workspace_file": ("workspace.json", payload, "application/json")},
+            follow_redirects=False,
+        )
+
+        assert response.status_code == 303
+        assert created[0]["name"] == "Demo"
+    finally:
+        workspaces_routes.list_workspaces = original_list
+        workspaces_routes.create_workspace_record = original_create
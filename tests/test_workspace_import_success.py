@@ -1,8 +1,11 @@
+import pytest
 from fastapi.testclient import TestClient
 
 import web.routes.workspaces as workspaces_routes
+from engine.executor import SerializationExecutor
 from web.app import create_app
 from web.security import require_admin
+from web.settings import Settings
 
 
 class DummySession:
@@ -23,12 +26,17 @@ class DummyAdmin:
     id = "user-1"
 
 
-def test_import_accepts_valid_payload() -> None:
+@pytest.mark.parametrize("process_pool", [False, True])
+def test_import_accepts_valid_payload(process_pool: bool) -> None:
     app = create_app()
+    if process_pool:
+        # The upload spools to disk and is parsed in a worker process.
+        app.state.settings = Settings(workspace_import_spool_bytes=16)
+        app.state.executor = SerializationExecutor(inline_max_bytes=0, process_min_bytes=10)
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     captured = {}
@@ -38,7 +38,7 @@ def test_import_rejects_invalid_json() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyUser()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     original_list = workspaces_routes.list_workspaces
@@ -74,7 +74,7 @@ def test_import_rejects_missing_fields() -> None:
     ):
         return None
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     original_create = workspaces_routes.create_workspace_record
@@ -108,7 +108,7 @@ def test_import_rejects_blank_name() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyUser()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     async def fake_create_workspace_record(
@@ -151,7 +151,7 @@ def test_import_rejects_long_name() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyUser()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     async def fake_create_workspace_record(
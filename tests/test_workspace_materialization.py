@@ -0,0 +1,33 @@
+from engine.ids import content_digest, deterministic_id, verify_content_digest
+from engine.models import WorkspaceRecord
+from engine.workspaces import materialize_export, verify_workspace_export
+
+
+def test_materialized_export_matches_digest() -> None:
+    data = {"system_name": "Demo", "system_id": "abc"}
+    materialized = materialize_export(data)
+
+    document = materialized["export_bytes"]
+    assert document == b'{"workspace":{"system_id":"abc","system_name":"Demo"}}'
+    assert materialized["export_sha256"] == content_digest(document)
+    assert verify_content_digest(document, materialized["export_sha256"])
+    assert deterministic_id(document.decode("utf-8")) == materialized["export_sha256"][:32]
+
+    record = WorkspaceRecord(name="Demo", system_id="abc", data=data, **materialized)
+    assert verify_workspace_export(record)
+
+    record.data = {**data, "system_name": "Changed"}
+    assert not verify_workspace_export(record)
+
+
+def test_materialized_summary_counts_sections() -> None:
+    data = {
+        "system_name": "Demo",
+        "system_id": "abc",
+        "components": [{"title": "Web"}, {"title": "DB"}],
+        "metadata": {"version": "1"},
+    }
+    materialized = materialize_export(data)
+
+    assert materialized["payload_bytes"] == len(materialized["export_bytes"])
+    assert materialized["section_counts"] == {"components": 2, "metadata": 1}
@@ -28,7 +28,7 @@ def test_create_normalizes_whitespace() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     captured = {}
@@ -52,7 +52,7 @@ def test_create_rejects_blank_name() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     async def fake_create_workspace_record(
@@ -100,7 +100,7 @@ def test_rename_rejects_blank_name() -> None:
             created_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
         )
 
-    async def fake_rename_workspace(session, workspace_id: str, name: str):
+    async def fake_rename_workspace(session, workspace_id: str, name: str, expected_version=None):
         return True
 
     original_get = workspaces_routes.get_workspace
@@ -135,7 +135,7 @@ def test_create_rejects_long_name() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return []
 
     async def fake_create_workspace_record(
@@ -185,7 +185,7 @@ def test_rename_rejects_long_name() -> None:
             updated_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
         )
 
-    async def fake_rename_workspace(session, workspace_id: str, name: str):
+    async def fake_rename_workspace(session, workspace_id: str, name: str, expected_version=None):
         return True
 
     original_get = workspaces_routes.get_workspace
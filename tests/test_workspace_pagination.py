@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import web.routes.workspaces as workspaces_routes
+from engine.pagination import Cursor, InvalidCursor, clamp_page_size, keyset_page
+from web.app import create_app
+from web.security import require_admin
+
+
+@dataclass
+class DummyWorkspace:
+    id: str
+    name: str
+    system_id: str
+    owner_id: str | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def _workspaces(count: int) -> list[DummyWorkspace]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        DummyWorkspace(
+            id=f"ws-{index}",
+            name=f"Workspace {index}",
+            system_id=f"sys-{index}",
+            owner_id="user-1",
+            created_at=start,
+            updated_at=start - timedelta(minutes=index),
+        )
+        for index in range(count)
+    ]
+
+
+def test_cursor_round_trip() -> None:
+    cursor = Cursor(key=datetime(2026, 1, 1, tzinfo=timezone.utc), id="abc")
+
+    assert Cursor.decode(cursor.encode()) == cursor
+    with pytest.raises(InvalidCursor):
+        Cursor.decode("not-a-cursor")
+
+
+def test_keyset_page_uses_extra_row_as_more_marker() -> None:
+    rows = _workspaces(3)
+
+    def key(row):
+        return Cursor(row.updated_at, row.id)
+
+    page = keyset_page(rows, 2, key)
+    assert [row.id for row in page.items] == ["ws-0", "ws-1"]
+    assert Cursor.decode(page.next_cursor) == key(rows[1])
+    assert keyset_page(rows[:2], 2, key).next_cursor is None
+    assert clamp_page_size(None) == 50
+    assert clamp_page_size(10_000) == 200
+
+
+def test_workspaces_page_passes_cursor_and_owner() -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    calls = []
+    rows = _workspaces(3)
+
+    async def fake_list_workspaces(session, **kwargs):
+        calls.append(kwargs)
+        return rows[: kwargs["limit"]]
+
+    original_list = workspaces_routes.list_workspaces
+    workspaces_routes.list_workspaces = fake_list_workspaces
+
+    try:
+        client = TestClient(app)
+        response = client.get("/admin/workspaces?limit=2&owner_id=user-1")
+        assert response.status_code == 200
+        assert calls[-1] == {"owner_id": "user-1", "after": None, "limit": 3}
+        assert "Workspace 1" in response.text
+        assert "Workspace 2" not in response.text
+        assert "Next page" in response.text
+
+        next_cursor = Cursor(rows[1].updated_at, rows[1].id).encode()
+        response = client.get(f"/admin/workspaces?limit=2&owner_id=user-1&cursor={next_cursor}")
+        assert response.status_code == 200
+        assert calls[-1]["after"] == Cursor(rows[1].updated_at, rows[1].id)
+
+        response = client.get("/admin/workspaces?cursor=garbage")
+        assert response.status_code == 400
+    finally:
+        workspaces_routes.list_workspaces = original_list
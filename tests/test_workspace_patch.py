@@ -0,0 +1,364 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, type_coerce, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import undefer
+
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.db import create_engine, create_sessionmaker
+from engine.jobs import materialize_job
+from engine.merkle import hash_tree
+from engine.models import Base, WorkspaceRecord
+from engine.patch import (
+    JSON_PATCH,
+    MERGE_PATCH,
+    PatchError,
+    apply_json_patch,
+    apply_merge_patch,
+    changed_pointers,
+    parse_json_patch,
+    parse_merge_patch,
+    parse_pointer,
+    patch_steps,
+    patched_documents,
+)
+from engine.workspaces import WorkspaceConflict, WorkspacePatch, workspace_values
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+DATA = {
+    "system_name": "Payroll",
+    "system_id": "sys-1",
+    "created_at": CREATED.isoformat(),
+    "controls": [{"id": "ac-1"}, {"id": "ac-2"}],
+    "metadata": {"title": "Payroll SSP", "version": "1"},
+}
+
+
+@pytest.mark.parametrize(
+    ("target", "patch", "expected"),
+    [
+        ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+        ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+        ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+        ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+        ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+        ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+        ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}}),
+        ({"a": 1}, {"a": {}}, {"a": {}}),
+    ],
+)
+def test_merge_patch_follows_rfc_7396(target, patch, expected) -> None:
+    assert apply_merge_patch(target, patch) == expected
+
+
+def test_json_patch_operations() -> None:
+    operations = parse_json_patch(
+        [
+            {"op": "add", "path": "/controls/1", "value": {"id": "ac-1.1"}},
+            {"op": "add", "path": "/controls/-", "value": {"id": "ac-3"}},
+            {"op": "remove", "path": "/controls/0"},
+            {"op": "replace", "path": "/metadata/version", "value": "2"},
+            {"op": "copy", "from": "/metadata/title", "path": "/metadata/short"},
+            {"op": "move", "from": "/metadata/short", "path": "/short"},
+            {"op": "test", "path": "/controls/2/id", "value": "ac-3"},
+            {"op": "add", "path": "/a~1b", "value": True},
+        ]
+    )
+
+    result = apply_json_patch(DATA, operations)
+
+    assert result["controls"] == [{"id": "ac-1.1"}, {"id": "ac-2"}, {"id": "ac-3"}]
+    assert result["metadata"] == {"title": "Payroll SSP", "version": "2"}
+    assert result["short"] == "Payroll SSP"
+    assert result["a/b"] is True
+    assert DATA["controls"] == [{"id": "ac-1"}, {"id": "ac-2"}]
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        [{"op": "remove", "path": "/missing"}],
+        [{"op": "replace", "path": "/controls/5", "value": 1}],
+        [{"op": "add", "path": "/controls/3", "value": 1}],
+        [{"op": "add", "path": "/nope/child", "value": 1}],
+        [{"op": "remove", "path": "/controls/01"}],
+        [{"op": "test", "path": "/controls/0/id", "value": "ac-2"}],
+        [{"op": "test", "path": "/flag", "value": 1}],
+    ],
+)
+def test_json_patch_errors(patch) -> None:
+    with pytest.raises(PatchError):
+        apply_json_patch({**DATA, "flag": True}, parse_json_patch(patch))
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        {"op": "replace", "path": "/system_name", "value": "x"},
+        {"op": "remove", "path": "/system_id"},
+        {"op": "add", "path": "", "value": {}},
+        {"op": "move", "from": "/created_at", "path": "/when"},
+        {"op": "move", "from": "/metadata", "path": "/metadata/inner"},
+        {"op": "frobnicate", "path": "/a"},
+        {"op": "add", "path": "/a"},
+        {"op": "add", "path": "a", "value": 1},
+    ],
+)
+def test_json_patch_rejects_invalid_operations(patch) -> None:
+    with pytest.raises(PatchError):
+        parse_json_patch([patch])
+
+
+def test_merge_patch_rejects_protected_fields() -> None:
+    with pytest.raises(PatchError):
+        parse_merge_patch({"system_name": "Renamed"})
+    with pytest.raises(PatchError):
+        parse_merge_patch(["not", "an", "object"])
+
+
+def test_changed_pointers_drop_nested_paths() -> None:
+    merge = {"metadata": {"title": "T", "tags": {}}, "notes": None}
+    operations = parse_json_patch(
+        [
+            {"op": "replace", "path": "/metadata", "value": {}},
+            {"op": "replace", "path": "/metadata/title", "value": "T"},
+            {"op": "move", "from": "/a", "path": "/b"},
+            {"op": "test", "path": "/c", "value": 1},
+        ]
+    )
+
+    assert changed_pointers(MERGE_PATCH, merge) == [
+        ("metadata", "tags"),
+        ("metadata", "title"),
+        ("notes",),
+    ]
+    assert changed_pointers(JSON_PATCH, operations) == [("a",), ("b",), ("metadata",)]
+    assert parse_pointer("/a~01/b~1c") == ("a~1", "b/c")
+
+
+def test_postgresql_patch_is_one_update_over_staged_subqueries() -> None:
+    operations = parse_json_patch(
+        [
+            {"op": "add", "path": "/controls/-", "value": {"id": "ac-3"}},
+            {"op": "remove", "path": "/metadata/version"},
+        ]
+    )
+    steps = patch_steps(JSON_PATCH, operations)
+    assert steps is not None
+    patched = patched_documents(
+        select(
+            WorkspaceRecord.id,
+            type_coerce(WorkspaceRecord.data, JSONB).label("document"),
+        ).where(WorkspaceRecord.id == "w1"),
+        steps,
+    )
+    sql = str(
+        update(WorkspaceRecord)
+        .where(WorkspaceRecord.id == patched.c.id, patched.c.applies)
+        .values(
+            data=patched.c.document,
+            **workspaces.patched_summary_values(patched.c.document),
+        )
+        .compile(dialect=postgresql.dialect())
+    )
+
+    assert "jsonb_insert(" in sql
+    assert "#-" in sql
+    assert sql.count("OFFSET") == 2
+    assert "FROM workspaces" in sql
+    assert "jsonb_object_agg(" in sql and "jsonb_array_length(" in sql
+    assert "payload_bytes=((workspaces.payload_bytes + octet_length(" in sql
+    assert patch_steps(JSON_PATCH, parse_json_patch([{"op": "remove", "path": "/a/-1"}])) is None
+    assert len(patch_steps(MERGE_PATCH, {"a": {"b": 1}, "c": None}) or []) == 3
+
+
+def _run(database_url, scenario):
+    engine = create_engine(Settings(), database_url)
+
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            async with sessionmaker() as session:
+                row = workspace_values(
+                    name="Payroll", system_id="sys-1", data=DATA, created_at=CREATED
+                )
+                await workspaces.insert_workspaces(session, [row])
+            return await scenario(sessionmaker, row["id"])
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+async def _report(progress: int, total: int | None = None, *, force: bool = False) -> None:
+    return None
+
+
+def test_patch_workspace_returns_changed_paths(database_url) -> None:
+    async def scenario(sessionmaker, workspace_id):
+        async with sessionmaker() as session:
+            merged = await workspaces.patch_workspace(
+                session,
+                workspace_id,
+                MERGE_PATCH,
+                parse_merge_patch({"metadata": {"version": None, "title": "New"}}),
+                expected_version=1,
+            )
+        async with sessionmaker() as session:
+            patched = await workspaces.patch_workspace(
+                session,
+                workspace_id,
+                JSON_PATCH,
+                parse_json_patch([{"op": "add", "path": "/controls/-", "value": {"id": "ac-3"}}]),
+            )
+        async with sessionmaker() as session:
+            with pytest.raises(WorkspaceConflict):
+                await workspaces.patch_workspace(
+                    session, workspace_id, MERGE_PATCH, {"x": 1}, expected_version=1
+                )
+        async with sessionmaker() as session:
+            with pytest.raises(PatchError):
+                await workspaces.patch_workspace(
+                    session,
+                    workspace_id,
+                    JSON_PATCH,
+                    parse_json_patch([{"op": "remove", "path": "/missing"}]),
+                )
+        async with sessionmaker() as session:
+            missing = await workspaces.patch_workspace(session, "missing", MERGE_PATCH, {"x": 1})
+        async with sessionmaker() as session:
+            stale = await workspaces.stale_workspaces(session, [workspace_id])
+            dialect = session.get_bind().dialect.name
+        # What the route queues through JobRunner.materialize.
+        context = SimpleNamespace(sessionmaker=sessionmaker, executor=None, report=_report)
+        await materialize_job([workspace_id])(context)
+        async with sessionmaker() as session:
+            record = await session.get(
+                WorkspaceRecord,
+                workspace_id,
+                options=[undefer(WorkspaceRecord.export_bytes), undefer(WorkspaceRecord.data_tree)],
+            )
+            exported = workspaces.verify_workspace_export(record)
+            [summary] = await workspaces.list_workspaces(session)
+        return merged, patched, missing, stale, dialect, record, exported, summary
+
+    merged, patched, missing, stale, dialect, record, exported, summary = _run(
+        database_url, scenario
+    )
+
+    assert merged.version == 2
+    assert merged.changed == {"/metadata/title": "New"}
+    assert merged.removed == ["/metadata/version"]
+    assert patched.version == 3
+    assert patched.changed == {"/controls/-": {"id": "ac-3"}}
+    assert missing is None
+    assert record.version == 3
+    assert record.data["metadata"] == {"title": "New"}
+    assert record.data["controls"][-1] == {"id": "ac-3"}
+    # PostgreSQL patches in SQL and leaves the export to the materialize job.
+    assert stale == ([record.id] if dialect == "postgresql" else [])
+    assert exported
+    assert (record.data_digest, record.data_tree) == hash_tree(record.data)
+    assert summary.section_counts == {"controls": 3, "metadata": 1}
+    assert summary.payload_bytes == len(record.export_bytes)
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    monkeypatch.setattr(workspaces_routes, "verify_csrf", lambda request, token: None)
+    return TestClient(app)
+
+
+def test_patch_route_responds_with_changes(client, monkeypatch) -> None:
+    calls = []
+
+    async def fake_patch_workspace(session, workspace_id, kind, patch, expected_version=None):
+        calls.append((workspace_id, kind, patch, expected_version))
+        return WorkspacePatch(
+            id=workspace_id,
+            version=4,
+            updated_at=CREATED,
+            changed={"/metadata/title": "New"},
+            removed=[],
+        )
+
+    monkeypatch.setattr(workspaces_routes, "patch_workspace", fake_patch_workspace)
+    queued: list[list[str]] = []
+    monkeypatch.setattr(client.app.state.job_runner, "materialize", queued.append)
+
+    response = client.patch(
+        "/admin/workspaces/w1?version=3",
+        content=b'{"metadata": {"title": "New"}}',
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": "w1",
+        "version": 4,
+        "updated_at": CREATED.isoformat(),
+        "changed": {"/metadata/title": "New"},
+        "removed": [],
+    }
+    assert calls == [("w1", MERGE_PATCH, {"metadata": {"title": "New"}}, 3)]
+    assert queued == [["w1"]]
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body", "error", "status"),
+    [
+        ("application/json", b"{}", None, 415),
+        ("application/merge-patch+json", b"{", None, 400),
+        ("application/json-patch+json", b'{"op": "add"}', None, 400),
+        ("application/json-patch+json", b"[]", PatchError("Path not found: /a"), 422),
+        ("application/merge-patch+json", b"{}", WorkspaceConflict(["w1"]), 409),
+        ("application/merge-patch+json", b"{}", None, 404),
+    ],
+)
+def test_patch_route_errors(client, monkeypatch, content_type, body, error, status) -> None:
+    async def fake_patch_workspace(session, workspace_id, kind, patch, expected_version=None):
+        if error is not None:
+            raise error
+        return None
+
+    monkeypatch.setattr(workspaces_routes, "patch_workspace", fake_patch_workspace)
+
+    response = client.patch(
+        "/admin/workspaces/w1",
+        content=body,
+        headers={"Content-Type": content_type},
+    )
+
+    assert response.status_code == status
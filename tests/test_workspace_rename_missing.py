@@ -52,7 +52,7 @@ def test_workspace_rename_missing_returns_404() -> None:
             updated_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
         )
 
-    async def fake_rename_workspace(session, workspace_id: str, name: str):
+    async def fake_rename_workspace(session, workspace_id: str, name: str, expected_version=None):
         return False
 
     original_get = workspaces_routes.get_workspace
@@ -1,36 +1,157 @@
 import asyncio
-from dataclasses import dataclass
 from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import undefer
 
 import engine.workspaces as workspaces
+from engine.db import create_engine, create_sessionmaker
+from engine.export import export_document
+from engine.ids import content_digest
+from engine.jobs import materialize_job
+from engine.merkle import hash_tree
+from engine.models import Base, WorkspaceRecord
+from engine.workspaces import rename_workspaces_statement, workspace_values
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _workspace(name: str) -> dict:
+    return workspace_values(
+        name=name,
+        system_id=f"id-{name}",
+        data={"system_name": name, "system_id": f"id-{name}", "controls": [1, 2]},
+        created_at=CREATED,
+    )
 
 
-@dataclass
-class DummyRecord:
-    name: str
-    data: dict
-    updated_at: datetime
+def _run(database_url, scenario):
+    engine = create_engine(Settings(), database_url)
 
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            return await scenario(create_sessionmaker(engine))
+        finally:
+            await engine.dispose()
 
-class DummySession:
-    async def commit(self):
-        return None
+    return asyncio.run(run())
 
 
-def test_rename_updates_payload_system_name(monkeypatch) -> None:
-    record = DummyRecord(
-        name="Old",
-        data={"system_name": "Old", "system_id": "abc"},
-        updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+async def _materialized(session, workspace_id: str) -> WorkspaceRecord:
+    return await session.get(
+        WorkspaceRecord,
+        workspace_id,
+        options=[undefer(WorkspaceRecord.export_bytes), undefer(WorkspaceRecord.data_tree)],
+        populate_existing=True,
     )
 
-    async def fake_get_workspace(session, workspace_id: str):
-        return record
 
-    monkeypatch.setattr(workspaces, "get_workspace", fake_get_workspace)
+def _assert_materialized(record: WorkspaceRecord) -> None:
+    document = export_document(record.data)
+    assert record.export_bytes == document
+    assert record.export_sha256 == content_digest(document)
+    assert record.payload_bytes == len(document)
+    assert (record.data_digest, record.data_tree) == hash_tree(record.data)
+
+
+def test_rename_updates_payload_system_name(database_url) -> None:
+    async def scenario(sessionmaker):
+        async with sessionmaker() as session:
+            await workspaces.insert_workspaces(session, [_workspace("Old")])
+            workspace_id = (await workspaces.list_workspaces(session))[0].id
+        async with sessionmaker() as session:
+            renamed = await workspaces.rename_workspace(session, workspace_id, 'New "B"')
+            missing = await workspaces.rename_workspace(session, "missing", "New")
+        async with sessionmaker() as session:
+            record = await _materialized(session, workspace_id)
+            stale = await workspaces.stale_workspaces(session, [workspace_id])
+            dialect = session.get_bind().dialect.name
+        return record, renamed, missing, stale, dialect
+
+    record, renamed, missing, stale, dialect = _run(database_url, scenario)
+
+    assert renamed is True
+    assert missing is False
+    assert record.name == 'New "B"'
+    assert record.data == {"system_name": 'New "B"', "system_id": "id-Old", "controls": [1, 2]}
+    assert record.updated_at.replace(tzinfo=None) > CREATED.replace(tzinfo=None)
+    assert record.section_counts == {"controls": 2}
+    assert record.payload_bytes == len(export_document(record.data))
+    if dialect == "postgresql":
+        # The rename spliced the export and rehashed the tree in SQL.
+        assert stale == []
+        _assert_materialized(record)
+    else:
+        assert stale == [record.id]
+        assert record.export_sha256 is None and record.data_digest is None
+
+
+def test_materialize_job_finishes_renames_sql_could_not(database_url) -> None:
+    async def scenario(sessionmaker):
+        row = _workspace("Café")
+        async with sessionmaker() as session:
+            await workspaces.insert_workspaces(session, [row])
+            await workspaces.rename_workspace(session, row["id"], "Plain")
+            stale = await workspaces.stale_workspaces(session, [row["id"], "missing"])
+            listed = (await workspaces.list_workspaces(session))[0].payload_bytes
+        context = SimpleNamespace(sessionmaker=sessionmaker, executor=None, report=_report)
+        result = await materialize_job([row["id"], "missing"])(context)
+        async with sessionmaker() as session:
+            record = await _materialized(session, row["id"])
+        return stale, listed, result, record
+
+    stale, listed, result, record = _run(database_url, scenario)
+
+    # PostgreSQL encodes "é" as UTF-8 where the export escapes it, so the old
+    # entry is not found and the export is left to the job.
+    assert len(stale) == 1
+    assert listed is not None
+    assert result == {"requested": 2, "materialized": 1}
+    _assert_materialized(record)
+
+
+async def _report(progress: int, total: int | None = None, *, force: bool = False) -> None:
+    return None
+
+
+def test_bulk_rename_and_delete_return_existing_ids(database_url) -> None:
+    async def scenario(sessionmaker):
+        async with sessionmaker() as session:
+            await workspaces.insert_workspaces(session, [_workspace(n) for n in ("a", "b", "c")])
+            ids = {row.name: row.id for row in await workspaces.list_workspaces(session)}
+        async with sessionmaker() as session:
+            renamed = await workspaces.rename_workspaces(
+                session,
+                {ids["a"]: "Same", ids["b"]: "Same", "missing": "Other"},
+            )
+        async with sessionmaker() as session:
+            deleted = await workspaces.delete_workspaces(session, [ids["a"], ids["c"], "missing"])
+            remaining = await workspaces.list_workspaces(session)
+        return ids, renamed, deleted, remaining
+
+    ids, renamed, deleted, remaining = _run(database_url, scenario)
+
+    assert sorted(renamed) == sorted([ids["a"], ids["b"]])
+    assert sorted(deleted) == sorted([ids["a"], ids["c"]])
+    assert [(row.id, row.name) for row in remaining] == [(ids["b"], "Same")]
+
+
+def test_postgres_rename_sets_system_name_server_side() -> None:
+    statement = rename_workspaces_statement("postgresql", ["w1", "w2"], "New")
+    assert statement is not None
 
-    session = DummySession()
-    asyncio.run(workspaces.rename_workspace(session, "workspace-1", "New"))
+    sql = str(statement.compile(dialect=postgresql.dialect()))
 
-    assert record.name == "New"
-    assert record.data["system_name"] == "New"
+    assert "jsonb_set(workspaces.data, ARRAY['system_name']" in sql
+    assert "to_jsonb" in sql
+    assert "export_bytes=renamed.export_bytes" in sql
+    assert "pg_catalog.position(workspaces.export_bytes, convert_to(" in sql
+    assert "FOR UPDATE) AS located" in sql
+    assert "ORDER BY anon_2.key COLLATE \"C\"" in sql
+    assert "RETURNING workspaces.id" in sql
+    assert rename_workspaces_statement("mssql", ["w1"], "New") is None
@@ -0,0 +1,183 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import engine.revisions as revisions
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.db import create_engine, create_sessionmaker
+from engine.models import Base, WorkspaceRecord, WorkspaceRevision
+from engine.patch import JSON_PATCH, MERGE_PATCH, parse_json_patch
+from engine.revisions import RevisionChain, RevisionSummary, encode_delta
+from engine.workspaces import workspace_values
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+DATA = {
+    "system_name": "Payroll",
+    "system_id": "sys-1",
+    "created_at": CREATED.isoformat(),
+    "controls": [],
+}
+
+
+def _run(tmp_path, scenario):
+    pytest.importorskip("aiosqlite")
+    engine = create_engine(Settings(), f"sqlite+aiosqlite:///{tmp_path / 'workspaces.db'}")
+
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            async with sessionmaker() as session:
+                row = workspace_values(
+                    name="Payroll", system_id="sys-1", data=DATA, created_at=CREATED
+                )
+                await workspaces.insert_workspaces(session, [row])
+            return await scenario(sessionmaker, row["id"])
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_every_version_can_be_rebuilt(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(revisions, "SNAPSHOT_INTERVAL", 3)
+
+    async def scenario(sessionmaker, workspace_id):
+        async def current():
+            async with sessionmaker() as session:
+                return (await session.get(WorkspaceRecord, workspace_id)).data
+
+        history = {1: await current()}
+        for number in range(2, 9):
+            async with sessionmaker() as session:
+                if number % 4 == 0:
+                    await workspaces.rename_workspace(session, workspace_id, f"Payroll {number}")
+                elif number % 2:
+                    operations = parse_json_patch(
+                        [{"op": "add", "path": "/controls/-", "value": {"id": f"ac-{number}"}}]
+                    )
+                    await workspaces.patch_workspace(session, workspace_id, JSON_PATCH, operations)
+                else:
+                    await workspaces.patch_workspace(
+                        session, workspace_id, MERGE_PATCH, {"notes": f"edit {number}"}
+                    )
+            history[number] = await current()
+
+        async with sessionmaker() as session:
+            rebuilt = {
+                version: await revisions.get_revision_data(session, workspace_id, version)
+                for version in range(1, 10)
+            }
+            chain = await revisions.load_revision_chain(session, workspace_id, 6)
+            listed = await revisions.list_revisions(session, workspace_id, before=8, limit=3)
+            result = await session.execute(
+                select(WorkspaceRevision.version, WorkspaceRevision.kind)
+            )
+            kinds = {row.version: row.kind for row in result}
+        return history, rebuilt, chain, listed, kinds
+
+    history, rebuilt, chain, listed, kinds = _run(tmp_path, scenario)
+
+    assert {version: rebuilt[version] for version in history} == history
+    assert rebuilt[9] is None
+    assert history[8]["system_name"] == "Payroll 8"
+    assert [kinds[version] for version in (1, 4, 7)] == ["snapshot"] * 3
+    assert kinds[2] == "merge-patch"
+    assert kinds[3] == "json-patch"
+    assert chain.snapshot == history[4]
+    assert len(chain.deltas) == 2
+    assert [revision.version for revision in listed] == [7, 6, 5]
+    assert listed[0].delta_bytes is None
+    assert listed[1].delta_bytes > 0
+
+
+def test_deleting_a_workspace_drops_its_history(tmp_path) -> None:
+    async def scenario(sessionmaker, workspace_id):
+        async with sessionmaker() as session:
+            await workspaces.rename_workspace(session, workspace_id, "Renamed")
+            before = await revisions.list_revisions(session, workspace_id)
+            await workspaces.delete_workspace(session, workspace_id)
+            after = await revisions.list_revisions(session, workspace_id)
+        return before, after
+
+    before, after = _run(tmp_path, scenario)
+
+    assert [revision.version for revision in before] == [2, 1]
+    assert after == []
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    return TestClient(app)
+
+
+def test_revision_routes(client, monkeypatch) -> None:
+    async def fake_list_revisions(session, workspace_id, *, before=None, limit=50):
+        if workspace_id == "missing":
+            return []
+        return [RevisionSummary(version=2, kind="merge-patch", delta_bytes=30, created_at=CREATED)]
+
+    async def fake_load_revision_chain(session, workspace_id, version):
+        if version != 2:
+            return None
+        return RevisionChain(
+            version=2,
+            snapshot=DATA,
+            deltas=[("merge-patch", encode_delta({"system_name": "Renamed"}))],
+        )
+
+    monkeypatch.setattr(workspaces_routes, "list_revisions", fake_list_revisions)
+    monkeypatch.setattr(workspaces_routes, "load_revision_chain", fake_load_revision_chain)
+
+    listed = client.get("/admin/workspaces/w1/revisions?limit=1")
+    missing = client.get("/admin/workspaces/missing/revisions")
+    revision = client.get("/admin/workspaces/w1/revisions/2")
+    unknown = client.get("/admin/workspaces/w1/revisions/3")
+    export = client.get("/admin/workspaces/w1/revisions/2/export")
+
+    assert listed.json() == {
+        "items": [
+            {
+                "version": 2,
+                "kind": "merge-patch",
+                "delta_bytes": 30,
+                "created_at": CREATED.isoformat(),
+            }
+        ],
+        "next_before": 2,
+    }
+    assert missing.status_code == 404
+    assert revision.json()["data"] == {**DATA, "system_name": "Renamed"}
+    assert unknown.status_code == 404
+    assert export.headers["content-disposition"] == (
+        'attachment; filename="workspace-sys-1-v2.json"'
+    )
+    assert export.json() == {"workspace": {**DATA, "system_name": "Renamed"}}
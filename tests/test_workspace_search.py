@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.db import create_engine, create_sessionmaker
+from engine.models import Base
+from engine.pagination import Cursor
+from engine.patch import MERGE_PATCH
+from engine.workspaces import (
+    control_document,
+    json_contains,
+    search_workspaces_statement,
+    workspace_values,
+)
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def _ssp(index: int, controls: list[str]) -> dict:
+    values = workspace_values(
+        name=f"SSP {index}",
+        system_id=f"ssp-{index}",
+        data={
+            "system_name": f"SSP {index}",
+            "system_id": f"ssp-{index}",
+            "control-implementation": {
+                "implemented-requirements": [
+                    {"control-id": control, "uuid": f"{index}-{control}"} for control in controls
+                ]
+            },
+        },
+        created_at=CREATED,
+    )
+    values["updated_at"] = CREATED + timedelta(minutes=index)
+    return values
+
+
+def test_json_contains_matches_postgres_semantics() -> None:
+    document = {"a": [{"id": "x", "n": 1}, {"id": "y"}], "b": {"c": True}}
+
+    assert json_contains(document, {"a": [{"id": "y"}, {"id": "x"}]})
+    assert json_contains(document, {"b": {}})
+    assert not json_contains(document, {"a": [{"id": "z"}]})
+    assert not json_contains(document, {"b": {"c": 1}})
+    assert not json_contains(document, {"a": {"id": "x"}})
+
+
+def test_search_pages_through_matches(database_url) -> None:
+    engine = create_engine(Settings(), database_url)
+
+    async def scenario():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            async with create_sessionmaker(engine)() as session:
+                await workspaces.insert_workspaces(
+                    session,
+                    [_ssp(i, ["ac-2", "au-6"] if i % 2 else ["ac-1"]) for i in range(7)],
+                )
+                pattern = control_document("ac-2")
+                first = await workspaces.search_workspaces(
+                    session, pattern, limit=2, scan_batch_size=3
+                )
+                last = first[-1]
+                rest = await workspaces.search_workspaces(
+                    session,
+                    pattern,
+                    after=Cursor(key=last.updated_at, id=last.id),
+                    limit=5,
+                    scan_batch_size=3,
+                )
+            return first, rest
+        finally:
+            await engine.dispose()
+
+    first, rest = asyncio.run(scenario())
+
+    assert [row.name for row in first] == ["SSP 5", "SSP 3"]
+    assert [row.name for row in rest] == ["SSP 1"]
+
+
+def test_search_finds_clones_through_their_bodies(database_url) -> None:
+    engine = create_engine(Settings(), database_url)
+
+    async def scenario():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+                await connection.run_sync(Base.metadata.create_all)
+            async with create_sessionmaker(engine)() as session:
+                rows = [_ssp(0, ["ac-1"]), _ssp(1, ["ac-2"])]
+                await workspaces.insert_workspaces(session, rows)
+                ids = {}
+                for name, source in [("Copy A", 1), ("Copy B", 0), ("Copy C", 1)]:
+                    ids[name] = await workspaces.clone_workspace(
+                        session, rows[source]["id"], name=name, system_id=name
+                    )
+                # Copy B now matches through its own sections, Copy C no longer
+                # matches although its body does.
+                for name, control in [("Copy B", "ac-2"), ("Copy C", "ac-1")]:
+                    await workspaces.patch_workspace(
+                        session, ids[name], MERGE_PATCH, control_document(control)
+                    )
+                by_control = await workspaces.search_workspaces(
+                    session, control_document("ac-2")
+                )
+                across_sections = await workspaces.search_workspaces(
+                    session, {"system_name": "Copy A", **control_document("ac-2")}
+                )
+            return by_control, across_sections
+        finally:
+            await engine.dispose()
+
+    by_control, across_sections = asyncio.run(scenario())
+
+    assert [row.name for row in by_control] == ["Copy B", "Copy A", "SSP 1"]
+    assert [row.name for row in across_sections] == ["Copy A"]
+
+
+def test_postgres_search_uses_jsonb_containment() -> None:
+    statement = search_workspaces_statement(control_document("ac-2"), limit=51)
+
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "workspaces.data @> " in sql
+    # Clones are found through the index on their bodies, in their own arm.
+    assert " UNION SELECT workspaces.id" in sql
+    assert "WHERE workspace_bodies.data @> " in sql
+    assert "(workspace_bodies.data || workspaces.data) @> " in sql
+    assert "ORDER BY workspaces.updated_at DESC, workspaces.id DESC" in sql
+    assert "workspaces.data," not in sql.split("FROM")[0]
+
+
+def test_search_endpoint(monkeypatch) -> None:
+    app = create_app()
+    app.state.sessionmaker = lambda: DummySession()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    patterns = []
+
+    async def fake_search_workspaces(session, pattern, *, after, limit):
+        patterns.append(pattern)
+        return [
+            workspaces.WorkspaceSummary(
+                id=f"w{i}",
+                name=f"SSP {i}",
+                system_id=f"ssp-{i}",
+                owner_id=None,
+                created_at=CREATED,
+                updated_at=CREATED,
+                payload_bytes=10,
+                section_counts={},
+            )
+            for i in range(limit)
+        ]
+
+    monkeypatch.setattr(workspaces_routes, "search_workspaces", fake_search_workspaces)
+    client = TestClient(app)
+
+    by_control = client.get("/admin/workspaces/search", params={"control": "ac-2", "limit": 2})
+    by_pattern = client.get("/admin/workspaces/search", params={"contains": '{"system_id": "x"}'})
+
+    assert by_control.status_code == 200
+    body = by_control.json()
+    assert [item["id"] for item in body["items"]] == ["w0", "w1"]
+    assert body["next_cursor"] is not None
+    assert patterns == [control_document("ac-2"), {"system_id": "x"}]
+    assert by_pattern.status_code == 200
+    assert client.get("/admin/workspaces/search").status_code == 400
+    assert client.get("/admin/workspaces/search", params={"contains": "[1]"}).status_code == 400
+    assert client.get("/admin/workspaces/search", params={"contains": "{"}).status_code == 400
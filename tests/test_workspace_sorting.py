@@ -40,7 +40,7 @@ def test_workspaces_page_ordering() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return [
             DummyWorkspace(
                 id="new",
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects.postgresql import asyncpg
+
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.cache import TTLCache
+from engine.db import create_engine, create_sessionmaker
+from engine.models import Base
+from engine.search import (
+    WorkspaceMatch,
+    WorkspaceNameIndex,
+    fuzzy_statement,
+    prefix_statement,
+    trigrams,
+    typeahead_workspaces,
+    word_similarity,
+)
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+NAMES = [
+    ("w1", "Payroll Platform", "a1b2"),
+    ("w2", "Payments Gateway", "c3d4"),
+    ("w3", "Human Resources Portal", "e5f6"),
+    ("w4", "Paymnet Sandbox", "paym-77"),
+    ("w5", "Billing", "0099"),
+]
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def _index() -> WorkspaceNameIndex:
+    return WorkspaceNameIndex(WorkspaceMatch(*entry) for entry in NAMES)
+
+
+def test_trigrams_match_pg_trgm() -> None:
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert word_similarity(trigrams("word"), trigrams("two words")) == pytest.approx(0.8)
+
+
+def test_index_ranks_prefix_matches_before_fuzzy_ones() -> None:
+    index = _index()
+
+    assert [m.id for m in index.search("pay")] == ["w2", "w4", "w1"]
+    assert [m.id for m in index.search("pay", limit=2)] == ["w2", "w4"]
+    assert [m.id for m in index.search("way")] == ["w2"]
+    assert [m.id for m in index.search("gatway")] == ["w2"]
+    assert [m.id for m in index.search("paymnt")] == ["w4"]
+    assert [m.id for m in index.search("  resources   PORT")] == ["w3"]
+    assert [m.id for m in index.search("c3")] == ["w2"]
+    assert [m.id for m in index.search("ay")] == []
+    assert [m.id for m in index.search("paym")] == ["w2", "w4", "w1"]
+
+
+def test_fallback_index_is_cached(tmp_path) -> None:
+    pytest.importorskip("aiosqlite")
+    engine = create_engine(Settings(), f"sqlite+aiosqlite:///{tmp_path / 'names.db'}")
+    cache = TTLCache[WorkspaceNameIndex](1, 60)
+
+    async def scenario():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            async with sessionmaker() as session:
+                await workspaces.insert_workspaces(
+                    session,
+                    [
+                        workspaces.workspace_values(
+                            name=name,
+                            system_id=system_id,
+                            data={"system_name": name, "system_id": system_id},
+                            created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                        )
+                        for _, name, system_id in NAMES
+                    ],
+                )
+                first = await typeahead_workspaces(session, "gateway", fallback_cache=cache)
+                await workspaces.delete_workspaces(session, [first[0].id])
+                cached = await typeahead_workspaces(session, "gateway", fallback_cache=cache)
+                cache.clear()
+                fresh = await typeahead_workspaces(session, "gateway", fallback_cache=cache)
+            return first, cached, fresh
+        finally:
+            await engine.dispose()
+
+    first, cached, fresh = asyncio.run(scenario())
+
+    assert [m.name for m in first] == ["Payments Gateway"]
+    assert cached == first
+    assert fresh == []
+
+
+def test_postgres_statements_use_indexable_predicates() -> None:
+    dialect = asyncpg.dialect()
+    prefix = str(prefix_statement("Pay_", 10).compile(dialect=dialect))
+    fuzzy = str(fuzzy_statement("Pay_", 10).compile(dialect=dialect))
+
+    assert '(lower(workspaces.name) COLLATE "C") LIKE ' in prefix
+    assert '(lower(workspaces.system_id) COLLATE "C") LIKE ' in prefix
+    assert 'ORDER BY lower(workspaces.name) COLLATE "C", workspaces.id' in prefix
+    assert "UNION ALL" in prefix
+    assert "<% lower(workspaces.name)" in fuzzy
+    assert "ORDER BY word_similarity(" in fuzzy
+
+
+def test_typeahead_endpoint(monkeypatch) -> None:
+    app = create_app()
+    app.state.sessionmaker = lambda: DummySession()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    calls = []
+
+    async def fake_typeahead(session, query, *, limit, fallback_cache):
+        calls.append((query, limit, fallback_cache))
+        return _index().search(query, limit)
+
+    monkeypatch.setattr(workspaces_routes, "typeahead_workspaces", fake_typeahead)
+    client = TestClient(app)
+
+    response = client.get("/admin/workspaces/typeahead", params={"q": "pay", "limit": 2})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "query": "pay",
+        "matches": [
+            {"id": "w2", "name": "Payments Gateway", "system_id": "c3d4"},
+            {"id": "w4", "name": "Paymnet Sandbox", "system_id": "paym-77"},
+        ],
+    }
+    assert calls[0][2] is app.state.workspace_name_index
+    assert client.get("/admin/workspaces/typeahead", params={"limit": 500}).status_code == 422
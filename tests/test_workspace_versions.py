@@ -0,0 +1,224 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+import engine.workspaces as workspaces
+import web.routes.workspaces as workspaces_routes
+from engine.db import create_engine, create_sessionmaker
+from engine.models import Base, WorkspaceRecord
+from engine.workspaces import WorkspaceConflict, workspace_values
+from web.app import create_app
+from web.security import require_admin
+from web.settings import Settings
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _workspace(name: str) -> dict:
+    return workspace_values(
+        name=name,
+        system_id=f"id-{name}",
+        data={"system_name": name, "system_id": f"id-{name}"},
+        created_at=CREATED,
+    )
+
+
+def _run(tmp_path, scenario):
+    pytest.importorskip("aiosqlite")
+    engine = create_engine(Settings(), f"sqlite+aiosqlite:///{tmp_path / 'workspaces.db'}")
+
+    async def run():
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            sessionmaker = create_sessionmaker(engine)
+            async with sessionmaker() as session:
+                await workspaces.insert_workspaces(session, [_workspace("A"), _workspace("B")])
+                summaries = await workspaces.list_workspaces(session)
+            ids = {summary.name: summary.id for summary in summaries}
+            return await scenario(sessionmaker, ids)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+async def _state(sessionmaker, workspace_id):
+    async with sessionmaker() as session:
+        record = await session.get(WorkspaceRecord, workspace_id)
+        return None if record is None else (record.name, record.version)
+
+
+@pytest.mark.parametrize("fallback", [False, True])
+def test_rename_compares_and_swaps_version(tmp_path, monkeypatch, fallback) -> None:
+    if fallback:
+        monkeypatch.setattr(workspaces, "system_name_expression", lambda dialect, name: None)
+
+    async def scenario(sessionmaker, ids):
+        async with sessionmaker() as session:
+            first = await workspaces.rename_workspace(session, ids["A"], "A1", expected_version=1)
+        async with sessionmaker() as session:
+            with pytest.raises(WorkspaceConflict) as conflict:
+                await workspaces.rename_workspace(session, ids["A"], "A2", expected_version=1)
+        async with sessionmaker() as session:
+            unchecked = await workspaces.rename_workspace(session, ids["A"], "A3")
+        async with sessionmaker() as session:
+            missing = await workspaces.rename_workspace(
+                session, "missing", "X", expected_version=1
+            )
+        state = await _state(sessionmaker, ids["A"])
+        return ids, first, conflict.value, unchecked, missing, state
+
+    ids, first, conflict, unchecked, missing, state = _run(tmp_path, scenario)
+
+    assert first is True
+    assert conflict.workspace_ids == [ids["A"]]
+    assert unchecked is True
+    assert missing is False
+    assert state == ("A3", 3)
+
+
+def test_unchecked_fallback_rename_gives_up_on_a_busy_workspace(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(workspaces, "system_name_expression", lambda dialect, name: None)
+    load_bodies = workspaces.load_bodies
+
+    async def scenario(sessionmaker, ids):
+        attempts = []
+
+        async def busy_load_bodies(session, digests, **kwargs):
+            # Another writer gets in between every read and the version check.
+            attempts.append(ids["A"])
+            await session.execute(
+                update(WorkspaceRecord)
+                .where(WorkspaceRecord.id == ids["A"])
+                .values(version=WorkspaceRecord.version + 1)
+            )
+            return await load_bodies(session, digests, **kwargs)
+
+        monkeypatch.setattr(workspaces, "load_bodies", busy_load_bodies)
+        async with sessionmaker() as session:
+            with pytest.raises(WorkspaceConflict) as conflict:
+                await workspaces.rename_workspace(session, ids["A"], "A1")
+        return ids, attempts, conflict.value, await _state(sessionmaker, ids["A"])
+
+    ids, attempts, conflict, state = _run(tmp_path, scenario)
+
+    assert len(attempts) == workspaces.MAX_RENAME_ATTEMPTS
+    assert conflict.workspace_ids == [ids["A"]]
+    assert state == ("A", 1)
+
+
+def test_bulk_rename_conflict_renames_nothing(tmp_path) -> None:
+    async def scenario(sessionmaker, ids):
+        async with sessionmaker() as session:
+            await workspaces.rename_workspace(session, ids["B"], "B1")
+        async with sessionmaker() as session:
+            with pytest.raises(WorkspaceConflict) as conflict:
+                await workspaces.rename_workspaces(
+                    session,
+                    {ids["A"]: "Same", ids["B"]: "Same"},
+                    {ids["A"]: 1, ids["B"]: 1},
+                )
+        return (
+            ids,
+            conflict.value,
+            await _state(sessionmaker, ids["A"]),
+            await _state(sessionmaker, ids["B"]),
+        )
+
+    ids, conflict, a, b = _run(tmp_path, scenario)
+
+    assert conflict.workspace_ids == [ids["B"]]
+    assert a == ("A", 1)
+    assert b == ("B1", 2)
+
+
+def test_delete_checks_version(tmp_path) -> None:
+    async def scenario(sessionmaker, ids):
+        async with sessionmaker() as session:
+            await workspaces.rename_workspace(session, ids["A"], "A1")
+        async with sessionmaker() as session:
+            with pytest.raises(WorkspaceConflict):
+                await workspaces.delete_workspace(session, ids["A"], expected_version=1)
+        after_conflict = await _state(sessionmaker, ids["A"])
+        async with sessionmaker() as session:
+            deleted = await workspaces.delete_workspace(session, ids["A"], expected_version=2)
+        return after_conflict, deleted, await _state(sessionmaker, ids["A"])
+
+    after_conflict, deleted, state = _run(tmp_path, scenario)
+
+    assert after_conflict == ("A1", 2)
+    assert deleted is True
+    assert state is None
+
+
+def test_refresh_export_keeps_version(tmp_path) -> None:
+    async def scenario(sessionmaker, ids):
+        async with sessionmaker() as session:
+            await workspaces.rename_workspace(session, ids["A"], "A1")
+        async with sessionmaker() as session:
+            refreshed = await workspaces.refresh_workspace_export(session, ids["A"])
+        async with sessionmaker() as session:
+            record = await session.get(WorkspaceRecord, ids["A"])
+        return refreshed, record
+
+    refreshed, record = _run(tmp_path, scenario)
+
+    assert refreshed is not None
+    assert record.export_sha256 == refreshed.export_sha256
+    assert record.version == 2
+
+
+class DummySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class DummySessionMaker:
+    def __call__(self):
+        return DummySession()
+
+
+class DummyAdmin:
+    is_admin = True
+
+
+def test_stale_rename_and_delete_return_409(monkeypatch) -> None:
+    app = create_app()
+    app.state.sessionmaker = DummySessionMaker()
+    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    calls = []
+
+    async def fake_rename_workspace(session, workspace_id, name, expected_version=None):
+        calls.append(expected_version)
+        raise WorkspaceConflict([workspace_id])
+
+    async def fake_delete_workspace(session, workspace_id, expected_version=None):
+        calls.append(expected_version)
+        raise WorkspaceConflict([workspace_id])
+
+    monkeypatch.setattr(workspaces_routes, "rename_workspace", fake_rename_workspace)
+    monkeypatch.setattr(workspaces_routes, "delete_workspace", fake_delete_workspace)
+    monkeypatch.setattr(workspaces_routes, "verify_csrf", lambda request, token: None)
+
+    client = TestClient(app)
+    rename = client.post(
+        "/admin/workspaces/workspace-1/rename",
+        data={"name": "Renamed", "version": "3"},
+        follow_redirects=False,
+    )
+    delete = client.post(
+        "/admin/workspaces/workspace-1/delete",
+        data={"version": "4"},
+        follow_redirects=False,
+    )
+
+    assert rename.status_code == 409
+    assert delete.status_code == 409
+    assert calls == [3, 4]
@@ -16,6 +16,8 @@ class DummyWorkspace:
     owner_id: str | None
     created_at: datetime
     updated_at: datetime
+    payload_bytes: int | None = None
+    section_counts: dict[str, int] | None = None
 
 
 class DummySession:
@@ -40,7 +42,7 @@ def test_workspaces_page_renders() -> None:
     app.state.sessionmaker = DummySessionMaker()
     app.dependency_overrides[require_admin] = lambda: DummyAdmin()
 
-    async def fake_list_workspaces(session):
+    async def fake_list_workspaces(session, **kwargs):
         return [
             DummyWorkspace(
                 id="workspace-1",
@@ -49,6 +51,8 @@ def test_workspaces_page_renders() -> None:
                 owner_id="user-1",
                 created_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
                 updated_at=datetime(2026, 1, 19, tzinfo=timezone.utc),
+                payload_bytes=2048,
+                section_counts={"components": 3},
             )
         ]
 
@@ -62,5 +66,7 @@ def test_workspaces_page_renders() -> None:
         assert response.status_code == 200
         assert "Example" in response.text
         assert "user-1" in response.text
+        assert "2.0 kB" in response.text
+        assert "components: 3" in response.text
     finally:
         workspaces_routes.list_workspaces = original_list
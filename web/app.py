@@ -1,3 +1,6 @@
+import math
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Awaitable, Callable
 
@@ -7,25 +10,56 @@ from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response
 
-from engine.db import create_engine, create_sessionmaker
-from web.auth import configure_oauth
+from engine.cache import ByteLRUCache, TTLCache
+from engine.db import create_engine, create_replica_engines, create_sessionmaker, read_routing
+from engine.executor import SerializationExecutor
+from engine.jobs import EXPORT, IMPORT, MATERIALIZE, VALIDATE, JobRunner
+from engine.logins import LoginWriteBehind
+from engine.models import User
+from engine.search import WorkspaceNameIndex
+from web.auth import OAuthHTTP, configure_oauth
 from web.routes.admin import router as admin_router
 from web.routes.auth import router as auth_router
 from web.routes.export import router as export_router
 from web.routes.health import router as health_router
 from web.routes.home import router as home_router
+from web.routes.jobs import router as jobs_router
 from web.routes.users import router as users_router
 from web.routes.workspaces import router as workspaces_router
-from web.security import get_csrf_token, load_user
+from web.security import (
+    UserResolutionStats,
+    get_csrf_token,
+    load_user,
+    skips_user_resolution,
+)
 from web.settings import get_settings
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
+PRIMARY_COOKIE = "db_primary"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await app.state.oauth_http.start()
+    app.state.job_runner.start()
+    if app.state.login_write_behind is not None:
+        app.state.login_write_behind.start()
+    yield
+    await app.state.oauth_http.aclose()
+    await app.state.job_runner.shutdown()
+    if app.state.login_write_behind is not None:
+        await app.state.login_write_behind.close()
+    app.state.executor.shutdown(wait=False)
+    await app.state.engine.dispose()
+    for replica in app.state.replica_engines:
+        await replica.dispose()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     settings = get_settings()
     templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
@@ -34,18 +68,93 @@ def create_app() -> FastAPI:
     templates.env.globals["settings"] = settings
 
     app.state.engine = create_engine(settings)
-    app.state.sessionmaker = create_sessionmaker(app.state.engine)
+    app.state.replica_engines = create_replica_engines(settings)
+    app.state.sessionmaker = create_sessionmaker(app.state.engine, app.state.replica_engines)
     app.state.oauth = configure_oauth(settings)
+    app.state.oauth_http = OAuthHTTP(app.state.oauth, settings)
+    app.state.export_cache = ByteLRUCache(
+        settings.export_cache_max_bytes,
+        max_entry_bytes=settings.export_cache_max_entry_bytes,
+    )
+    app.state.executor = SerializationExecutor(
+        inline_max_bytes=settings.offload_inline_max_bytes,
+        process_min_bytes=settings.offload_process_min_bytes,
+        max_threads=settings.offload_max_threads,
+        max_processes=settings.offload_max_processes,
+    )
+    app.state.user_cache = TTLCache[User](
+        settings.user_cache_max_entries,
+        settings.user_cache_ttl_seconds,
+    )
+    app.state.user_resolution = UserResolutionStats()
+    app.state.workspace_name_index = TTLCache[WorkspaceNameIndex](
+        1,
+        settings.workspace_name_index_ttl_seconds,
+    )
+    app.state.login_write_behind = (
+        LoginWriteBehind(
+            app.state.sessionmaker,
+            interval_seconds=settings.login_flush_interval_seconds,
+            batch_size=settings.login_flush_batch_size,
+        )
+        if settings.login_write_behind
+        else None
+    )
+    settings.job_artifact_dir.mkdir(parents=True, exist_ok=True)
+    app.state.job_runner = JobRunner(
+        app.state.sessionmaker,
+        limits={
+            IMPORT: settings.job_import_concurrency,
+            EXPORT: settings.job_export_concurrency,
+            VALIDATE: settings.job_validate_concurrency,
+            # JobRunner.materialize runs these one at a time.
+            MATERIALIZE: 1,
+        },
+        artifact_dir=settings.job_artifact_dir,
+        artifact_ttl_seconds=settings.job_artifact_ttl_seconds,
+        executor=app.state.executor,
+    )
 
     @app.middleware("http")
     async def attach_user(
         request: Request,
         call_next: Callable[[Request], Awaitable[Response]],
     ) -> Response:
+        if skips_user_resolution(request.url.path):
+            app.state.user_resolution.skipped += 1
+            return await call_next(request)
         request.state.user = await load_user(request)
         request.state.csrf_token = get_csrf_token(request)
         return await call_next(request)
 
+    @app.middleware("http")
+    async def route_reads(
+        request: Request,
+        call_next: Callable[[Request], Awaitable[Response]],
+    ) -> Response:
+        """Pin reads to the primary for writes and shortly after them.
+
+        Requests that change data, and any request that ends up writing,
+        set a short-lived cookie; while it is present the client's reads
+        skip the replicas so it sees its own writes.
+        """
+
+        if not app.state.replica_engines or skips_user_resolution(request.url.path):
+            return await call_next(request)
+        unsafe = request.method not in SAFE_METHODS
+        with read_routing(primary_only=unsafe or PRIMARY_COOKIE in request.cookies) as routing:
+            response = await call_next(request)
+        if (unsafe or routing.wrote) and settings.replica_sticky_seconds > 0:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=math.ceil(settings.replica_sticky_seconds),
+                httponly=True,
+                samesite="lax",
+                secure=settings.session_https_only,
+            )
+        return response
+
     app.add_middleware(
         SessionMiddleware,
         secret_key=settings.secret_key,
@@ -60,6 +169,7 @@ def create_app() -> FastAPI:
     app.include_router(auth_router)
     app.include_router(admin_router)
     app.include_router(workspaces_router)
+    app.include_router(jobs_router)
     app.include_router(users_router)
     app.include_router(health_router)
 
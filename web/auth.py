@@ -1,9 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any
+
+import httpx
 from authlib.integrations.starlette_client import OAuth
 
 from web.settings import Settings
 
+logger = logging.getLogger(__name__)
+
+GITHUB_API_HEADERS = {"Accept": "application/vnd.github+json"}
+
+
+def server_metadata_urls(settings: Settings) -> dict[str, str]:
+    """OIDC discovery URLs of the configured providers that publish one."""
+
+    urls = {}
+    if settings.google_client_id and settings.google_client_secret:
+        urls["google"] = settings.google_server_metadata_url
+    return urls
+
 
 def configure_oauth(settings: Settings) -> OAuth:
     oauth = OAuth()
@@ -13,9 +33,9 @@ def configure_oauth(settings: Settings) -> OAuth:
             name="github",
             client_id=settings.github_client_id,
             client_secret=settings.github_client_secret,
-            access_token_url="https://github.com/login/oauth/access_token",
-            authorize_url="https://github.com/login/oauth/authorize",
-            api_base_url="https://api.github.com/",
+            access_token_url=settings.github_access_token_url,
+            authorize_url=settings.github_authorize_url,
+            api_base_url=settings.github_api_base_url,
             client_kwargs={"scope": "read:user user:email"},
         )
 
@@ -24,8 +44,135 @@ def configure_oauth(settings: Settings) -> OAuth:
             name="google",
             client_id=settings.google_client_id,
             client_secret=settings.google_client_secret,
-            server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+            server_metadata_url=server_metadata_urls(settings)["google"],
             client_kwargs={"scope": "openid email profile"},
         )
 
     return oauth
+
+
+class OAuthHTTP:
+    """Long-lived pooled HTTP clients for provider APIs and OIDC metadata.
+
+    Authlib opens a fresh connection for every API call and loads OIDC
+    metadata lazily on the first login of each worker. Here one pooled
+    client per provider is reused for profile lookups, and metadata is
+    fetched at startup and refreshed on an interval, then handed to the
+    authlib client so it never fetches it inline during a login.
+    """
+
+    def __init__(
+        self,
+        oauth: OAuth,
+        settings: Settings,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.oauth = oauth
+        self.metadata_urls = server_metadata_urls(settings)
+        self.refresh_seconds = settings.oauth_metadata_refresh_seconds
+        self._timeout = httpx.Timeout(settings.oauth_http_timeout_seconds)
+        self._limits = httpx.Limits(
+            max_connections=settings.oauth_max_connections,
+            max_keepalive_connections=settings.oauth_max_connections,
+        )
+        self._transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        client = self._clients.get(provider)
+        if client is None:
+            app = self.oauth.create_client(provider)
+            client = httpx.AsyncClient(
+                base_url=getattr(app, "api_base_url", None) or "",
+                timeout=self._timeout,
+                limits=self._limits,
+                transport=self._transport,
+            )
+            self._clients[provider] = client
+        return client
+
+    async def refresh_metadata(self, provider: str) -> dict[str, Any]:
+        response = await self.client(provider).get(self.metadata_urls[provider])
+        response.raise_for_status()
+        metadata: dict[str, Any] = response.json()
+        # load_server_metadata() skips its own fetch once "_loaded_at" is set.
+        metadata["_loaded_at"] = time.time()
+        self.oauth.create_client(provider).server_metadata.update(metadata)
+        return metadata
+
+    async def prefetch_metadata(self) -> None:
+        providers = list(self.metadata_urls)
+        results = await asyncio.gather(
+            *(self.refresh_metadata(provider) for provider in providers),
+            return_exceptions=True,
+        )
+        for provider, result in zip(providers, results):
+            if isinstance(result, Exception):
+                logger.warning("Could not load OIDC metadata for %s: %s", provider, result)
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.prefetch_metadata()
+
+    async def start(self) -> None:
+        await self.prefetch_metadata()
+        if self.refresh_seconds > 0 and self.metadata_urls:
+            self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    async def aclose(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    async def metadata(self, provider: str) -> dict[str, Any]:
+        app = self.oauth.create_client(provider)
+        if "_loaded_at" not in app.server_metadata:
+            await self.refresh_metadata(provider)
+        return dict(app.server_metadata)
+
+
+def _bearer(token: dict[str, Any]) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+async def fetch_github_identity(http: OAuthHTTP, token: dict[str, Any]) -> dict[str, Any]:
+    """Fetch the GitHub profile and email list concurrently."""
+
+    client = http.client("github")
+    headers = {**GITHUB_API_HEADERS, **_bearer(token)}
+    profile, emails = await asyncio.gather(
+        client.get("user", headers=headers),
+        client.get("user/emails", headers=headers),
+    )
+    profile_data = profile.json()
+    emails_data = emails.json() if emails.is_success else []
+    primary_email = next(
+        (email["email"] for email in emails_data if email.get("primary")),
+        None,
+    )
+    return {
+        "email": primary_email or profile_data.get("email"),
+        "provider_id": str(profile_data.get("id")),
+        "display_name": profile_data.get("name") or profile_data.get("login"),
+    }
+
+
+async def fetch_google_identity(http: OAuthHTTP, token: dict[str, Any]) -> dict[str, Any]:
+    metadata = await http.metadata("google")
+    response = await http.client("google").get(
+        metadata["userinfo_endpoint"],
+        headers=_bearer(token),
+    )
+    userinfo_data = response.json()
+    return {
+        "email": userinfo_data.get("email"),
+        "provider_id": userinfo_data.get("sub"),
+        "display_name": userinfo_data.get("name") or userinfo_data.get("email"),
+    }
@@ -1,11 +1,17 @@
+from dataclasses import asdict
 from typing import cast
 
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from starlette.responses import Response
 
+from engine.cache import ByteLRUCache, TTLCache
+from engine.db import pool_metrics
+from engine.executor import SerializationExecutor
+from engine.jobs import JobRunner
+from engine.logins import LoginWriteBehind
 from engine.models import User
-from web.security import require_admin
+from web.security import UserResolutionStats, require_admin, user_resolution_metrics
 
 router = APIRouter()
 
@@ -21,3 +27,26 @@ def admin_home(request: Request, user: User = Depends(require_admin)) -> Respons
             {"request": request, "user": user},
         ),
     )
+
+
+@router.get("/admin/metrics")
+def admin_metrics(request: Request, user: User = Depends(require_admin)) -> JSONResponse:
+    executor: SerializationExecutor = request.app.state.executor
+    export_cache: ByteLRUCache = request.app.state.export_cache
+    job_runner: JobRunner = request.app.state.job_runner
+    user_cache: TTLCache[User] = request.app.state.user_cache
+    user_resolution: UserResolutionStats = request.app.state.user_resolution
+    login_write_behind: LoginWriteBehind | None = request.app.state.login_write_behind
+    return JSONResponse(
+        {
+            "serialization": executor.metrics(),
+            "export_cache": asdict(export_cache.stats),
+            "jobs": job_runner.metrics(),
+            "user_resolution": user_resolution_metrics(user_resolution, user_cache),
+            "login_write_behind": login_write_behind.metrics() if login_write_behind else None,
+            "db_pool": pool_metrics(request.app.state.engine),
+            "db_replica_pools": [
+                pool_metrics(replica) for replica in request.app.state.replica_engines
+            ],
+        }
+    )
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import Any, cast
 
 from fastapi import APIRouter, Form, HTTPException, Request
 from fastapi.responses import RedirectResponse, Response
 
 from engine.db import get_session
-from engine.users import has_admin, upsert_user
+from engine.logins import LoginWriteBehind
+from engine.users import upsert_user
+from web.auth import OAuthHTTP, fetch_github_identity, fetch_google_identity
 from web.settings import get_settings
 
 router = APIRouter(prefix="/auth")
@@ -32,30 +35,11 @@ async def callback(request: Request, provider: str) -> RedirectResponse:
     client = await _get_oauth_client(request, provider)
     token = await client.authorize_access_token(request)
 
-    user_info: dict[str, Any]
-
+    http: OAuthHTTP = request.app.state.oauth_http
     if provider == "github":
-        profile = await client.get("user", token=token)
-        emails = await client.get("user/emails", token=token)
-        profile_data = profile.json()
-        emails_data = emails.json()
-        primary_email = next(
-            (email["email"] for email in emails_data if email.get("primary")),
-            None,
-        )
-        user_info = {
-            "email": primary_email or profile_data.get("email"),
-            "provider_id": str(profile_data.get("id")),
-            "display_name": profile_data.get("name") or profile_data.get("login"),
-        }
+        user_info = await fetch_github_identity(http, token)
     elif provider == "google":
-        userinfo = await client.get("userinfo", token=token)
-        userinfo_data = userinfo.json()
-        user_info = {
-            "email": userinfo_data.get("email"),
-            "provider_id": userinfo_data.get("sub"),
-            "display_name": userinfo_data.get("name") or userinfo_data.get("email"),
-        }
+        user_info = await fetch_google_identity(http, token)
     else:
         raise HTTPException(status_code=400, detail="Unsupported provider")
 
@@ -68,21 +52,23 @@ async def callback(request: Request, provider: str) -> RedirectResponse:
 
     settings = get_settings()
     sessionmaker = request.app.state.sessionmaker
+    login_write_behind: LoginWriteBehind | None = request.app.state.login_write_behind
     async for session in get_session(sessionmaker):
         allowlist = settings.admin_allowlist_set()
         allowlist_match = email.lower() in allowlist
-        existing_admin = await has_admin(session)
-        is_admin = allowlist_match and (
-            settings.admin_allowlist_enabled or not existing_admin
-        )
         user = await upsert_user(
             session,
             provider=provider,
             provider_id=provider_id,
             email=email,
             display_name=display_name or email,
-            is_admin=is_admin,
+            is_admin=allowlist_match and settings.admin_allowlist_enabled,
+            bootstrap_admin=allowlist_match and not settings.admin_allowlist_enabled,
+            touch_last_login=login_write_behind is None,
+            user_cache=request.app.state.user_cache,
         )
+    if login_write_behind is not None:
+        login_write_behind.record(user.id, datetime.now(timezone.utc))
 
     request.session["user_id"] = user.id
 
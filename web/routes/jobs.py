@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse
+
+from engine.db import get_session
+from engine.jobs import EXPORT, SUCCEEDED, get_job, job_to_dict
+from engine.models import Job, User
+from web.security import require_admin
+from web.settings import Settings
+
+router = APIRouter(prefix="/admin/jobs")
+
+ARTIFACT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "zip": "application/zip"}
+
+
+def _artifact(request: Request, job: Job | None) -> tuple[Path, str] | None:
+    """Return a succeeded export's artifact and format, unless it has expired."""
+
+    if job is None or job.kind != EXPORT or job.status != SUCCEEDED or not job.result:
+        return None
+    settings: Settings = request.app.state.settings
+    path = settings.job_artifact_dir / job.result["artifact"]
+    return (path, job.result["format"]) if path.is_file() else None
+
+
+@router.get("/{job_id}")
+async def job_status(
+    request: Request,
+    job_id: str,
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        job = await get_job(session, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    payload = job_to_dict(job)
+    if _artifact(request, job) is not None:
+        payload["download_url"] = f"/admin/jobs/{job.id}/download"
+    return JSONResponse(payload, headers={"Cache-Control": "no-store"})
+
+
+@router.get("/{job_id}/download")
+async def job_download(
+    request: Request,
+    job_id: str,
+    user: User = Depends(require_admin),
+) -> FileResponse:
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        job = await get_job(session, job_id)
+
+    artifact = _artifact(request, job)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    path, export_format = artifact
+    return FileResponse(
+        path,
+        media_type=ARTIFACT_MEDIA_TYPES[export_format],
+        filename=f"workspaces.{export_format}",
+    )
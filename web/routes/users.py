@@ -5,18 +5,44 @@ from fastapi.responses import HTMLResponse
 from starlette.responses import Response
 
 from engine.db import get_session
+from engine.logins import LoginWriteBehind
 from engine.models import User
-from engine.users import get_user_by_id, list_users
+from engine.pagination import Cursor, InvalidCursor, clamp_page_size, keyset_page
+from engine.users import DEFAULT_USER_SORT, USER_SORTS, get_user_by_id, list_users, user_cursor
 from web.security import require_admin
 
 router = APIRouter(prefix="/admin/users")
 
 
 @router.get("", response_class=HTMLResponse)
-async def users_index(request: Request, user: User = Depends(require_admin)) -> Response:
+async def users_index(
+    request: Request,
+    sort: str = DEFAULT_USER_SORT,
+    q: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+    user: User = Depends(require_admin),
+) -> Response:
+    if sort not in USER_SORTS:
+        raise HTTPException(status_code=400, detail="Unsupported sort")
+    try:
+        after = Cursor.decode(cursor, key_type=USER_SORTS[sort].key_type) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    page_size = clamp_page_size(limit)
+    search = q.strip() if q and q.strip() else None
+
     sessionmaker = request.app.state.sessionmaker
     async for session in get_session(sessionmaker):
-        users = await list_users(session)
+        users = await list_users(
+            session,
+            sort=sort,
+            search=search,
+            after=after,
+            limit=page_size + 1,
+        )
+    page = keyset_page(users, page_size, lambda record: user_cursor(record, sort))
+    login_write_behind: LoginWriteBehind | None = request.app.state.login_write_behind
 
     templates = request.app.state.templates
     return cast(
@@ -24,7 +50,20 @@ async def users_index(request: Request, user: User = Depends(require_admin)) ->
         templates.TemplateResponse(
             request,
             "pages/users.html",
-            {"request": request, "user": user, "users": users},
+            {
+                "request": request,
+                "user": user,
+                "users": page.items,
+                "next_cursor": page.next_cursor,
+                "sort": sort,
+                "sorts": list(USER_SORTS),
+                "q": search,
+                "page_size": page_size,
+                "is_first_page": after is None,
+                "pending_logins": (
+                    login_write_behind.pending_snapshot() if login_write_behind else {}
+                ),
+            },
         ),
     )
 
@@ -41,6 +80,7 @@ async def user_detail(
 
     if record is None:
         raise HTTPException(status_code=404, detail="User not found")
+    login_write_behind: LoginWriteBehind | None = request.app.state.login_write_behind
 
     templates = request.app.state.templates
     return cast(
@@ -48,6 +88,13 @@ async def user_detail(
         templates.TemplateResponse(
             request,
             "pages/user_detail.html",
-            {"request": request, "user": user, "record": record},
+            {
+                "request": request,
+                "user": user,
+                "record": record,
+                "pending_login": (
+                    login_write_behind.pending(record.id) if login_write_behind else None
+                ),
+            },
         ),
     )
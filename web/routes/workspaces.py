@@ -1,26 +1,112 @@
 import json
+import shutil
+import zipfile
+from collections.abc import AsyncIterator
+from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import cast
-
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
-
+from typing import Any, cast
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import UploadFile
+
+from engine.bodies import clone_storage
+from engine.bulk_import import import_workspaces, iter_import_entries, summarize
+from engine.cache import ByteLRUCache
 from engine.db import get_session
+from engine.executor import PROCESS, SerializationExecutor
+from engine.export import (
+    export_document,
+    export_filename,
+    iter_canonical_json,
+    iter_ndjson_export,
+    iter_zip_export,
+    pretty_json,
+)
 from engine.ids import deterministic_id
-from engine.models import User
-from engine.workspace import Workspace
+from engine.jobs import EXPORT, IMPORT, VALIDATE, JobRunner, export_job, import_job, validate_job
+from engine.jsonscan import JSONScanError, TopLevelKeyScanner
+from engine.models import User, WorkspaceRecord
+from engine.pagination import Cursor, InvalidCursor, clamp_page_size, keyset_page
+from engine.patch import PATCH_CONTENT_TYPES, PatchError, parse_patch
+from engine.revisions import (
+    diff_revisions,
+    list_revisions,
+    load_revision_chain,
+    rebuild_revision,
+)
+from engine.search import MAX_TYPEAHEAD_LIMIT, TYPEAHEAD_LIMIT, typeahead_workspaces
+from engine.workspace import (
+    REQUIRED_PAYLOAD_KEYS,
+    Workspace,
+    WorkspaceValidationError,
+    normalize_workspace_name,
+    validate_workspace_payload,
+)
+from engine.workspaces import (
+    EXPORT_READ_BYTES,
+    WorkspaceConflict,
+    WorkspaceExport,
+    WorkspaceTree,
+    clone_workspace,
+    control_document,
+    delete_workspace,
+    delete_workspaces,
+    diff_workspaces,
+    get_workspace,
+    get_workspace_export,
+    iter_workspace_export,
+    list_workspaces,
+    patch_workspace,
+    read_workspace_export,
+    rename_workspace,
+    search_workspaces,
+    stream_workspaces,
+    summary_cursor,
+)
 from engine.workspaces import create_workspace as create_workspace_record
-from engine.workspaces import delete_workspace, get_workspace, list_workspaces, rename_workspace
+from web.caching import is_not_modified, make_etag, not_modified_response, validator_headers
 from web.security import require_admin, verify_csrf
+from web.settings import Settings
+from web.uploads import read_limited_body, read_upload_form
 
 router = APIRouter(prefix="/admin/workspaces")
 
+IMPORT_CHUNK_SIZE = 64 * 1024
+
 
 @router.get("", response_class=HTMLResponse)
-async def workspaces_index(request: Request, user: User = Depends(require_admin)) -> Response:
+async def workspaces_index(
+    request: Request,
+    cursor: str | None = None,
+    owner_id: str | None = None,
+    limit: int | None = None,
+    user: User = Depends(require_admin),
+) -> Response:
+    try:
+        after = Cursor.decode(cursor, key_type=datetime) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    page_size = clamp_page_size(limit)
+    owner_filter = owner_id or None
+
     sessionmaker = request.app.state.sessionmaker
     async for session in get_session(sessionmaker):
-        records = await list_workspaces(session)
+        records = await list_workspaces(
+            session,
+            owner_id=owner_filter,
+            after=after,
+            limit=page_size + 1,
+        )
+    page = keyset_page(records, page_size, summary_cursor)
 
     templates = request.app.state.templates
     return cast(
@@ -28,7 +114,15 @@ async def workspaces_index(request: Request, user: User = Depends(require_admin)
         templates.TemplateResponse(
             request,
             "pages/workspaces.html",
-            {"request": request, "user": user, "workspaces": records},
+            {
+                "request": request,
+                "user": user,
+                "workspaces": page.items,
+                "next_cursor": page.next_cursor,
+                "owner_id": owner_filter,
+                "page_size": page_size,
+                "is_first_page": after is None,
+            },
         ),
     )
 
@@ -41,11 +135,10 @@ async def workspaces_create(
     user: User = Depends(require_admin),
 ) -> RedirectResponse:
     verify_csrf(request, csrf_token)
-    name = " ".join(name.split())
-    if not name:
-        raise HTTPException(status_code=400, detail="Workspace name is required")
-    if len(name) > 200:
-        raise HTTPException(status_code=400, detail="Workspace name is too long")
+    try:
+        name = normalize_workspace_name(name)
+    except WorkspaceValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     system_id = deterministic_id(name)
     workspace = Workspace(
         system_name=name,
@@ -65,6 +158,247 @@ async def workspaces_create(
     return RedirectResponse(url="/admin/workspaces", status_code=303)
 
 
+async def _stream_workspace_records(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    *,
+    owner_id: str | None,
+    updated_since: datetime | None,
+) -> AsyncIterator[WorkspaceRecord]:
+    async for session in get_session(sessionmaker):
+        async for record in stream_workspaces(
+            session,
+            owner_id=owner_id,
+            updated_since=updated_since,
+        ):
+            yield record
+
+
+def _parse_updated_since(updated_since: str | None) -> datetime | None:
+    if not updated_since:
+        return None
+    try:
+        return datetime.fromisoformat(updated_since)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid updated_since format") from exc
+
+
+def _job_accepted(job_id: str) -> JSONResponse:
+    status_url = f"/admin/jobs/{job_id}"
+    return JSONResponse(
+        {"job_id": job_id, "status_url": status_url},
+        status_code=202,
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/export")
+async def workspaces_bulk_export(
+    request: Request,
+    format: str = "ndjson",
+    owner_id: str | None = None,
+    updated_since: str | None = None,
+    user: User = Depends(require_admin),
+) -> Response:
+    since = _parse_updated_since(updated_since)
+    records = _stream_workspace_records(
+        request.app.state.sessionmaker,
+        owner_id=owner_id or None,
+        updated_since=since,
+    )
+    executor: SerializationExecutor = request.app.state.executor
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_ndjson_export(records, executor=executor),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="workspaces.ndjson"'},
+        )
+    if format == "zip":
+        return StreamingResponse(
+            iter_zip_export(records, executor=executor),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="workspaces.zip"'},
+        )
+    raise HTTPException(status_code=400, detail="Unsupported export format")
+
+
+@router.post("/export")
+async def workspaces_export_job(
+    request: Request,
+    format: str = Form("ndjson"),
+    owner_id: str | None = Form(None),
+    updated_since: str | None = Form(None),
+    csrf_token: str | None = Form(None),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    verify_csrf(request, csrf_token)
+    if format not in ("ndjson", "zip"):
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+    since = _parse_updated_since(updated_since)
+
+    runner: JobRunner = request.app.state.job_runner
+    job_id = await runner.submit(
+        EXPORT,
+        export_job(format=format, owner_id=owner_id or None, updated_since=since),
+        owner_id=user.id,
+        params={"format": format, "owner_id": owner_id or None, "updated_since": updated_since},
+    )
+    return _job_accepted(job_id)
+
+
+@router.post("/validate")
+async def workspaces_validate_job(
+    request: Request,
+    csrf_token: str | None = Form(None),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    verify_csrf(request, csrf_token)
+    runner: JobRunner = request.app.state.job_runner
+    job_id = await runner.submit(VALIDATE, validate_job(), owner_id=user.id)
+    return _job_accepted(job_id)
+
+
+@router.post("/delete")
+async def workspaces_delete_selected(
+    request: Request,
+    workspace_ids: list[str] = Form([]),
+    csrf_token: str | None = Form(None),
+    user: User = Depends(require_admin),
+) -> RedirectResponse:
+    verify_csrf(request, csrf_token)
+    if not workspace_ids:
+        raise HTTPException(status_code=400, detail="No workspaces selected")
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        await delete_workspaces(session, workspace_ids)
+
+    return RedirectResponse(url="/admin/workspaces", status_code=303)
+
+
+@router.get("/typeahead")
+async def workspaces_typeahead(
+    request: Request,
+    q: str = "",
+    limit: int = Query(TYPEAHEAD_LIMIT, ge=1, le=MAX_TYPEAHEAD_LIMIT),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """Name and system id matches for a search box, best first."""
+
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        matches = await typeahead_workspaces(
+            session,
+            q,
+            limit=limit,
+            fallback_cache=request.app.state.workspace_name_index,
+        )
+    return JSONResponse(
+        {"query": q, "matches": [asdict(match) for match in matches]},
+        headers={"Cache-Control": "private, max-age=5"},
+    )
+
+
+@router.get("/search")
+async def workspaces_search(
+    request: Request,
+    control: str | None = None,
+    contains: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+    user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """Find workspaces whose content contains a JSON pattern.
+
+    ``control`` finds SSPs implementing a control; ``contains`` takes any
+    JSON object and matches like PostgreSQL's ``@>``.
+    """
+
+    if control:
+        pattern = control_document(control)
+    elif contains:
+        try:
+            pattern = json.loads(contains)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail="contains must be valid JSON") from exc
+        if not isinstance(pattern, dict):
+            raise HTTPException(status_code=400, detail="contains must be a JSON object")
+    else:
+        raise HTTPException(status_code=400, detail="Provide control or contains")
+    try:
+        after = Cursor.decode(cursor, key_type=datetime) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    page_size = clamp_page_size(limit)
+
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        records = await search_workspaces(session, pattern, after=after, limit=page_size + 1)
+    page = keyset_page(records, page_size, summary_cursor)
+    return {
+        "items": [asdict(item) for item in page.items],
+        "next_cursor": page.next_cursor,
+    }
+
+
+def _diff_side(tree: WorkspaceTree) -> dict[str, Any]:
+    return {"id": tree.id, "version": tree.version, "digest": tree.data_digest}
+
+
+@router.get("/diff")
+async def workspaces_diff(
+    request: Request,
+    left: str,
+    right: str,
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """A JSON Patch turning the left workspace's data into the right's."""
+
+    sessionmaker = request.app.state.sessionmaker
+    try:
+        async for session in get_session(sessionmaker):
+            diff = await diff_workspaces(
+                session, left, right, executor=request.app.state.executor
+            )
+    except WorkspaceConflict as exc:
+        raise HTTPException(status_code=409, detail="Workspace is being edited") from exc
+
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    return JSONResponse(
+        {
+            "left": _diff_side(diff.left),
+            "right": _diff_side(diff.right),
+            "identical": diff.left.data_digest == diff.right.data_digest,
+            "patch": [operation.to_json() for operation in diff.operations],
+        }
+    )
+
+
+@router.get("/storage")
+async def workspaces_storage(
+    request: Request,
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """Bytes held by shared clone bodies and the bytes full copies would add."""
+
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        storage = await clone_storage(session)
+    return JSONResponse(asdict(storage))
+
+
+@router.get("/import", response_class=HTMLResponse)
+def workspaces_import_form(request: Request, user: User = Depends(require_admin)) -> Response:
+    templates = request.app.state.templates
+    return cast(
+        Response,
+        templates.TemplateResponse(
+            request,
+            "pages/workspaces_import.html",
+            {"request": request, "user": user},
+        ),
+    )
+
+
 @router.get("/{workspace_id}", response_class=HTMLResponse)
 async def workspaces_detail(
     request: Request,
@@ -78,9 +412,16 @@ async def workspaces_detail(
     if record is None:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
-    payload = json.dumps(record.data, sort_keys=True, indent=2)
+    # The page embeds the session's CSRF token, so it is part of the validator.
+    etag = make_etag(record.id, record.updated_at, "detail", request.state.csrf_token)
+    headers = validator_headers(etag, record.updated_at)
+    if is_not_modified(request, etag, record.updated_at):
+        return not_modified_response(headers)
+
+    executor: SerializationExecutor = request.app.state.executor
+    payload = await executor.run(pretty_json, record.data)
     templates = request.app.state.templates
-    return cast(
+    response = cast(
         Response,
         templates.TemplateResponse(
             request,
@@ -93,19 +434,25 @@ async def workspaces_detail(
             },
         ),
     )
+    response.headers.update(headers)
+    return response
 
 
 @router.post("/{workspace_id}/delete")
 async def workspaces_delete(
     request: Request,
     workspace_id: str,
+    version: int | None = Form(None),
     csrf_token: str | None = Form(None),
     user: User = Depends(require_admin),
 ) -> RedirectResponse:
     verify_csrf(request, csrf_token)
     sessionmaker = request.app.state.sessionmaker
     async for session in get_session(sessionmaker):
-        deleted = await delete_workspace(session, workspace_id)
+        try:
+            deleted = await delete_workspace(session, workspace_id, expected_version=version)
+        except WorkspaceConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Workspace not found")
@@ -118,101 +465,351 @@ async def workspaces_rename(
     request: Request,
     workspace_id: str,
     name: str = Form(...),
+    version: int | None = Form(None),
     csrf_token: str | None = Form(None),
     user: User = Depends(require_admin),
 ) -> RedirectResponse:
     verify_csrf(request, csrf_token)
-    name = " ".join(name.split())
-    if not name:
-        raise HTTPException(status_code=400, detail="Workspace name is required")
-    if len(name) > 200:
-        raise HTTPException(status_code=400, detail="Workspace name is too long")
+    try:
+        name = normalize_workspace_name(name)
+    except WorkspaceValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     sessionmaker = request.app.state.sessionmaker
     async for session in get_session(sessionmaker):
-        updated = await rename_workspace(session, workspace_id, name=name)
+        try:
+            updated = await rename_workspace(
+                session, workspace_id, name=name, expected_version=version
+            )
+        except WorkspaceConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
 
     if not updated:
         raise HTTPException(status_code=404, detail="Workspace not found")
+    runner: JobRunner = request.app.state.job_runner
+    runner.materialize([workspace_id])
 
     return RedirectResponse(url=f"/admin/workspaces/{workspace_id}", status_code=303)
 
 
+@router.post("/{workspace_id}/clone")
+async def workspaces_clone(
+    request: Request,
+    workspace_id: str,
+    name: str = Form(...),
+    csrf_token: str | None = Form(None),
+    user: User = Depends(require_admin),
+) -> RedirectResponse:
+    verify_csrf(request, csrf_token)
+    try:
+        name = normalize_workspace_name(name)
+    except WorkspaceValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        try:
+            clone_id = await clone_workspace(
+                session,
+                workspace_id,
+                name=name,
+                system_id=deterministic_id(name),
+                owner_id=user.id,
+            )
+        except WorkspaceConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    if clone_id is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    runner: JobRunner = request.app.state.job_runner
+    runner.materialize([clone_id])
+
+    return RedirectResponse(url=f"/admin/workspaces/{clone_id}", status_code=303)
+
+
+@router.patch("/{workspace_id}")
+async def workspaces_patch(
+    request: Request,
+    workspace_id: str,
+    version: int | None = Query(None),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """Apply a JSON Merge Patch (RFC 7396) or JSON Patch (RFC 6902) to a workspace.
+
+    Responds with the new version and the values at the paths the patch
+    changed, not the whole document.
+    """
+
+    verify_csrf(request, request.headers.get("x-csrf-token"))
+    kind = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if kind not in PATCH_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail="Use application/merge-patch+json or application/json-patch+json",
+        )
+    settings: Settings = request.app.state.settings
+    body = await read_limited_body(request, max_bytes=settings.workspace_patch_max_bytes)
+    try:
+        patch = parse_patch(kind, json.loads(body))
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail="Patch must be valid JSON") from exc
+    except PatchError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        try:
+            patched = await patch_workspace(
+                session, workspace_id, kind, patch, expected_version=version
+            )
+        except WorkspaceConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        except PatchError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    if patched is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    runner: JobRunner = request.app.state.job_runner
+    runner.materialize([workspace_id])
+
+    return JSONResponse(
+        {
+            "id": patched.id,
+            "version": patched.version,
+            "updated_at": patched.updated_at.isoformat(),
+            "changed": patched.changed,
+            "removed": patched.removed,
+        }
+    )
+
+
+@router.get("/{workspace_id}/revisions")
+async def workspaces_revisions(
+    request: Request,
+    workspace_id: str,
+    before: int | None = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=200),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """Recorded versions of a workspace, newest first; page with ``before``."""
+
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        revisions = await list_revisions(session, workspace_id, before=before, limit=limit)
+
+    if not revisions and before is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    items = [
+        {**asdict(revision), "created_at": revision.created_at.isoformat()}
+        for revision in revisions
+    ]
+    next_before = revisions[-1].version if len(revisions) == limit else None
+    return JSONResponse({"items": items, "next_before": next_before})
+
+
+async def _revision_data(request: Request, workspace_id: str, version: int) -> dict[str, Any]:
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        chain = await load_revision_chain(session, workspace_id, version)
+
+    if chain is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    executor: SerializationExecutor = request.app.state.executor
+    return await executor.run(rebuild_revision, chain)
+
+
+@router.get("/{workspace_id}/revisions/{version}")
+async def workspaces_revision(
+    request: Request,
+    workspace_id: str,
+    version: int,
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    data = await _revision_data(request, workspace_id, version)
+    return JSONResponse({"id": workspace_id, "version": version, "data": data})
+
+
+@router.get("/{workspace_id}/revisions/{version}/export")
+async def workspaces_revision_export(
+    request: Request,
+    workspace_id: str,
+    version: int,
+    user: User = Depends(require_admin),
+) -> Response:
+    data = await _revision_data(request, workspace_id, version)
+    executor: SerializationExecutor = request.app.state.executor
+    document = await executor.run(export_document, data)
+    stem = export_filename(str(data.get("system_id", workspace_id))).removesuffix(".json")
+    filename = f"{stem}-v{version}.json"
+    return Response(
+        document,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{workspace_id}/revisions/{version}/diff")
+async def workspaces_revision_diff(
+    request: Request,
+    workspace_id: str,
+    version: int,
+    base: int | None = Query(None, ge=1),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """A JSON Patch turning version ``base`` (default: the one before) into ``version``."""
+
+    base_version = version - 1 if base is None else base
+    sessionmaker = request.app.state.sessionmaker
+    async for session in get_session(sessionmaker):
+        base_chain = await load_revision_chain(session, workspace_id, base_version)
+        chain = await load_revision_chain(session, workspace_id, version)
+
+    if base_chain is None or chain is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    executor: SerializationExecutor = request.app.state.executor
+    operations = await executor.run(diff_revisions, base_chain, chain)
+    return JSONResponse(
+        {
+            "id": workspace_id,
+            "base": base_version,
+            "version": version,
+            "patch": [operation.to_json() for operation in operations],
+        }
+    )
+
+
 @router.get("/{workspace_id}/export")
 async def workspaces_export(
     request: Request,
     workspace_id: str,
     user: User = Depends(require_admin),
 ) -> Response:
+    pretty = request.query_params.get("pretty") == "1"
+    cache: ByteLRUCache = request.app.state.export_cache
+    cached = first = None
     sessionmaker = request.app.state.sessionmaker
     async for session in get_session(sessionmaker):
-        record = await get_workspace(session, workspace_id)
+        # Validators first, so a revalidation is answered from one narrow
+        # read without fetching the document or its stored export.
+        record = await get_workspace_export(session, workspace_id)
+        if record is not None and not is_not_modified(
+            request, _export_etag(record, pretty), record.updated_at
+        ):
+            if not pretty and record.export_sha256 is not None:
+                first = await read_workspace_export(session, workspace_id, record.export_sha256)
+            if first is None:
+                # Pretty, or cleared by a SQL-side edit until the materialize
+                # job stores the export again; encode from the data.
+                cached = cache.get((record.id, record.updated_at, pretty))
+                if cached is None:
+                    record = await get_workspace_export(session, workspace_id, include_data=True)
 
     if record is None:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
+    etag = _export_etag(record, pretty)
+    headers = validator_headers(etag, record.updated_at)
+    if is_not_modified(request, etag, record.updated_at):
+        return not_modified_response(headers)
+
+    filename = export_filename(record.system_id)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if cached is not None:
+        return Response(cached, media_type="application/json", headers=headers)
+    if first is not None and record.export_sha256 is not None:
+        if len(first) < EXPORT_READ_BYTES:
+            return Response(first, media_type="application/json", headers=headers)
+        return StreamingResponse(
+            iter_workspace_export(sessionmaker, record.id, record.export_sha256, first),
+            media_type="application/json",
+            headers=headers,
+        )
+
     payload = {"workspace": record.data}
-    if request.query_params.get("pretty") == "1":
-        data = json.dumps(payload, sort_keys=True, indent=2).encode("utf-8")
-    else:
-        data = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
-    filename = f"workspace-{record.system_id}.json"
-    return Response(
-        data,
+    executor: SerializationExecutor = request.app.state.executor
+    cache_key = (record.id, record.updated_at, pretty)
+    return StreamingResponse(
+        executor.iterate(
+            cache.tee(cache_key, iter_canonical_json(payload, pretty=pretty)),
+            size=record.payload_bytes,
+        ),
         media_type="application/json",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers=headers,
     )
 
 
-@router.get("/import", response_class=HTMLResponse)
-def workspaces_import_form(request: Request, user: User = Depends(require_admin)) -> Response:
-    templates = request.app.state.templates
-    return cast(
-        Response,
-        templates.TemplateResponse(
-            request,
-            "pages/workspaces_import.html",
-            {"request": request, "user": user},
-        ),
-    )
+def _export_etag(record: WorkspaceExport, pretty: bool) -> str:
+    if not pretty and record.export_sha256 is not None:
+        # Compact exports are materialized at write time, so their digest is
+        # a strong validator.
+        return f'"{record.export_sha256}"'
+    return make_etag(record.id, record.updated_at, "export", pretty)
+
+
+async def _read_workspace_upload(
+    upload: UploadFile,
+    executor: SerializationExecutor,
+) -> Any:
+    scanner = TopLevelKeyScanner(watch={"created_at"})
+    size = 0
+    try:
+        while chunk := await upload.read(IMPORT_CHUNK_SIZE):
+            size += len(chunk)
+            scanner.feed(chunk)
+        scanner.close()
+    except JSONScanError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    missing_keys = REQUIRED_PAYLOAD_KEYS - scanner.keys
+    if missing_keys:
+        missing = ", ".join(sorted(missing_keys))
+        raise HTTPException(status_code=400, detail=f"Missing required fields: {missing}")
+    created_at = scanner.values.get("created_at")
+    if created_at is not None:
+        try:
+            datetime.fromisoformat(created_at)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid created_at format") from exc
+
+    await upload.seek(0)
+    try:
+        if executor.choose_mode(size) == PROCESS:
+            # Open files cannot be pickled; a worker process gets the bytes.
+            payload = await executor.run(json.loads, await upload.read(), size=size)
+        else:
+            payload = await executor.run(json.load, upload.file, size=size)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid JSON file") from exc
+    return payload
 
 
 @router.post("/import")
 async def workspaces_import(
     request: Request,
-    workspace_file: UploadFile = File(...),
-    csrf_token: str | None = Form(None),
     user: User = Depends(require_admin),
 ) -> RedirectResponse:
-    verify_csrf(request, csrf_token)
-    raw = await workspace_file.read()
+    settings: Settings = request.app.state.settings
+    form = await read_upload_form(
+        request,
+        max_bytes=settings.workspace_import_max_bytes,
+        spool_bytes=settings.workspace_import_spool_bytes,
+    )
     try:
-        payload = json.loads(raw)
-    except json.JSONDecodeError as exc:
-        raise HTTPException(status_code=400, detail="Invalid JSON file") from exc
-
-    if not isinstance(payload, dict):
-        raise HTTPException(status_code=400, detail="Workspace payload must be a JSON object")
-
-    required_keys = {"system_name", "system_id", "created_at"}
-    missing_keys = required_keys - payload.keys()
-    if missing_keys:
-        missing = ", ".join(sorted(missing_keys))
-        raise HTTPException(status_code=400, detail=f"Missing required fields: {missing}")
+        workspace_file = form.get("workspace_file")
+        if not isinstance(workspace_file, UploadFile):
+            raise HTTPException(status_code=400, detail="Workspace file is required")
+        payload = await _read_workspace_upload(workspace_file, request.app.state.executor)
+    finally:
+        await form.close()
 
     try:
-        workspace = Workspace.from_payload(payload)
-        workspace_name = " ".join(workspace.system_name.split())
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail="Invalid created_at format") from exc
-    if not workspace_name:
-        raise HTTPException(status_code=400, detail="Workspace name is required")
-    if len(workspace_name) > 200:
-        raise HTTPException(status_code=400, detail="Workspace name is too long")
+        workspace = validate_workspace_payload(payload)
+    except WorkspaceValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     sessionmaker = request.app.state.sessionmaker
     async for session in get_session(sessionmaker):
         await create_workspace_record(
             session,
-            name=workspace_name,
+            name=workspace.system_name,
             system_id=workspace.system_id,
             data=workspace.to_export_payload(),
             created_at=workspace.created_at,
@@ -220,3 +817,62 @@ async def workspaces_import(
         )
 
     return RedirectResponse(url="/admin/workspaces", status_code=303)
+
+
+@router.post("/import/bulk")
+async def workspaces_bulk_import(
+    request: Request,
+    background: bool = Query(False),
+    user: User = Depends(require_admin),
+) -> JSONResponse:
+    """Import an NDJSON or zip upload, in the request or as a background job.
+
+    With ``background=1`` the upload is copied next to the job artifacts and
+    the import runs on the job runner; the response is 202 with a job id.
+    """
+
+    settings: Settings = request.app.state.settings
+    form = await read_upload_form(
+        request,
+        max_bytes=settings.workspace_bulk_import_max_bytes,
+        spool_bytes=settings.workspace_import_spool_bytes,
+    )
+    try:
+        workspace_file = form.get("workspace_file")
+        if not isinstance(workspace_file, UploadFile):
+            raise HTTPException(status_code=400, detail="Workspace file is required")
+        if background:
+            runner: JobRunner = request.app.state.job_runner
+            path = settings.job_artifact_dir / f"upload-{uuid4().hex}"
+            with path.open("wb") as spooled:
+                await request.app.state.executor.run(
+                    shutil.copyfileobj, workspace_file.file, spooled
+                )
+            job_id = await runner.submit(
+                IMPORT,
+                import_job(
+                    path,
+                    owner_id=user.id,
+                    batch_size=settings.workspace_bulk_import_batch_size,
+                ),
+                owner_id=user.id,
+                params={"filename": workspace_file.filename},
+            )
+            return _job_accepted(job_id)
+        try:
+            entries = iter_import_entries(workspace_file.file)
+        except zipfile.BadZipFile as exc:
+            raise HTTPException(status_code=400, detail="Invalid zip archive") from exc
+        sessionmaker = request.app.state.sessionmaker
+        async for session in get_session(sessionmaker):
+            results = await import_workspaces(
+                session,
+                entries,
+                owner_id=user.id,
+                batch_size=settings.workspace_bulk_import_batch_size,
+                executor=request.app.state.executor,
+            )
+    finally:
+        await form.close()
+
+    return JSONResponse(summarize(results))
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
 import secrets
-from typing import cast
+from dataclasses import dataclass
+from typing import Any, cast
 
 from fastapi import Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from engine.cache import TTLCache
 from engine.db import get_session
 from engine.models import User
 from engine.users import get_user_by_id
 
+UNRESOLVED_PATH_PREFIXES = ("/static/",)
+UNRESOLVED_PATHS = frozenset({"/health"})
+
+
+@dataclass
+class UserResolutionStats:
+    """Counts of how each request's user was (or was not) resolved."""
+
+    skipped: int = 0
+    reused: int = 0
+    database_loads: int = 0
+
+
+def skips_user_resolution(path: str) -> bool:
+    return path in UNRESOLVED_PATHS or path.startswith(UNRESOLVED_PATH_PREFIXES)
+
+
+def user_resolution_metrics(
+    stats: UserResolutionStats,
+    cache: TTLCache[User],
+) -> dict[str, Any]:
+    return {
+        "skipped_requests": stats.skipped,
+        "reused_in_request": stats.reused,
+        "database_loads": stats.database_loads,
+        "db_round_trips_saved": stats.skipped + stats.reused + cache.stats.hits,
+        "cache": {
+            "hits": cache.stats.hits,
+            "misses": cache.stats.misses,
+            "hit_rate": cache.stats.hit_rate,
+            "evictions": cache.stats.evictions,
+            "expirations": cache.stats.expirations,
+            "invalidations": cache.stats.invalidations,
+            "entries": cache.stats.entries,
+        },
+    }
+
 
 def get_sessionmaker(request: Request) -> async_sessionmaker[AsyncSession]:
     return cast(async_sessionmaker[AsyncSession], request.app.state.sessionmaker)
@@ -19,6 +58,11 @@ async def get_current_user(
     request: Request,
     sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
 ) -> User | None:
+    if hasattr(request.state, "user"):
+        stats: UserResolutionStats | None = getattr(request.app.state, "user_resolution", None)
+        if stats is not None:
+            stats.reused += 1
+        return cast(User | None, request.state.user)
     return await load_user(request, sessionmaker)
 
 
@@ -26,14 +70,30 @@ async def load_user(
     request: Request,
     sessionmaker: async_sessionmaker[AsyncSession] | None = None,
 ) -> User | None:
+    """Resolve the session's user, from the app's user cache when possible.
+
+    Cached users are detached instances; treat them as read-only.
+    """
+
     if sessionmaker is None:
         sessionmaker = request.app.state.sessionmaker
     user_id = request.session.get("user_id")
     if not user_id:
         return None
 
+    cache: TTLCache[User] | None = getattr(request.app.state, "user_cache", None)
+    if cache is not None:
+        cached = cache.get(user_id)
+        if cached is not None:
+            return cached
+
+    stats: UserResolutionStats | None = getattr(request.app.state, "user_resolution", None)
+    if stats is not None:
+        stats.database_loads += 1
     async for session in get_session(sessionmaker):
         user = await get_user_by_id(session, user_id)
+        if user is not None and cache is not None:
+            cache.put(user_id, user)
         return user
 
     return None
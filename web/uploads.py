@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+
+from fastapi import HTTPException, Request
+from starlette.datastructures import FormData, Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from web.security import verify_csrf
+
+# Allowance for multipart boundaries and the CSRF field on top of the file itself.
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+async def _limited_stream(
+    request: Request,
+    max_bytes: int,
+    detail: str = "Upload is too large",
+) -> AsyncGenerator[bytes, None]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=detail)
+        yield chunk
+
+
+async def read_limited_body(request: Request, *, max_bytes: int) -> bytes:
+    """Read a request body, refusing it as soon as it exceeds max_bytes."""
+
+    detail = "Request body is too large"
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=detail)
+    return b"".join([chunk async for chunk in _limited_stream(request, max_bytes, detail)])
+
+
+class _CsrfMultiPartParser(MultiPartParser):
+    """Multipart parser that verifies the CSRF token before accepting any file.
+
+    The token comes from the ``x-csrf-token`` header or from a
+    ``csrf_token`` field sent ahead of the file parts, as the import forms
+    do; a file part that starts before a valid token aborts the upload.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        headers: Headers,
+        stream: AsyncGenerator[bytes, None],
+        **limits: int,
+    ) -> None:
+        super().__init__(headers, stream, **limits)
+        self.request = request
+        self.verified = False
+
+    def on_part_end(self) -> None:
+        part = self._current_part
+        if not self.verified and part.file is None and part.field_name == "csrf_token":
+            verify_csrf(self.request, part.data.decode("utf-8", errors="replace"))
+            self.verified = True
+        super().on_part_end()
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        if self._current_part.file is not None and not self.verified:
+            raise HTTPException(status_code=400, detail="Invalid CSRF token")
+
+
+async def read_upload_form(
+    request: Request,
+    *,
+    max_bytes: int,
+    spool_bytes: int,
+    max_files: int = 1,
+) -> FormData:
+    """Parse a CSRF-protected multipart upload, refusing it as soon as it exceeds max_bytes.
+
+    The CSRF token is checked before any file data is read. File parts are
+    spooled to a temporary file once they pass spool_bytes.
+    """
+
+    limit = max_bytes + FORM_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=413, detail="Upload is too large")
+
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Expected a multipart upload")
+
+    parser = _CsrfMultiPartParser(
+        request,
+        request.headers,
+        _limited_stream(request, limit),
+        max_files=max_files,
+        max_fields=10,
+    )
+    header_token = request.headers.get("x-csrf-token")
+    if header_token is not None:
+        verify_csrf(request, header_token)
+        parser.verified = True
+    parser.spool_max_size = spool_bytes
+    try:
+        form = await parser.parse()
+    except MultiPartException as exc:
+        raise HTTPException(status_code=400, detail=exc.message) from exc
+    if not parser.verified:
+        await form.close()
+        verify_csrf(request, None)
+    return form